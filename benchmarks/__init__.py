@@ -0,0 +1 @@
+"""Benchmarks for the dashboard helpers; run modules with python -m benchmarks.<name>"""
@@ -0,0 +1,106 @@
+"""Compare the single-pass null cleaner against the original remove_null_values
+
+Usage: python -m benchmarks.bench_cleaning [--forms 300] [--list-length 500] [--depth 200]
+"""
+import argparse
+import json
+import time
+from typing import Any, Dict
+
+from jsonviewer.cleaning import clean_form
+from jsonviewer.templates import DEFAULT_TEST_CASE, get_default_json_structure
+
+
+def legacy_remove_null_values(data: Any) -> Any:
+    """The original recursive remove_null_values from updated_code.py"""
+    if isinstance(data, dict):
+        cleaned = {}
+        for key, value in data.items():
+            cleaned_value = legacy_remove_null_values(value)
+            if (cleaned_value is not None and
+                cleaned_value != [] and
+                cleaned_value != {} and
+                cleaned_value != "" and
+                str(cleaned_value).lower() != "null"):
+                cleaned[key] = cleaned_value
+        return cleaned if cleaned else None
+    elif isinstance(data, list):
+        cleaned = []
+        for item in data:
+            cleaned_item = legacy_remove_null_values(item)
+            if (cleaned_item is not None and
+                cleaned_item != "" and
+                str(cleaned_item).lower() != "null"):
+                cleaned.append(cleaned_item)
+        return cleaned if cleaned else None
+    else:
+        if (data is None or
+            data == "" or
+            str(data).lower() == "null"):
+            return None
+        return data
+
+
+def legacy_copy_path(form: Dict) -> Any:
+    """What the original copy button did: is_form_empty, then clean again"""
+    cleaned = legacy_remove_null_values(form)
+    if cleaned is None or cleaned == {}:
+        return None
+    return legacy_remove_null_values(form)
+
+
+def make_large_form(list_length: int) -> Dict:
+    """Default-shaped form with long daily series and half the fields null"""
+    form = json.loads(json.dumps(DEFAULT_TEST_CASE))
+    nulls = get_default_json_structure()
+    for section, fields in nulls.items():
+        if isinstance(fields, dict):
+            for i, key in enumerate(fields):
+                if i % 2:
+                    form[section][key] = None
+    form["mhm"]["rhr_day"] = [60 + i % 30 if i % 7 else None for i in range(list_length)]
+    form["slp"] = {key: [8.0] * list_length for key in form["slp"]}
+    return form
+
+
+def make_deep_form(depth: int) -> Dict:
+    form = node = {}
+    for i in range(depth):
+        node["value"] = i if i % 3 else None
+        node["child"] = {}
+        node = node["child"]
+    return form
+
+
+def timed(label: str, func, n: int) -> float:
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<36} {elapsed * 1000:>10.1f} ms  {n / elapsed:>10,.0f} forms/s")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--forms", type=int, default=300)
+    parser.add_argument("--list-length", type=int, default=500)
+    parser.add_argument("--depth", type=int, default=200)
+    args = parser.parse_args()
+
+    for name, form in (("large", make_large_form(args.list_length)), ("deep", make_deep_form(args.depth))):
+        forms = [form] * args.forms
+        print(f"{name} forms ({args.forms}):")
+        old = timed("  legacy is_form_empty + clean", lambda: [legacy_copy_path(f) for f in forms], len(forms))
+        new = timed("  clean_form (single pass)", lambda: [clean_form(f) for f in forms], len(forms))
+        assert clean_form(form)[0] == legacy_remove_null_values(form), "cleaner output differs"
+        print(f"  speedup: {old / new:.1f}x\n")
+
+    cleaned = [clean_form(make_large_form(args.list_length))[0]] * 10
+    indented = len(json.dumps(cleaned, indent=2))
+    compact = len(json.dumps(cleaned, separators=(',', ':')))
+    print(f"export size: indent=2 {indented:,} bytes, compact {compact:,} bytes "
+          f"({100 * compact / indented:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
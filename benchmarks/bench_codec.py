@@ -0,0 +1,56 @@
+"""Compare the JSON codec backend against stdlib json on default-shaped suites
+
+Usage: python -m benchmarks.bench_codec [--cases 2000] [--seed 0]
+"""
+import argparse
+import json
+import time
+
+from jsonviewer import codec
+from jsonviewer.generator import generate_random
+from jsonviewer.templates import DEFAULT_TEST_CASE
+
+
+def timed(label: str, func, n: int) -> float:
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<36} {elapsed * 1000:>10.1f} ms  {n / elapsed:>10,.0f} cases/s")
+    return elapsed
+
+
+def compare(title: str, legacy, fast, n: int):
+    print(f"{title}:")
+    old = timed("  stdlib json", legacy, n)
+    new = timed(f"  codec ({codec.BACKEND})", fast, n)
+    print(f"  speedup: {old / new:.1f}x\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cases", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    cases = list(generate_random(DEFAULT_TEST_CASE, args.cases, seed=args.seed))
+    pretty = [json.dumps(case, indent=2) for case in cases]
+    compact = [json.dumps(case, separators=(',', ':')) for case in cases]
+    n = len(cases)
+
+    assert [codec.dumps(case, pretty=True) for case in cases] == pretty, "pretty output differs"
+    assert [codec.dumps(case) for case in cases] == compact, "compact output differs"
+    assert [codec.loads(text) for text in pretty] == [json.loads(text) for text in pretty], "parse differs"
+
+    print(f"{n} cases, backend: {codec.BACKEND}\n")
+    compare("parse (editor text)", lambda: [json.loads(t) for t in pretty],
+            lambda: [codec.loads(t) for t in pretty], n)
+    compare("dump indent=2 (editor text)", lambda: [json.dumps(c, indent=2) for c in cases],
+            lambda: [codec.dumps(c, pretty=True) for c in cases], n)
+    compare("dump compact (store, export)", lambda: [json.dumps(c, separators=(',', ':')) for c in cases],
+            lambda: [codec.dumps(c) for c in cases], n)
+    compare("dump whole suite indent=2", lambda: json.dumps(cases, indent=2),
+            lambda: codec.dumps(cases, pretty=True), n)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Compare the flatten engine against the original recursive flatten_dict/unflatten_dict
+
+Usage: python -m benchmarks.bench_flatten [--cases 10000]
+"""
+import argparse
+import copy
+import json
+import time
+from typing import Dict
+
+from jsonviewer.flatten import flatten_batch, flatten_dict, unflatten_dict
+from jsonviewer.templates import DEFAULT_TEST_CASE
+
+
+def legacy_flatten_dict(d: Dict, parent_key: str = '', sep: str = '.') -> Dict:
+    """The original recursive flatten_dict from new_code.py"""
+    items = []
+    for k, v in d.items():
+        new_key = f"{parent_key}{sep}{k}" if parent_key else k
+        if isinstance(v, dict):
+            items.extend(legacy_flatten_dict(v, new_key, sep=sep).items())
+        elif isinstance(v, list):
+            items.append((new_key, str(v)))
+        else:
+            items.append((new_key, v))
+    return dict(items)
+
+
+def legacy_unflatten_dict(flat_dict: Dict, sep: str = '.') -> Dict:
+    """The original unflatten_dict from new_code.py"""
+    result = {}
+    for key, value in flat_dict.items():
+        parts = key.split(sep)
+        d = result
+        for part in parts[:-1]:
+            if part not in d:
+                d[part] = {}
+            d = d[part]
+        if isinstance(value, str) and value.startswith('[') and value.endswith(']'):
+            try:
+                d[parts[-1]] = json.loads(value)
+            except Exception:
+                d[parts[-1]] = value
+        else:
+            d[parts[-1]] = value
+    return result
+
+
+def make_suite(n: int):
+    suite = []
+    for i in range(n):
+        case = copy.deepcopy(DEFAULT_TEST_CASE)
+        case["mhm"]["age"] = 20 + i % 60
+        suite.append(case)
+    return suite
+
+
+def timed(label: str, func, n: int) -> float:
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {elapsed * 1000:>10.1f} ms  {n / elapsed:>12,.0f} cases/s")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cases", type=int, default=10000)
+    args = parser.parse_args()
+
+    suite = make_suite(args.cases)
+    n = len(suite)
+    print(f"Suite: {n} cases\n")
+
+    legacy_flat = []
+    new_flat = []
+    old_f = timed("legacy flatten_dict", lambda: legacy_flat.extend(legacy_flatten_dict(c) for c in suite), n)
+    new_f = timed("flatten_dict", lambda: new_flat.extend(flatten_dict(c) for c in suite), n)
+    timed("flatten_batch (shared schema)", lambda: flatten_batch(suite), n)
+    old_u = timed("legacy unflatten_dict", lambda: [legacy_unflatten_dict(f) for f in legacy_flat], n)
+    new_u = timed("unflatten_dict", lambda: [unflatten_dict(f) for f in new_flat], n)
+
+    print(f"\nflatten speedup:   {old_f / new_f:.2f}x")
+    print(f"unflatten speedup: {old_u / new_u:.2f}x")
+    assert all(unflatten_dict(f) == c for f, c in zip(new_flat[:100], suite)), "round-trip mismatch"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Measure dashboard startup: a cold process start and each new browser session
+
+Usage: python -m benchmarks.bench_startup [--apps new_code.py,updated_code.py] [--sessions 24] [--repeat 3]
+
+The cold start is the first session of a fresh interpreter, imports
+included. The warm sessions then connect one after another in the same
+process, as a room of testers would, each with empty session state; their
+times should stay flat. Every figure is net of Streamlit's AppTest harness,
+measured the same way on an empty script.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EMPTY_SCRIPT = "import streamlit as st\n"
+WATCHED_MODULES = ("pandas", "numpy")
+
+
+def run_sessions(script: str, sessions: int) -> dict:
+    """Run the script's sessions in this process and return their times in ms"""
+    start = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    AppTest.from_file(script, default_timeout=120).run()
+    cold_ms = (time.perf_counter() - start) * 1000
+    loaded = [name for name in WATCHED_MODULES if name in sys.modules]
+
+    warm_ms = []
+    for _ in range(sessions):
+        start = time.perf_counter()
+        AppTest.from_file(script, default_timeout=120).run()
+        warm_ms.append((time.perf_counter() - start) * 1000)
+    return {'cold_ms': cold_ms, 'warm_ms': warm_ms, 'loaded': loaded}
+
+
+def measure(script: str, sessions: int, repeat: int) -> dict:
+    """Best cold start over fresh interpreters, with the warm sessions of the first one"""
+    results = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_startup", "--child", script, "--sessions", str(sessions)],
+            cwd=ROOT, env={**os.environ, 'PYTHONPATH': ROOT}, check=True, capture_output=True, text=True,
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+    result = results[0]
+    result['cold_ms'] = min(r['cold_ms'] for r in results)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--apps", default="new_code.py,updated_code.py")
+    parser.add_argument("--sessions", type=int, default=24)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_sessions(args.child, args.sessions)))
+        return
+
+    with tempfile.NamedTemporaryFile('w', suffix='.py', delete=False) as empty:
+        empty.write(EMPTY_SCRIPT)
+    try:
+        base = measure(empty.name, args.sessions, args.repeat)
+    finally:
+        os.unlink(empty.name)
+    base_warm = statistics.median(base['warm_ms'])
+    print(f"AppTest overhead: cold {base['cold_ms']:.0f} ms, per session {base_warm:.0f} ms\n")
+
+    print(f"{'app':<20} {'cold ms':>9} {'first':>7} {'median':>7} {'p95':>7} {'last':>7}  heavy imports")
+    for app in args.apps.split(','):
+        result = measure(os.path.join(ROOT, app), args.sessions, args.repeat)
+        warm = [max(ms - base_warm, 0.0) for ms in result['warm_ms']]
+        p95 = statistics.quantiles(warm, n=20)[-1] if len(warm) > 1 else warm[0]
+        # Averages of the first and last quarter, to show drift as sessions pile up
+        quarter = max(len(warm) // 4, 1)
+        first = statistics.fmean(warm[:quarter])
+        last = statistics.fmean(warm[-quarter:])
+        print(f"{app:<20} {result['cold_ms'] - base['cold_ms']:>9.0f} {first:>7.1f} "
+              f"{statistics.median(warm):>7.1f} {p95:>7.1f} {last:>7.1f}  {', '.join(result['loaded']) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Deterministic synthetic suites for the benchmarks
+
+Shapes:
+  default  DEFAULT_TEST_CASE with sampled vitals, the editor's usual input
+  sparse   get_default_json_structure with only the sampled fields filled, as
+           produced by the Health Score tester (mostly nulls)
+  deep     one long chain of nested sections, 64 levels
+  wide     five sections of 400 scalar and list fields each
+"""
+import random
+from typing import Dict, List
+
+from jsonviewer.generator import generate_random, make_cloner
+from jsonviewer.templates import DEFAULT_TEST_CASE, get_default_json_structure
+
+SIZES = {'1k': 1000, '10k': 10000, '100k': 100000}
+SHAPES = ('default', 'sparse', 'deep', 'wide')
+
+# Wide cases hold ten times the fields of a default case, so suites get a tenth
+# of the cases to keep the total work per size comparable across shapes
+SHAPE_SCALE = {'default': 1, 'sparse': 1, 'deep': 1, 'wide': 10}
+
+DEEP_LEVELS = 64
+WIDE_SECTIONS = 5
+WIDE_FIELDS = 400
+
+
+def parse_size(label: str) -> int:
+    """Accept '10k', '100k' or a plain number"""
+    if label in SIZES:
+        return SIZES[label]
+    if label.lower().endswith('k'):
+        return int(label[:-1]) * 1000
+    return int(label)
+
+
+def _deep_template() -> Dict:
+    case = node = {}
+    for level in range(DEEP_LEVELS):
+        node["value"] = level if level % 3 else None
+        node["series"] = [level, None, level + 1] if level % 4 == 0 else []
+        node["label"] = "" if level % 5 == 0 else f"level{level}"
+        node["child"] = {}
+        node = node["child"]
+    return case
+
+
+def _wide_template() -> Dict:
+    case = {}
+    for section in range(WIDE_SECTIONS):
+        fields = {}
+        for field in range(WIDE_FIELDS):
+            kind = field % 4
+            if kind == 0:
+                fields[f"f{field}"] = field
+            elif kind == 1:
+                fields[f"f{field}"] = None
+            elif kind == 2:
+                fields[f"f{field}"] = [field, field + 1]
+            else:
+                fields[f"f{field}"] = field / 10
+        case[f"s{section}"] = fields
+    return case
+
+
+def _vary(template: Dict, count: int, seed: int, paths: List[List[str]]) -> List[Dict]:
+    """Clone a template and set the given leaves to seeded random integers"""
+    rng = random.Random(seed)
+    clone = make_cloner(template)
+    suite = []
+    for _ in range(count):
+        case = clone(template)
+        for parts in paths:
+            node = case
+            for part in parts[:-1]:
+                node = node[part]
+            node[parts[-1]] = rng.randint(0, 1000)
+        suite.append(case)
+    return suite
+
+
+def make_suite(shape: str, size: int, seed: int = 0) -> List[Dict]:
+    """Build a reproducible suite; size is divided by the shape's scale"""
+    count = max(1, size // SHAPE_SCALE[shape])
+    if shape == 'default':
+        return list(generate_random(DEFAULT_TEST_CASE, count, seed=seed))
+    if shape == 'sparse':
+        return list(generate_random(get_default_json_structure(), count, seed=seed))
+    if shape == 'deep':
+        return _vary(_deep_template(), count, seed,
+                     [["value"], ["child"] * (DEEP_LEVELS // 2) + ["value"]])
+    if shape == 'wide':
+        return _vary(_wide_template(), count, seed,
+                     [[f"s{section}", "f0"] for section in range(WIDE_SECTIONS)])
+    raise ValueError(f"Unknown fixture shape: {shape}")
@@ -0,0 +1,252 @@
+"""Benchmark the editor's core functions on synthetic suites and check for regressions
+
+Usage: python -m benchmarks.harness [--sizes 1k,10k,100k] [--shapes default,sparse,deep,wide]
+                                    [--bench flatten_dict,...] [--save-baseline]
+
+Each benchmark is timed --repeat times with GC disabled, looping short runs,
+and the best time is kept. Peak memory is measured in a separate tracemalloc
+pass, as the allocation peak above the input suite. Results are compared with
+the stored baseline and the exit status is 1 when throughput drops or peak
+memory grows beyond the tolerances. --save-baseline merges the results into
+the baseline.
+"""
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, NamedTuple
+
+from benchmarks.fixtures import SHAPES, make_suite, parse_size
+from jsonviewer import codec
+from jsonviewer.cache import parse_json
+from jsonviewer.cleaning import is_form_empty, remove_null_values
+from jsonviewer.compact import CompactSuite
+from jsonviewer.dedup import exact_duplicates, near_duplicates
+from jsonviewer.diff import diff_suites
+from jsonviewer.export import create_download_link
+from jsonviewer.flatten import flatten_dict, unflatten_dict
+from jsonviewer.golden import compare_run, record_golden
+from jsonviewer.query import SuiteIndex, parse_query
+from jsonviewer.stub_server import score_case
+from jsonviewer.transform import Pipeline, TransformReport, transformed_cases
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+DEFAULT_SIZES = "1k,10k,100k"
+DEFAULT_TOLERANCE = 0.25
+DEFAULT_MEMORY_TOLERANCE = 0.25
+# Per-call working sets are small; ignore memory changes below this
+MEMORY_SLACK_KB = 64
+# Fast benchmarks are looped until one timing takes at least this long
+MIN_SECONDS = 0.2
+
+SUITE_QUERY = parse_query("mhm.sbp > 140 and mhm.DM2 = 1")
+TRANSFORM = Pipeline("rename nut.nqs01 -> nut.saturated_fat\n"
+                     "compute slp.bed = slp.bed * 60\n"
+                     "fill qlm.mfm = [0.5]\n"
+                     "drop mhm.fCV\n"
+                     "set smk.now = 0 where smk.evr = 0")
+
+
+class Benchmark(NamedTuple):
+    prepare: Callable[[List[Dict]], Any]
+    run: Callable[[Any], Any]
+    # Larger suite sizes are skipped, e.g. where the output would not fit in memory
+    max_size: int = 0
+
+
+def _each(func: Callable) -> Callable[[List[Any]], None]:
+    # Results are dropped as they come, so 100k-case suites fit in memory and
+    # peak memory is the per-call working set rather than the collected output
+    def run(items: List[Any]):
+        for item in items:
+            func(item)
+    return run
+
+
+def _indexed(suite: List[Dict]) -> Any:
+    # Build the query columns up front so the benchmark times warm queries
+    index = SuiteIndex()
+    index.query(suite, SUITE_QUERY)
+    return suite, index
+
+
+def _edited(suite: List[Dict]) -> Any:
+    # Every tenth case gets one changed field, as between two releases
+    edited = list(suite)
+    for i in range(0, len(edited), 10):
+        edited[i] = {**edited[i], 'edited': True}
+    return suite, edited
+
+
+def _scored(suite: List[Dict]) -> Any:
+    # Stub responses recorded as golden, then a run where every tenth case drifted
+    def results(drift_every: int) -> List[Dict]:
+        return [{'status': 200, 'error': None,
+                 'response': codec.dumps([score_case(case, 0.01 if drift_every and i % drift_every == 0 else 0.0)])}
+                for i, case in enumerate(suite)]
+    return suite, results(10), record_golden(suite, results(0))
+
+
+def _drain(items: Any):
+    for _ in items:
+        pass
+
+
+BENCHMARKS: Dict[str, Benchmark] = {
+    'flatten_dict': Benchmark(lambda suite: suite, _each(flatten_dict)),
+    'unflatten_dict': Benchmark(lambda suite: [flatten_dict(case) for case in suite], _each(unflatten_dict)),
+    'validate_json': Benchmark(lambda suite: [codec.dumps(case, pretty=True) for case in suite],
+                               _each(parse_json)),
+    'remove_null_values': Benchmark(lambda suite: suite, _each(remove_null_values)),
+    'is_form_empty': Benchmark(lambda suite: suite, _each(is_form_empty)),
+    # Peak memory here is the size of the compact suite itself
+    'compact_suite': Benchmark(lambda suite: suite, CompactSuite),
+    'compact_without_nulls': Benchmark(CompactSuite, lambda compact: compact.without_nulls()),
+    'suite_query': Benchmark(_indexed, lambda indexed: indexed[1].query(indexed[0], SUITE_QUERY)),
+    'exact_duplicates': Benchmark(lambda suite: suite, exact_duplicates),
+    'near_duplicates': Benchmark(lambda suite: suite, near_duplicates),
+    'diff_suites': Benchmark(_edited, lambda pair: _drain(diff_suites(*pair))),
+    'compare_golden': Benchmark(_scored, lambda run: compare_run(*run)),
+    'transform': Benchmark(lambda suite: suite,
+                           lambda suite: _drain(transformed_cases(TRANSFORM, suite, TransformReport(TRANSFORM.steps)))),
+    # Data-URI links are meant for small suites; 100k cases would be hundreds of MB
+    'create_download_link': Benchmark(lambda suite: suite,
+                                      lambda suite: create_download_link(suite, "test_cases.json"),
+                                      max_size=10000),
+}
+
+
+def measure(bench: Benchmark, inputs: Any, repeat: int, memory: bool) -> Dict[str, float]:
+    """Best-of-repeat wall time per pass and tracemalloc peak for one benchmark"""
+    # Like timeit, keep cyclic GC passes over the large live suite out of the timings
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        bench.run(inputs)
+        loops = max(1, math.ceil(MIN_SECONDS / max(time.perf_counter() - start, 1e-9)))
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(loops):
+                bench.run(inputs)
+            best = min(best, (time.perf_counter() - start) / loops)
+    finally:
+        gc.enable()
+    result = {'seconds': best}
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            bench.run(inputs)
+            result['peak_kb'] = tracemalloc.get_traced_memory()[1] / 1024
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def load_baseline(path: str) -> Dict[str, Any]:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(result: Dict[str, float], baseline: Dict[str, float],
+            tolerance: float, memory_tolerance: float) -> List[str]:
+    """Return a description of each regression against the baseline"""
+    problems = []
+    if result['cases_per_s'] < baseline['cases_per_s'] * (1 - tolerance):
+        problems.append(f"throughput {result['cases_per_s']:,.0f} < baseline {baseline['cases_per_s']:,.0f} cases/s")
+    if 'peak_kb' in result and 'peak_kb' in baseline:
+        limit = baseline['peak_kb'] * (1 + memory_tolerance) + MEMORY_SLACK_KB
+        if result['peak_kb'] > limit:
+            problems.append(f"peak memory {result['peak_kb']:,.0f} > baseline {baseline['peak_kb']:,.0f} KB")
+    return problems
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma-separated suite sizes, e.g. 1k,10k")
+    parser.add_argument("--shapes", default=",".join(SHAPES))
+    parser.add_argument("--bench", default=",".join(BENCHMARKS), help="Comma-separated benchmark names")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc pass")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed fractional throughput drop")
+    parser.add_argument("--memory-tolerance", type=float, default=DEFAULT_MEMORY_TOLERANCE,
+                        help="Allowed fractional peak memory growth")
+    args = parser.parse_args()
+
+    names = args.bench.split(",")
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+
+    baseline = load_baseline(args.baseline)
+    baseline_results = baseline.get('results', {})
+    results = {}
+    regressions = []
+
+    print(f"JSON backend: {codec.BACKEND}, Python {platform.python_version()}\n")
+    print(f"{'benchmark':<44} {'cases/s':>12} {'peak KB':>10} {'vs base':>8}")
+    for size_label in args.sizes.split(","):
+        size = parse_size(size_label)
+        for shape in args.shapes.split(","):
+            suite = make_suite(shape, size, seed=args.seed)
+            for name in names:
+                bench = BENCHMARKS[name]
+                if bench.max_size and size > bench.max_size:
+                    continue
+                key = f"{name}/{shape}/{size_label}"
+                inputs = bench.prepare(suite)
+                result = measure(bench, inputs, args.repeat, not args.no_memory)
+                del inputs
+                result['cases'] = len(suite)
+                result['cases_per_s'] = len(suite) / result['seconds']
+                results[key] = result
+
+                previous = baseline_results.get(key)
+                ratio = f"{result['cases_per_s'] / previous['cases_per_s']:.2f}x" if previous else "-"
+                peak = f"{result['peak_kb']:,.0f}" if 'peak_kb' in result else "-"
+                print(f"{key:<44} {result['cases_per_s']:>12,.0f} {peak:>10} {ratio:>8}")
+                if previous:
+                    regressions.extend(f"{key}: {problem}" for problem in
+                                       compare(result, previous, args.tolerance, args.memory_tolerance))
+            del suite
+
+    if args.save_baseline:
+        baseline_results.update(results)
+        baseline = {
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'json_backend': codec.BACKEND,
+            'results': baseline_results,
+        }
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"\nSaved {len(results)} result(s) to {args.baseline}")
+        return 0
+
+    if not baseline_results:
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+    if regressions:
+        print(f"\n{len(regressions)} regression(s):")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    print("\nNo regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
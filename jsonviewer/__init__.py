@@ -0,0 +1 @@
+"""Shared helpers for the JSON test case dashboards"""
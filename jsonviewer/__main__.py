@@ -0,0 +1,6 @@
+"""Entry point for python -m jsonviewer"""
+import sys
+
+from jsonviewer.cli import main
+
+sys.exit(main())
@@ -0,0 +1,178 @@
+"""Content-hash keyed memoization of per-case JSON work"""
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from jsonviewer import codec
+from jsonviewer.flatten import flatten_dict
+from jsonviewer.generator import clone_case
+from jsonviewer.patch import Patch, parse_pointer
+
+DEFAULT_MAX_ENTRIES = 4096
+
+ValidationResult = Tuple[bool, str, Any]
+
+
+def parse_json(json_string: str) -> ValidationResult:
+    """Parse a JSON string into the (is_valid, message, parsed) shape used by the apps"""
+    try:
+        return True, "Valid JSON", codec.loads(json_string)
+    except json.JSONDecodeError as e:
+        return False, f"Invalid JSON: {str(e)}", None
+
+
+def content_hash(case: Any) -> str:
+    """Stable hash of a case's content, independent of key order"""
+    canonical = codec.dumps_bytes(case, sort_keys=True)
+    return hashlib.blake2b(canonical, digest_size=16).hexdigest()
+
+
+class CacheEntry:
+    """Cached derived data for one version of a case"""
+
+    __slots__ = ('case', 'text', 'flat', 'edit_text', 'edit_result')
+
+    def __init__(self, case: Any, text: str):
+        self.case = case
+        self.text = text
+        self.flat: Optional[Dict] = None
+        self.edit_text: Optional[str] = None
+        self.edit_result: Optional[ValidationResult] = None
+
+
+class CaseCache:
+    """LRU cache of pretty-printed text, validation and flattened fields per case
+
+    Cases are looked up by object identity first, so untouched cases that stay in
+    session state cost a dictionary lookup per rerun. Cases that arrive as new
+    objects (for example from a spilled suite) fall back to a content hash.
+    Cases must be treated as immutable once cached: edits replace the object.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 validate: Callable[[str], ValidationResult] = parse_json,
+                 flatten: Callable[[Dict], Dict] = flatten_dict):
+        self.max_entries = max_entries
+        self.validate_text = validate
+        self.flatten_case = flatten
+        self._entries: 'OrderedDict[str, CacheEntry]' = OrderedDict()
+        self._by_id: 'OrderedDict[int, Tuple[Any, str]]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _entry(self, case: Any) -> CacheEntry:
+        """Return the entry for a case, creating it on a miss"""
+        known = self._by_id.get(id(case))
+        if known is not None and known[0] is case and known[1] in self._entries:
+            key = known[1]
+            self._by_id.move_to_end(id(case))
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+
+        key = content_hash(case)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+        else:
+            entry = CacheEntry(case, codec.dumps(case, pretty=True))
+            self._entries[key] = entry
+            self.misses += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+        self._by_id[id(case)] = (case, key)
+        self._by_id.move_to_end(id(case))
+        while len(self._by_id) > self.max_entries:
+            self._by_id.popitem(last=False)
+        return entry
+
+    def _peek(self, case: Any) -> Optional[CacheEntry]:
+        """Return the entry for a case known by identity, without counting or hashing"""
+        known = self._by_id.get(id(case))
+        if known is not None and known[0] is case:
+            return self._entries.get(known[1])
+        return None
+
+    def derive(self, old_case: Any, new_case: Any, patch: Patch):
+        """Cache an edited case, reusing the old flat map outside the patched sections"""
+        old_entry = self._peek(old_case)
+        entry = self._entry(new_case)
+        if entry.flat is not None or old_entry is None or old_entry.flat is None:
+            return
+        if not isinstance(new_case, dict):
+            return
+        changed = set()
+        for operation in patch:
+            tokens = parse_pointer(operation['path'])
+            if not tokens:
+                return
+            changed.add(tokens[0])
+
+        # Keep the old field order; re-flatten only the changed top-level keys
+        flat = {}
+        emitted = set()
+
+        def emit(root: str):
+            emitted.add(root)
+            if root not in new_case:
+                return
+            value = new_case[root]
+            if isinstance(value, dict) and value:
+                flat.update(self.flatten_case(value, root))
+            else:
+                flat[root] = value
+
+        for key, value in old_entry.flat.items():
+            root = key.split('.', 1)[0]
+            if root not in changed:
+                flat[key] = value
+            elif root not in emitted:
+                emit(root)
+        for root in new_case:
+            if root in changed and root not in emitted:
+                emit(root)
+        entry.flat = flat
+
+    def pretty(self, case: Any) -> str:
+        """Return json.dumps(case, indent=2), cached"""
+        return self._entry(case).text
+
+    def validate(self, case: Any, text: str) -> ValidationResult:
+        """Validate editor text for a case, skipping parsing when it is unchanged"""
+        entry = self._entry(case)
+        if text == entry.text:
+            # The caller's own case: an entry found by content hash may hold
+            # an equal but distinct object, belonging to another form
+            return True, "Valid JSON", case
+        if text != entry.edit_text:
+            entry.edit_text = text
+            entry.edit_result = self.validate_text(text)
+            return entry.edit_result
+        # Only the verdict is shared; each later caller gets its own parsed case
+        is_valid, message, parsed = entry.edit_result
+        return is_valid, message, clone_case(parsed) if is_valid else parsed
+
+    def flatten(self, case: Any) -> Dict:
+        """Return the flattened field map for a case, cached"""
+        entry = self._entry(case)
+        if entry.flat is None:
+            entry.flat = self.flatten_case(entry.case)
+        return entry.flat
+
+    def clear(self):
+        self._entries.clear()
+        self._by_id.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and the current size"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self._entries),
+        }
@@ -0,0 +1,67 @@
+"""Single-pass removal of null/empty values from test case forms"""
+from typing import Any, Dict, Optional, Tuple
+
+
+def _is_null_scalar(value: Any) -> bool:
+    """None, empty string and any-case "null" strings count as null"""
+    if value is None:
+        return True
+    if isinstance(value, str):
+        return value == "" or value.lower() == "null"
+    return False
+
+
+def remove_null_values(data: Any) -> Any:
+    """Remove null/None values from nested dictionaries and lists
+
+    Walks the structure once with an explicit stack, checking only scalars
+    for null-ness, so cost is linear in the size of the form. Containers that
+    end up empty are dropped; an empty result is returned as None.
+    """
+    if isinstance(data, dict):
+        root = {}
+        items = iter(data.items())
+    elif isinstance(data, list):
+        root = []
+        items = iter(enumerate(data))
+    else:
+        return None if _is_null_scalar(data) else data
+
+    # Each frame: source iterator, cleaned output, parent output, key in parent
+    stack = [(items, root, None, None)]
+    while stack:
+        items, out, parent, parent_key = stack[-1]
+        out_is_dict = isinstance(out, dict)
+        for key, value in items:
+            if isinstance(value, dict):
+                stack.append((iter(value.items()), {}, out, key))
+                break
+            if isinstance(value, list):
+                stack.append((iter(enumerate(value)), [], out, key))
+                break
+            if _is_null_scalar(value):
+                continue
+            if out_is_dict:
+                out[key] = value
+            else:
+                out.append(value)
+        else:
+            stack.pop()
+            # Attach non-empty children to their parent once they are complete
+            if out and parent is not None:
+                if isinstance(parent, dict):
+                    parent[parent_key] = out
+                else:
+                    parent.append(out)
+    return root if root else None
+
+
+def clean_form(form_data: Any) -> Tuple[Optional[Any], bool]:
+    """Return the cleaned form and whether it is empty, in one pass"""
+    cleaned = remove_null_values(form_data)
+    return cleaned, cleaned is None or cleaned == {}
+
+
+def is_form_empty(form_data: Dict[str, Any]) -> bool:
+    """Check if a form is completely empty (all values are null/None/empty)"""
+    return clean_form(form_data)[1]
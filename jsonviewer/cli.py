@@ -0,0 +1,355 @@
+"""Headless suite processing for CI pipelines, without starting Streamlit
+
+Usage: python -m jsonviewer <command> [INPUT ...] [-o OUTPUT] [--format json|compact|ndjson] [--gzip]
+
+Commands:
+  clean      drop null and empty values, and the cases left empty
+  validate   check cases against the health-score template; exit status 1 on errors
+  convert    re-encode a suite, optionally flattening or unflattening its keys
+  dedup      drop exact duplicates, compared after null removal
+  template   write the default test case or the all-null structure
+  diff       report field-level changes between two suites as NDJSON; exit status 1 if they differ
+  merge      three-way merge of two suites edited from a common base; exit status 1 on conflicts
+  regress    run a suite against the API and compare with golden responses; exit status 1 on drift
+  transform  apply rename/compute/fill/drop/set steps to every case, or preview their counts
+
+Inputs are JSON arrays, single objects or NDJSON, optionally gzipped; with no
+input or '-', stdin is read. Cases stream through one at a time, so memory
+stays flat as suites grow. Modules beyond the loader and the encoder are
+imported only by the commands that use them.
+"""
+import argparse
+import os
+import sys
+from typing import Any, BinaryIO, Callable, Iterable, Iterator, List, Optional
+
+from jsonviewer import codec
+from jsonviewer.export import EXPORT_FORMATS, iter_export_bytes
+from jsonviewer.loader import iter_cases
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+# Exit statuses besides 0: invalid, differing or conflicting cases found; unreadable input
+EXIT_INVALID = 1
+EXIT_ERROR = 2
+
+
+def _open_input(path: str) -> BinaryIO:
+    """Open a file or stdin for reading, decompressing gzip transparently"""
+    stream = sys.stdin.buffer if path == '-' else open(path, 'rb')
+    if stream.peek(2)[:2] == GZIP_MAGIC:
+        import gzip
+        return gzip.GzipFile(fileobj=stream)
+    return stream
+
+
+def read_cases(paths: List[str]) -> Iterator[Any]:
+    """Yield the cases of every input in turn"""
+    for path in paths or ['-']:
+        stream = _open_input(path)
+        try:
+            yield from iter_cases(stream)
+        finally:
+            # GzipFile leaves the underlying file open
+            raw = getattr(stream, 'fileobj', stream)
+            stream.close()
+            if raw is not sys.stdin.buffer:
+                raw.close()
+
+
+def write_cases(cases: Iterable[Any], output: str, fmt: str, compress: bool):
+    """Encode cases chunk by chunk to a file or stdout"""
+    if output == '-':
+        out = sys.stdout.buffer
+        for chunk in iter_export_bytes(cases, fmt, compress):
+            out.write(chunk)
+        out.flush()
+        return
+    with open(output, 'wb') as out:
+        for chunk in iter_export_bytes(cases, fmt, compress):
+            out.write(chunk)
+
+
+class Counter:
+    """Count the cases flowing through an iterator"""
+
+    def __init__(self, cases: Iterable[Any]):
+        self.cases = cases
+        self.count = 0
+
+    def __iter__(self) -> Iterator[Any]:
+        for case in self.cases:
+            self.count += 1
+            yield case
+
+
+def _report(args: argparse.Namespace, message: str):
+    if not args.quiet:
+        print(message, file=sys.stderr)
+
+
+def cmd_clean(args: argparse.Namespace) -> int:
+    from jsonviewer.cleaning import clean_form
+
+    def cleaned(cases: Iterable[Any]) -> Iterator[Any]:
+        for case in cases:
+            case, is_empty = clean_form(case)
+            if not is_empty:
+                yield case
+
+    cases = Counter(read_cases(args.inputs))
+    kept = Counter(cleaned(cases))
+    write_cases(kept, args.output, args.format, args.gzip)
+    _report(args, f"Cleaned {cases.count} case(s), dropped {cases.count - kept.count} empty")
+    return 0
+
+
+def cmd_validate(args: argparse.Namespace) -> int:
+    from jsonviewer.schema import default_schema
+    schema = default_schema(allow_null=not args.no_null, allow_missing=args.allow_missing,
+                            allow_extra=args.allow_extra)
+    out = sys.stdout
+    total = invalid = errors = 0
+    counts = {}
+    for i, case in enumerate(read_cases(args.inputs)):
+        total += 1
+        case_errors = schema.validate(case)
+        if case_errors:
+            invalid += 1
+            errors += len(case_errors)
+            for path, message in case_errors:
+                out.write(f"case {i}: {path or '<root>'}: {message}\n")
+                counts[path] = counts.get(path, 0) + 1
+    if args.summary and counts:
+        for path, count in sorted(counts.items(), key=lambda item: -item[1]):
+            _report(args, f"{count:>8}  {path or '<root>'}")
+    _report(args, f"Validated {total} case(s): {invalid} invalid, {errors} error(s)")
+    return EXIT_INVALID if invalid else 0
+
+
+def cmd_convert(args: argparse.Namespace) -> int:
+    cases: Iterable[Any] = read_cases(args.inputs)
+    if args.flatten or args.unflatten:
+        from jsonviewer.flatten import flatten_dict, unflatten_dict
+        transform: Callable[[Any], Any] = flatten_dict if args.flatten else unflatten_dict
+        cases = (transform(case) if isinstance(case, dict) else case for case in cases)
+    counter = Counter(cases)
+    write_cases(counter, args.output, args.format, args.gzip)
+    _report(args, f"Converted {counter.count} case(s) to {EXPORT_FORMATS[args.format]}")
+    return 0
+
+
+def cmd_dedup(args: argparse.Namespace) -> int:
+    from jsonviewer.dedup import canonical_key
+
+    # Only the 16-byte digests of the cases seen so far are held in memory
+    def unique(cases: Iterable[Any]) -> Iterator[Any]:
+        seen = set()
+        for case in cases:
+            key = canonical_key(case)
+            if key not in seen:
+                seen.add(key)
+                yield case
+
+    cases = Counter(read_cases(args.inputs))
+    kept = Counter(unique(cases))
+    write_cases(kept, args.output, args.format, args.gzip)
+    _report(args, f"Kept {kept.count} of {cases.count} case(s), dropped {cases.count - kept.count} duplicate(s)")
+    return 0
+
+
+def cmd_template(args: argparse.Namespace) -> int:
+    from jsonviewer.templates import DEFAULT_TEST_CASE, get_default_json_structure
+    template = get_default_json_structure() if args.null else DEFAULT_TEST_CASE
+    write_cases([template] * args.count, args.output, args.format, args.gzip)
+    return 0
+
+
+def cmd_diff(args: argparse.Namespace) -> int:
+    from jsonviewer.diff import UNCHANGED, DiffSummary, diff_suites
+    summary = DiffSummary()
+    diffs = summary.track(diff_suites(read_cases([args.old]), read_cases([args.new]), args.align))
+    records = (diff.to_json() for diff in diffs if args.all or diff.status != UNCHANGED)
+    write_cases(records, args.output, 'ndjson', args.gzip)
+    for path, count in summary.top_fields(args.top):
+        _report(args, f"{count:>8}  {path}")
+    _report(args, ", ".join(f"{count} {status}" for status, count in summary.statuses.items()))
+    return EXIT_INVALID if summary.differences else 0
+
+
+def cmd_merge(args: argparse.Namespace) -> int:
+    from jsonviewer.diff import merge_suites
+    conflicts = 0
+    conflict_file = open(args.conflicts, 'w') if args.conflicts else None
+
+    def merged_cases() -> Iterator[Any]:
+        nonlocal conflicts
+        for merged in merge_suites(read_cases([args.base]), read_cases([args.ours]),
+                                   read_cases([args.theirs]), args.align):
+            for conflict in merged.conflicts:
+                conflicts += 1
+                record = codec.dumps(conflict.to_json())
+                if conflict_file:
+                    conflict_file.write(record + '\n')
+                else:
+                    _report(args, f"conflict: {record}")
+            yield merged.case
+
+    try:
+        counter = Counter(merged_cases())
+        write_cases(counter, args.output, args.format, args.gzip)
+    finally:
+        if conflict_file:
+            conflict_file.close()
+    _report(args, f"Merged {counter.count} case(s) with {conflicts} conflict(s)")
+    return EXIT_INVALID if conflicts else 0
+
+
+def cmd_regress(args: argparse.Namespace) -> int:
+    from jsonviewer.cleaning import clean_form
+    from jsonviewer.executor import execute_suite
+    from jsonviewer.golden import compare_run, golden_records, load_golden, parse_tolerances, record_golden
+
+    tolerances = parse_tolerances(','.join(args.tolerance))
+    # Cases are sent cleaned, as the API tester sends them
+    cases = [cleaned for cleaned, is_empty in map(clean_form, read_cases(args.inputs)) if not is_empty]
+    if not cases:
+        raise ValueError("No non-empty cases to send")
+    results = execute_suite(cases, args.url, concurrency=args.concurrency, wrap_in_list=not args.unwrapped)
+
+    if args.record or not os.path.exists(args.golden):
+        golden = record_golden(cases, results)
+        write_cases(golden_records(golden), args.golden, 'ndjson', args.golden.endswith('.gz'))
+        _report(args, f"Recorded {len(golden)} golden response(s) from {len(results)} request(s)")
+        return 0
+
+    golden = load_golden(read_cases([args.golden]))
+    report = compare_run(cases, results, golden, tolerances, workers=args.workers)
+    write_cases((drift.to_json() for drift in report.drifts), args.output, 'ndjson', args.gzip)
+    for path, count in report.top_fields(args.top):
+        _report(args, f"{count:>8}  {path}")
+    _report(args, ", ".join(f"{count} {outcome}" for outcome, count in report.counts.items()))
+    return 0 if report.passed else EXIT_INVALID
+
+
+def cmd_transform(args: argparse.Namespace) -> int:
+    from jsonviewer.transform import Pipeline, TransformReport, preview, transformed_cases
+    texts = list(args.step)
+    if args.steps:
+        with open(args.steps, encoding='utf-8') as steps_file:
+            texts.insert(0, steps_file.read())
+    pipeline = Pipeline('\n'.join(texts))
+    if args.dry_run:
+        report, _ = preview(pipeline, read_cases(args.inputs), workers=args.workers)
+    else:
+        report = TransformReport(pipeline.steps)
+        write_cases(transformed_cases(pipeline, read_cases(args.inputs), report, workers=args.workers),
+                    args.output, args.format, args.gzip)
+    for row in report.rows():
+        _report(args, f"{row['changed']:>8} changed {row['skipped']:>8} skipped  {row['step']}")
+    _report(args, f"{'Would change' if args.dry_run else 'Changed'} {report.cases_changed} "
+                  f"of {report.cases} case(s)")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m jsonviewer", description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True, metavar='COMMAND')
+
+    # Options shared by the commands that write a suite
+    output = argparse.ArgumentParser(add_help=False)
+    output.add_argument("-o", "--output", default='-', help="Output file (default: stdout)")
+    output.add_argument("--format", choices=list(EXPORT_FORMATS), default='json', help="Output format")
+    output.add_argument("--gzip", action='store_true', help="Gzip the output (implied by a .gz output name)")
+
+    inputs = argparse.ArgumentParser(add_help=False)
+    inputs.add_argument("inputs", nargs='*', metavar='INPUT', help="Suite files, or '-' for stdin (default)")
+    inputs.add_argument("-q", "--quiet", action='store_true', help="Do not print a summary to stderr")
+
+    clean = commands.add_parser('clean', parents=[inputs, output], help="Drop null and empty values")
+    clean.set_defaults(handler=cmd_clean)
+
+    validate = commands.add_parser('validate', parents=[inputs], help="Check cases against the template")
+    validate.add_argument("--allow-missing", action='store_true', help="Accept cases missing template fields")
+    validate.add_argument("--allow-extra", action='store_true', help="Accept fields not in the template")
+    validate.add_argument("--no-null", action='store_true', help="Reject null values")
+    validate.add_argument("--summary", action='store_true', help="Count errors per field on stderr")
+    validate.set_defaults(handler=cmd_validate)
+
+    convert = commands.add_parser('convert', parents=[inputs, output], help="Re-encode a suite")
+    shape = convert.add_mutually_exclusive_group()
+    shape.add_argument("--flatten", action='store_true', help="Flatten cases to dotted keys")
+    shape.add_argument("--unflatten", action='store_true', help="Rebuild nested cases from dotted keys")
+    convert.set_defaults(handler=cmd_convert)
+
+    dedup = commands.add_parser('dedup', parents=[inputs, output], help="Drop exact duplicates")
+    dedup.set_defaults(handler=cmd_dedup)
+
+    template = commands.add_parser('template', parents=[output], help="Write a template case")
+    template.add_argument("--null", action='store_true', help="Write the all-null structure")
+    template.add_argument("--count", type=int, default=1, help="Number of copies")
+    template.set_defaults(handler=cmd_template, quiet=True)
+
+    align_help = "Pair cases by 'position', content 'hash' or a dotted id field (default: position)"
+    diff = commands.add_parser('diff', help="Report changes between two suites")
+    diff.add_argument("old", help="Previous suite")
+    diff.add_argument("new", help="Current suite")
+    diff.add_argument("--align", default='position', help=align_help)
+    diff.add_argument("--all", action='store_true', help="Report unchanged cases too")
+    diff.add_argument("--top", type=int, default=10, help="Most changed fields to list on stderr")
+    diff.add_argument("-o", "--output", default='-', help="Report file (default: stdout)")
+    diff.add_argument("--gzip", action='store_true', help="Gzip the report (implied by a .gz output name)")
+    diff.add_argument("-q", "--quiet", action='store_true', help="Do not print a summary to stderr")
+    diff.set_defaults(handler=cmd_diff)
+
+    merge = commands.add_parser('merge', parents=[output], help="Three-way merge of two suites")
+    merge.add_argument("base", help="Common ancestor suite")
+    merge.add_argument("ours", help="Our suite; its order and values win on conflicts")
+    merge.add_argument("theirs", help="Their suite")
+    merge.add_argument("--align", default='position', help=align_help.replace("content 'hash' or ", ""))
+    merge.add_argument("--conflicts", help="Write conflicts as NDJSON here instead of stderr")
+    merge.add_argument("-q", "--quiet", action='store_true', help="Do not print a summary to stderr")
+    merge.set_defaults(handler=cmd_merge)
+
+    regress = commands.add_parser('regress', parents=[inputs], help="Compare API responses with golden ones")
+    regress.add_argument("--url", required=True, help="Health-score endpoint")
+    regress.add_argument("--golden", required=True, help="Golden responses (NDJSON); recorded if it does not exist")
+    regress.add_argument("--record", action='store_true', help="Overwrite the golden responses with this run")
+    regress.add_argument("--tolerance", action='append', default=[], metavar='PATTERN=VALUE[%]',
+                         help="Allowed numeric difference per field pattern, e.g. 'sections.*=1%%'; repeatable")
+    regress.add_argument("--concurrency", type=int, default=16, help="Requests in flight")
+    regress.add_argument("--unwrapped", action='store_true', help="Send cases as objects, not one-element arrays")
+    regress.add_argument("--workers", type=int, help="Comparison processes (default: one per CPU)")
+    regress.add_argument("--top", type=int, default=10, help="Most drifted fields to list on stderr")
+    regress.add_argument("-o", "--output", default='-', help="Drift report file (default: stdout)")
+    regress.add_argument("--gzip", action='store_true', help="Gzip the report (implied by a .gz output name)")
+    regress.set_defaults(handler=cmd_regress)
+
+    transform = commands.add_parser('transform', parents=[inputs, output], help="Bulk-rewrite cases")
+    transform.add_argument("-s", "--step", action='append', default=[], metavar='STEP',
+                           help="A step such as 'rename nut.sfat -> nut.saturated_fat'; repeatable")
+    transform.add_argument("--steps", metavar='FILE', help="File of steps, one per line")
+    transform.add_argument("--dry-run", action='store_true', help="Only count the cases each step would change")
+    transform.add_argument("--workers", type=int, help="Transform processes (default: one per CPU)")
+    transform.set_defaults(handler=cmd_transform)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if 'output' in args:
+        args.gzip = args.gzip or args.output.endswith('.gz')
+    try:
+        return args.handler(args)
+    except BrokenPipeError:
+        # The reader went away, as with `| head`; silence the flush at exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    except (ValueError, OSError) as e:
+        # json.JSONDecodeError is a ValueError
+        print(f"error: {e}", file=sys.stderr)
+        return EXIT_ERROR
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""JSON encode/decode through the fastest installed backend
+
+orjson is used when it is installed and stdlib json otherwise. Either way the
+results match the stdlib calls the apps used before: loads behaves like
+json.loads (including its errors), and dumps produces the same text as
+json.dumps with indent=2 or compact separators. Where orjson would format a
+document differently (non-ASCII or DEL characters, exponent floats, non-string
+keys, integers beyond 64 bits) that document goes through the stdlib instead.
+
+The one exception is NaN/Infinity, which are not valid JSON: the stdlib writes
+them as bare NaN/Infinity tokens and orjson writes null.
+
+Set JSONVIEWER_JSON_BACKEND=json to force the stdlib backend.
+"""
+import json
+import os
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+JSONDecodeError = json.JSONDecodeError
+
+COMPACT_SEPARATORS = (',', ':')
+
+# Mapping digits to '0' turns the checks below into plain substring searches
+_DIGITS_TO_ZERO = bytes.maketrans(b'123456789', b'000000000')
+# The checks map one window at a time rather than copying the whole document
+_SCAN_WINDOW = 1 << 16
+# orjson writes 1e16 / 1e-7 / 0.00001 where repr() gives 1e+16 / 1e-07 / 1e-05
+_EXPONENT = b'0e'
+_SMALL_DECIMAL = b'0.0000'
+# orjson reads integers beyond 64 bits as floats; the stdlib keeps them exact
+_LONG_NUMBER = b'0' * 19
+
+BACKEND = 'orjson' if orjson is not None and os.environ.get('JSONVIEWER_JSON_BACKEND') != 'json' else 'json'
+
+
+def _contains_digit_pattern(data: Union[str, bytes], pattern: bytes) -> bool:
+    """Whether data contains pattern once every digit is read as '0'"""
+    overlap = len(pattern) - 1
+    for start in range(0, len(data), _SCAN_WINDOW):
+        window = data[start:start + _SCAN_WINDOW + overlap]
+        if isinstance(window, str):
+            window = window.encode('utf-8', 'surrogatepass')
+        if pattern in window.translate(_DIGITS_TO_ZERO):
+            return True
+    return False
+
+
+def _stdlib_dumps(obj: Any, pretty: bool, sort_keys: bool) -> str:
+    if pretty:
+        return json.dumps(obj, indent=2, sort_keys=sort_keys)
+    return json.dumps(obj, separators=COMPACT_SEPARATORS, sort_keys=sort_keys)
+
+
+def _stdlib_loads(data: Union[str, bytes]) -> Any:
+    return json.loads(data)
+
+
+if BACKEND == 'orjson':
+    _OPTIONS = {
+        (False, False): 0,
+        (True, False): orjson.OPT_INDENT_2,
+        (False, True): orjson.OPT_SORT_KEYS,
+        (True, True): orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS,
+    }
+
+    def _fast_dumps(obj: Any, pretty: bool, sort_keys: bool) -> bytes:
+        """Encode with orjson, or return None when the stdlib output would differ"""
+        try:
+            data = orjson.dumps(obj, option=_OPTIONS[pretty, sort_keys])
+        except TypeError:
+            return None
+        if not data.isascii() or b'\x7f' in data or _SMALL_DECIMAL in data:
+            return None
+        if _contains_digit_pattern(data, _EXPONENT):
+            return None
+        return data
+
+    def loads(data: Union[str, bytes]) -> Any:
+        """Parse JSON text or UTF-8 bytes, like json.loads"""
+        try:
+            if _contains_digit_pattern(data, _LONG_NUMBER):
+                return _stdlib_loads(data)
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # The stdlib also accepts NaN, huge numbers and lone surrogates,
+            # and raises the error messages the apps show
+            return _stdlib_loads(data)
+
+    def dumps(obj: Any, pretty: bool = False, sort_keys: bool = False) -> str:
+        """Encode like json.dumps with indent=2 (pretty) or compact separators"""
+        data = _fast_dumps(obj, pretty, sort_keys)
+        if data is None:
+            return _stdlib_dumps(obj, pretty, sort_keys)
+        return data.decode('ascii')
+
+    def dumps_bytes(obj: Any, pretty: bool = False, sort_keys: bool = False) -> bytes:
+        """Encode to UTF-8 bytes, same text as dumps()"""
+        data = _fast_dumps(obj, pretty, sort_keys)
+        if data is None:
+            return _stdlib_dumps(obj, pretty, sort_keys).encode('utf-8')
+        return data
+
+else:
+    loads = _stdlib_loads
+
+    def dumps(obj: Any, pretty: bool = False, sort_keys: bool = False) -> str:
+        """Encode like json.dumps with indent=2 (pretty) or compact separators"""
+        return _stdlib_dumps(obj, pretty, sort_keys)
+
+    def dumps_bytes(obj: Any, pretty: bool = False, sort_keys: bool = False) -> bytes:
+        """Encode to UTF-8 bytes, same text as dumps()"""
+        return _stdlib_dumps(obj, pretty, sort_keys).encode('utf-8')
@@ -0,0 +1,526 @@
+"""Schema-aware columnar storage for suites of health-score test cases
+
+Cases that follow the template's layout are stored one array per field:
+numbers as integers scaled by a per-column power of ten in the narrowest
+integer type that round-trips them exactly (float64 when none does), booleans
+as bools and list fields as interned compact JSON bytes. A byte of flags per
+cell marks null and absent fields, overflow values and numbers written as
+integers, so rows decode back to exactly the dicts that were stored, key
+order included.
+
+Values that do not fit their column (strings in a number field, integers
+beyond float precision) are kept per cell as overflow; cases whose keys are
+out of template order, unknown or empty sections are kept whole as JSON.
+"""
+import sys
+from collections.abc import MutableSequence
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from jsonviewer import codec
+from jsonviewer.cleaning import remove_null_values
+from jsonviewer.templates import DEFAULT_TEST_CASE
+
+BATCH_SIZE = 4096
+INITIAL_CAPACITY = 64
+
+# Per-cell flags
+NULL = 1
+ABSENT = 2
+OVERFLOW = 4
+INTEGER = 8
+
+# Decimal places tried before a number column falls back to float64
+MAX_SCALE = 6
+# Integers beyond this magnitude do not survive a float64 round trip
+_MAX_EXACT_INT = 2 ** 53
+_INT_TYPES = (np.int8, np.int16, np.int32, np.int64)
+_EMPTY_LIST = b'[]'
+
+Extra = Union[None, bytes, Dict[int, Any]]
+
+
+def _int_type(low: int, high: int) -> type:
+    for dtype in _INT_TYPES:
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return dtype
+    return np.int64
+
+
+class _NumberColumn:
+    """Numbers stored as value * 10**scale integers, or raw float64 when scale is None"""
+
+    __slots__ = ('data', 'scale')
+
+    def __init__(self, capacity: int):
+        self.data = np.zeros(capacity, dtype=np.int8)
+        self.scale: Optional[int] = 0
+
+    def _fit(self, values: np.ndarray) -> Optional[int]:
+        """Smallest scale, not below the current one, at which values round-trip"""
+        if not np.isfinite(values).all() or np.signbit(values[values == 0]).any():
+            return None
+        for scale in range(self.scale, MAX_SCALE + 1):
+            factor = 10.0 ** scale
+            scaled = np.rint(values * factor)
+            if np.abs(scaled).max(initial=0) <= _MAX_EXACT_INT and (scaled / factor == values).all():
+                return scale
+        return None
+
+    def write(self, start: int, values: np.ndarray, length: int):
+        """Store float64 values at start, rescaling or widening the column as needed"""
+        stop = start + len(values)
+        scale = None if self.scale is None else self._fit(values)
+        data = self.data
+        if scale is not None:
+            low, high = int(data[:length].min(initial=0)), int(data[:length].max(initial=0))
+        if scale is not None and scale > self.scale:
+            factor = 10 ** (scale - self.scale)
+            low, high = low * factor, high * factor
+            if max(-low, high) > _MAX_EXACT_INT:
+                scale = None
+        if scale is None:
+            if self.scale is not None:
+                raw = np.zeros(len(data), dtype=np.float64)
+                raw[:length] = self.decode(0, length)
+                self.data = raw
+                self.scale = None
+            self.data[start:stop] = values
+            return
+
+        encoded = np.rint(values * 10.0 ** scale).astype(np.int64)
+        if scale > self.scale:
+            data = data.astype(np.int64) * 10 ** (scale - self.scale)
+            self.scale = scale
+        dtype = _int_type(min(low, int(encoded.min(initial=0))), max(high, int(encoded.max(initial=0))))
+        if data.dtype != dtype:
+            data = data.astype(dtype)
+        data[start:stop] = encoded
+        self.data = data
+
+    def decode(self, start: int, stop: int) -> np.ndarray:
+        data = self.data[start:stop]
+        if self.scale is None:
+            return data
+        return data / 10.0 ** self.scale if self.scale else data.astype(np.float64)
+
+
+class _ObjectColumn:
+    """Booleans, or list fields as interned JSON bytes"""
+
+    __slots__ = ('data', 'interned')
+
+    def __init__(self, capacity: int, dtype):
+        if dtype is object:
+            self.data = np.full(capacity, _EMPTY_LIST, dtype=object)
+            self.interned: Optional[Dict[bytes, bytes]] = {_EMPTY_LIST: _EMPTY_LIST}
+        else:
+            self.data = np.zeros(capacity, dtype=dtype)
+            self.interned = None
+
+    def write(self, start: int, values: List[Any], length: int):
+        self.data[start:start + len(values)] = values
+
+    def decode(self, start: int, stop: int) -> np.ndarray:
+        return self.data[start:stop]
+
+
+def _column_for(value: Any, capacity: int):
+    if isinstance(value, bool):
+        return _ObjectColumn(capacity, np.bool_)
+    if isinstance(value, (int, float)):
+        return _NumberColumn(capacity)
+    if isinstance(value, list):
+        return _ObjectColumn(capacity, object)
+    raise ValueError(f"Unsupported template value for compact storage: {value!r}")
+
+
+class CompactSchema:
+    """Field paths and nesting of a template, with its leaves in template order"""
+
+    def __init__(self, template: Dict = DEFAULT_TEST_CASE):
+        self.paths: List[str] = []
+        self.defaults: List[Any] = []
+        self.tree = self._build(template, ())
+
+    def _build(self, node: Dict, prefix: Tuple[str, ...]) -> Tuple[Dict[str, int], List[Tuple[str, Any]]]:
+        """Return (key -> position, [(key, column or subtree)]) for one section"""
+        positions = {}
+        children = []
+        for key, value in node.items():
+            positions[key] = len(children)
+            if isinstance(value, dict) and value:
+                children.append((key, self._build(value, prefix + (key,))))
+                continue
+            children.append((key, len(self.paths)))
+            self.paths.append('.'.join(prefix + (key,)))
+            self.defaults.append(value)
+        return positions, children
+
+    @property
+    def width(self) -> int:
+        return len(self.paths)
+
+
+class CompactSuite(MutableSequence):
+    """List-like suite stored as typed columns with per-cell null/absent flags
+
+    Indexing returns a freshly decoded dict; assign it back to change a case.
+    """
+
+    def __init__(self, cases: Iterable[Any] = (), template: Dict = DEFAULT_TEST_CASE,
+                 schema: Optional[CompactSchema] = None):
+        self.schema = schema or CompactSchema(template)
+        self._length = 0
+        self._columns = [_column_for(value, INITIAL_CAPACITY) for value in self.schema.defaults]
+        self._numbers = [isinstance(column, _NumberColumn) for column in self._columns]
+        self._lists = [getattr(column, 'interned', None) is not None for column in self._columns]
+        self._flags = np.full((INITIAL_CAPACITY, self.schema.width), ABSENT, dtype=np.uint8)
+        # None, a {column: value} dict of overflow cells, or a whole case as JSON bytes
+        self._extra: List[Extra] = []
+        self.extend(cases)
+
+    def _reserve(self, rows: int):
+        """Grow every column by a quarter, or more, so rows more cases fit"""
+        capacity = len(self._flags)
+        needed = self._length + rows
+        if needed <= capacity:
+            return
+        capacity = max(needed, capacity + capacity // 4)
+        for column in self._columns:
+            old = column.data
+            column.data = np.zeros(capacity, dtype=old.dtype) if old.dtype != object else \
+                np.full(capacity, _EMPTY_LIST, dtype=object)
+            column.data[:self._length] = old[:self._length]
+        flags = np.full((capacity, self.schema.width), ABSENT, dtype=np.uint8)
+        flags[:self._length] = self._flags[:self._length]
+        self._flags = flags
+
+    # Encoding
+
+    def _encode_batch(self, cases: List[Any]) -> Tuple[List[List[Any]], np.ndarray, List[Extra]]:
+        """Column-major cell values, flags and extras for a batch of cases"""
+        n = len(cases)
+        cells = [[0] * n if number else [_EMPTY_LIST if is_list else False] * n
+                 for number, is_list in zip(self._numbers, self._lists)]
+        flags = np.full((n, self.schema.width), ABSENT, dtype=np.uint8)
+        extras: List[Extra] = [None] * n
+        for row, case in enumerate(cases):
+            row_flags = bytearray(b'\x02' * self.schema.width)
+            extra: Dict[int, Any] = {}
+            if isinstance(case, dict) and self._encode_section(case, self.schema.tree, row, cells,
+                                                               row_flags, extra):
+                flags[row] = np.frombuffer(row_flags, dtype=np.uint8)
+                extras[row] = extra or None
+            else:
+                extras[row] = codec.dumps_bytes(case)
+        return cells, flags, extras
+
+    def _encode_section(self, node: Dict, tree, row: int, cells: List[List[Any]],
+                        flags: bytearray, extra: Dict[int, Any]) -> bool:
+        positions, children = tree
+        # Keys must appear in template order; missing keys are flagged absent
+        next_position = 0
+        for key, value in node.items():
+            position = positions.get(key)
+            if position is None or position < next_position:
+                return False
+            next_position = position + 1
+            column = children[position][1]
+            if not isinstance(column, int):
+                # An empty section would decode as missing, so keep the case whole
+                if not isinstance(value, dict) or not value:
+                    return False
+                if not self._encode_section(value, column, row, cells, flags, extra):
+                    return False
+                continue
+
+            if value is None:
+                flags[column] = NULL
+                continue
+            value_type = type(value)
+            if self._numbers[column]:
+                if value_type is float:
+                    cells[column][row] = value
+                    flags[column] = 0
+                    continue
+                if value_type is int and -_MAX_EXACT_INT <= value <= _MAX_EXACT_INT:
+                    cells[column][row] = value
+                    flags[column] = INTEGER
+                    continue
+            elif self._lists[column]:
+                if value_type is list:
+                    encoded = codec.dumps_bytes(value) if value else _EMPTY_LIST
+                    cells[column][row] = self._columns[column].interned.setdefault(encoded, encoded)
+                    flags[column] = 0
+                    continue
+            elif value_type is bool:
+                cells[column][row] = value
+                flags[column] = 0
+                continue
+            flags[column] = OVERFLOW
+            extra[column] = value
+        return True
+
+    def _store(self, start: int, cases: List[Any]):
+        cells, flags, extras = self._encode_batch(cases)
+        for column, values, number in zip(self._columns, cells, self._numbers):
+            if number:
+                column.write(start, np.array(values, dtype=np.float64), self._length)
+            else:
+                column.write(start, values, self._length)
+        self._flags[start:start + len(cases)] = flags
+        self._extra[start:start + len(cases)] = extras
+
+    # Decoding
+
+    def _decode_rows(self, start: int, stop: int) -> List[Any]:
+        columns = [column.decode(start, stop).tolist() for column in self._columns]
+        flags = self._flags[start:stop].tolist()
+        numbers = self._numbers
+        lists = self._lists
+        row_flags: List[int] = []
+        offset = 0
+        extra: Extra = None
+
+        def build(tree) -> Dict:
+            section = {}
+            for key, child in tree[1]:
+                if not isinstance(child, int):
+                    value = build(child)
+                    if value:
+                        section[key] = value
+                    continue
+                flag = row_flags[child]
+                if flag & ABSENT:
+                    continue
+                if flag & NULL:
+                    section[key] = None
+                elif flag & OVERFLOW:
+                    section[key] = extra[child]
+                elif numbers[child]:
+                    number = columns[child][offset]
+                    section[key] = int(number) if flag & INTEGER else float(number)
+                elif lists[child]:
+                    section[key] = codec.loads(columns[child][offset])
+                else:
+                    section[key] = columns[child][offset]
+            return section
+
+        cases = []
+        for offset, row in enumerate(range(start, stop)):
+            extra = self._extra[row]
+            if isinstance(extra, bytes):
+                cases.append(codec.loads(extra))
+                continue
+            row_flags = flags[offset]
+            cases.append(build(self.schema.tree))
+        return cases
+
+    # Sequence protocol
+
+    def __len__(self) -> int:
+        return self._length
+
+    def _row(self, i: int) -> int:
+        if i < 0:
+            i += self._length
+        if not 0 <= i < self._length:
+            raise IndexError("CompactSuite index out of range")
+        return i
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(self._length)
+            if step == 1:
+                return self._decode_rows(start, max(start, stop))
+            return [self._decode_rows(row, row + 1)[0] for row in range(start, stop, step)]
+        row = self._row(i)
+        return self._decode_rows(row, row + 1)[0]
+
+    def __iter__(self) -> Iterator[Any]:
+        for start in range(0, self._length, BATCH_SIZE):
+            yield from self._decode_rows(start, min(start + BATCH_SIZE, self._length))
+
+    def __setitem__(self, i, case):
+        if isinstance(i, slice):
+            raise TypeError("CompactSuite does not support slice assignment")
+        self._store(self._row(i), [case])
+
+    def __delitem__(self, i):
+        if isinstance(i, slice):
+            rows = range(*i.indices(self._length))
+        else:
+            row = self._row(i)
+            rows = range(row, row + 1)
+        self.delete_many(rows)
+
+    def delete_many(self, rows: Iterable[int]):
+        """Delete the cases at the given positions in one pass over the columns"""
+        keep = np.ones(self._length, dtype=bool)
+        keep[np.fromiter(rows, dtype=np.int64)] = False
+        kept = int(keep.sum())
+        if kept == self._length:
+            return
+        for column in self._columns:
+            column.data[:kept] = column.data[:self._length][keep]
+            if column.data.dtype == object:
+                column.data[kept:self._length] = _EMPTY_LIST
+        self._flags[:kept] = self._flags[:self._length][keep]
+        self._extra = [extra for extra, kept_row in zip(self._extra, keep.tolist()) if kept_row]
+        self._length = kept
+
+    def insert(self, i: int, case: Any):
+        i = max(0, min(i + self._length if i < 0 else i, self._length))
+        self._reserve(1)
+        for column in self._columns:
+            column.data[i + 1:self._length + 1] = column.data[i:self._length]
+        self._flags[i + 1:self._length + 1] = self._flags[i:self._length]
+        self._extra.insert(i, None)
+        self._length += 1
+        self._store(i, [case])
+
+    def extend(self, cases: Iterable[Any]):
+        """Encode and append cases in batches, consuming iterators lazily"""
+        iterator = iter(cases)
+        while True:
+            batch = list(islice(iterator, BATCH_SIZE))
+            if not batch:
+                break
+            self._reserve(len(batch))
+            start = self._length
+            self._extra.extend([None] * len(batch))
+            self._store(start, batch)
+            self._length += len(batch)
+
+    def append(self, case: Any):
+        self.extend([case])
+
+    def clear(self):
+        del self[:]
+
+    # Column operations
+
+    def field(self, path: str, default: Any = None) -> Optional[List[Any]]:
+        """Values of one field across the suite, default where absent; None if not a column
+
+        Reads only that field's column, decoding just the whole-case rows.
+        """
+        if path not in self.schema.paths:
+            return None
+        column = self.schema.paths.index(path)
+        n = self._length
+        raw = self._columns[column].decode(0, n).tolist()
+        flags = self._flags[:n, column].tolist()
+        number = self._numbers[column]
+        is_list = self._lists[column]
+        parts = path.split('.')
+        values = []
+        for row, (value, flag) in enumerate(zip(raw, flags)):
+            extra = self._extra[row]
+            if isinstance(extra, bytes):
+                node = codec.loads(extra)
+                for part in parts:
+                    node = node.get(part, default) if isinstance(node, dict) else default
+                    if node is default:
+                        break
+                values.append(node)
+            elif flag & ABSENT:
+                values.append(default)
+            elif flag & NULL:
+                values.append(None)
+            elif flag & OVERFLOW:
+                values.append(extra[column])
+            elif number:
+                values.append(int(value) if flag & INTEGER else float(value))
+            elif is_list:
+                values.append(codec.loads(value))
+            else:
+                values.append(value)
+        return values
+
+    def null_mask(self, path: str) -> np.ndarray:
+        """Boolean mask of the cases holding null in one field"""
+        column = self.schema.paths.index(path)
+        return (self._flags[:self._length, column] & NULL) != 0
+
+    def null_counts(self) -> Dict[str, int]:
+        """Number of cases holding null in each field"""
+        counts = ((self._flags[:self._length] & NULL) != 0).sum(axis=0).tolist()
+        return dict(zip(self.schema.paths, counts))
+
+    def empty_rows(self) -> np.ndarray:
+        """Boolean mask of cases that have no fields at all"""
+        empty = ((self._flags[:self._length] & ABSENT) != 0).all(axis=1)
+        for row, extra in enumerate(self._extra):
+            if isinstance(extra, bytes):
+                empty[row] = extra in (b'{}', b'null')
+        return empty
+
+    def without_nulls(self) -> 'CompactSuite':
+        """Copy of the suite with null and empty values removed, as remove_null_values does
+
+        Null cells are dropped by turning their null flags into absent flags.
+        List values are cleaned once per distinct value, and only overflow
+        cells and whole-case rows are decoded. Cases left with no values
+        decode as {}; see empty_rows().
+        """
+        n = self._length
+        cleaned = CompactSuite(schema=self.schema)
+        cleaned._length = n
+        for new, old in zip(cleaned._columns, self._columns):
+            new.data = old.data[:max(n, 1)].copy()
+            if isinstance(old, _NumberColumn):
+                new.scale = old.scale
+        flags = cleaned._flags = self._flags[:max(n, 1)].copy()
+        flags[(flags & NULL) != 0] = ABSENT
+
+        for index, column in enumerate(cleaned._columns):
+            if not self._lists[index]:
+                continue
+            remapped = {}
+            for value in self._columns[index].interned:
+                cleaned_value = remove_null_values(codec.loads(value))
+                remapped[value] = codec.dumps_bytes(cleaned_value) if cleaned_value is not None else None
+            column.interned = {value: value for value in remapped.values() if value is not None}
+            column.interned.setdefault(_EMPTY_LIST, _EMPTY_LIST)
+            cells = column.data[:n]
+            present = (flags[:n, index] & (ABSENT | OVERFLOW)) == 0
+            for value, replacement in remapped.items():
+                if replacement == value:
+                    continue
+                matches = present & np.fromiter((cell is value for cell in cells), dtype=bool, count=n)
+                if replacement is None:
+                    flags[:n, index][matches] = ABSENT
+                else:
+                    cells[matches] = column.interned[replacement]
+
+        for row, extra in enumerate(self._extra):
+            if extra is None:
+                cleaned._extra.append(None)
+            elif isinstance(extra, bytes):
+                value = remove_null_values(codec.loads(extra))
+                cleaned._extra.append(codec.dumps_bytes({} if value is None else value))
+            else:
+                overflow = {}
+                for column, value in extra.items():
+                    value = remove_null_values(value)
+                    if value is None:
+                        flags[row, column] = ABSENT
+                    else:
+                        overflow[column] = value
+                cleaned._extra.append(overflow or None)
+        return cleaned
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the columns, flags, list values and extras"""
+        total = self._flags.nbytes + sys.getsizeof(self._extra)
+        for column, is_list in zip(self._columns, self._lists):
+            total += column.data.nbytes
+            if is_list:
+                total += sum(sys.getsizeof(value) for value in column.interned)
+        total += sum(sys.getsizeof(extra) for extra in self._extra if extra is not None)
+        return total
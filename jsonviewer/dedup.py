@@ -0,0 +1,254 @@
+"""Exact and near-duplicate detection across a suite, without comparing every pair
+
+Cases are compared in their cleaned form, so fields that are null or empty
+count the same as missing ones, as they do when a suite is exported.
+"""
+import hashlib
+from typing import Any, Dict, Iterable, List
+
+import numpy as np
+
+from jsonviewer import codec
+from jsonviewer.cleaning import remove_null_values
+
+DEFAULT_MAX_FIELDS = 2
+BATCH_SIZE = 4096
+# Rows sampled to rank fields by how many distinct values they hold
+CARDINALITY_SAMPLE = 2000
+# Distinct numbers whose hashes are remembered while hashing a suite
+MEMO_SIZE = 65536
+# Buckets larger than this are split on their own varying fields before pairs are compared
+MAX_BUCKET_SIZE = 256
+
+# Without these in its JSON, remove_null_values would leave a case unchanged
+# ("null" is matched case-insensitively, covering null strings too)
+_NULLISH_TOKENS = (b'[]', b'{}', b'""')
+
+
+def canonical_key(case: Any) -> bytes:
+    """Digest of a case's canonical form: null and empty values removed, keys sorted"""
+    canonical = codec.dumps_bytes(case, sort_keys=True)
+    if b'null' in canonical.lower() or any(token in canonical for token in _NULLISH_TOKENS):
+        canonical = codec.dumps_bytes(remove_null_values(case), sort_keys=True)
+    return hashlib.blake2b(canonical, digest_size=16).digest()
+
+
+def exact_duplicates(cases: Iterable[Any]) -> List[List[int]]:
+    """Groups of positions holding the same canonical case, each starting with the first occurrence"""
+    first: Dict[bytes, int] = {}
+    groups: Dict[int, List[int]] = {}
+    for position, case in enumerate(cases):
+        original = first.setdefault(canonical_key(case), position)
+        if original != position:
+            groups.setdefault(original, [original]).append(position)
+    return list(groups.values())
+
+
+def unique_cases(cases: Iterable[Any]) -> List[Any]:
+    """Cases with later exact duplicates dropped, in their original order"""
+    seen = set()
+    unique = []
+    for case in cases:
+        key = canonical_key(case)
+        if key not in seen:
+            seen.add(key)
+            unique.append(case)
+    return unique
+
+
+def redundant_positions(groups: Iterable[List[int]]) -> List[int]:
+    """Positions to delete so that one case of each group is kept"""
+    return sorted(position for group in groups for position in group[1:])
+
+
+def _value_hash(value: Any) -> int:
+    """32-bit hash of a leaf that keeps 0/1, -1/-2 and True/1/1.0 apart
+
+    hash() of a small int is the int itself, -1 shares -2's hash and
+    True == 1 == 1.0, so each JSON type is mixed with its own odd multiplier
+    and offset instead of using hash() as it is.
+    """
+    value_type = type(value)
+    if value_type is int or value_type is float:
+        # hash() folds big ints into 61 bits and -1 is the one value it
+        # remaps; both 32-bit halves are mixed in so neither is dropped
+        folded = (hash(value) if value != -1 else -1) & 0xFFFFFFFFFFFFFFFF
+        if value_type is int:
+            hashed = (folded & 0xFFFFFFFF) * 0x9E3779B1 + (folded >> 32) * 0xC2B2AE3D + 0x7F4A7C15
+        else:
+            hashed = (folded & 0xFFFFFFFF) * 0x85EBCA6B + (folded >> 32) * 0x27D4EB2F + 0x165667B1
+    elif value_type is bool:
+        hashed = 0x2F0E1EBA if value else 0x4F1BBCDC
+    elif value_type is str:
+        hashed = hash(value) ^ 0x2545F491
+    else:
+        hashed = hash(codec.dumps(value, sort_keys=True)) ^ 0x1B873593
+    hashed &= 0xFFFFFFFF
+    # 0 is reserved for a missing field
+    return hashed if hashed else 1
+
+
+def _hash_leaves(node: Dict, prefix: str, columns: Dict[str, int], hashes: List[int],
+                 memos: Dict[type, Dict[Any, int]]):
+    """Hash the leaves of a case as flatten_dict(remove_null_values(case)) would list them
+
+    Hashes of numbers are memoized per type, since health data repeats the
+    same few values; keys of one type cannot conflate 1 with 1.0 or True.
+    """
+    for key, value in node.items():
+        value_type = type(value)
+        # Numbers are by far the most common leaves, so they skip the null checks
+        if value_type is not float and value_type is not int and value_type is not bool:
+            if value is None:
+                continue
+            if value_type is dict:
+                _hash_leaves(value, f"{prefix}{key}.", columns, hashes, memos)
+                continue
+            if value_type is list:
+                value = remove_null_values(value)
+                if value is None:
+                    continue
+            elif value_type is str and (value == "" or value.lower() == "null"):
+                continue
+        path = f"{prefix}{key}"
+        column = columns.get(path)
+        if column is None:
+            column = columns[path] = len(columns)
+            hashes.append(0)
+        memo = memos.get(value_type)
+        if memo is None:
+            hashes[column] = _value_hash(value)
+            continue
+        hashed = memo.get(value)
+        if hashed is None:
+            if len(memo) >= MEMO_SIZE:
+                memo.clear()
+            hashed = memo[value] = _value_hash(value)
+        hashes[column] = hashed
+
+
+def field_hashes(cases: Iterable[Any]) -> np.ndarray:
+    """uint32 matrix of value hashes, one row per cleaned case and one column per field path
+
+    Missing fields hash to 0. Rows are collected in batches so the matrix is
+    the only per-case memory kept.
+    """
+    columns: Dict[str, int] = {}
+    memos: Dict[type, Dict[Any, int]] = {int: {}, float: {}}
+    blocks: List[np.ndarray] = []
+    batch: List[List[int]] = []
+
+    def flush():
+        block = np.zeros((len(batch), len(columns)), dtype=np.uint32)
+        for row, hashes in enumerate(batch):
+            block[row, :len(hashes)] = hashes
+        blocks.append(block)
+        batch.clear()
+
+    for case in cases:
+        hashes = [0] * len(columns)
+        if isinstance(case, dict):
+            _hash_leaves(case, '', columns, hashes, memos)
+        else:
+            _hash_leaves({'': remove_null_values(case)}, '', columns, hashes, memos)
+        batch.append(hashes)
+        if len(batch) >= BATCH_SIZE:
+            flush()
+    if batch:
+        flush()
+
+    matrix = np.zeros((sum(len(block) for block in blocks), len(columns)), dtype=np.uint32)
+    start = 0
+    for block in blocks:
+        matrix[start:start + len(block), :block.shape[1]] = block
+        start += len(block)
+    return matrix
+
+
+def _find(parents: List[int], i: int) -> int:
+    while parents[i] != i:
+        parents[i] = parents[parents[i]]
+        i = parents[i]
+    return i
+
+
+def _deal_fields(hashes: np.ndarray, columns: np.ndarray, count: int) -> List[np.ndarray]:
+    """Deal columns into count groups from the most to the least varied
+
+    This keeps any one group from being made only of near-constant fields,
+    which would put most cases in one bucket.
+    """
+    sample = hashes[:CARDINALITY_SAMPLE]
+    cardinality = [len(np.unique(sample[:, column])) for column in columns]
+    ranked = columns[np.argsort(cardinality, kind='stable')[::-1]]
+    return [ranked[g::count] for g in range(count)]
+
+
+def _buckets(hashes: np.ndarray, rows: np.ndarray, columns: np.ndarray,
+             rng: np.random.Generator) -> List[np.ndarray]:
+    """Split rows into buckets agreeing on every one of the columns, leaving out single rows"""
+    multipliers = rng.integers(1, 2 ** 63, size=len(columns), dtype=np.uint64) | np.uint64(1)
+    signatures = (hashes[np.ix_(rows, columns)].astype(np.uint64) * multipliers).sum(axis=1, dtype=np.uint64)
+    order = np.argsort(signatures, kind='stable')
+    bounds = np.flatnonzero(np.diff(signatures[order])) + 1
+    return [bucket for bucket in np.split(rows[order], bounds) if len(bucket) > 1]
+
+
+def near_duplicates(cases: Iterable[Any], max_fields: int = DEFAULT_MAX_FIELDS) -> List[List[int]]:
+    """Clusters of cases linked by pairs that differ in at most max_fields fields
+
+    Fields are split into max_fields + 1 groups; two cases within the limit
+    must agree on every field of at least one group, so only cases sharing a
+    group signature are compared. Buckets above MAX_BUCKET_SIZE are split the
+    same way on the fields that vary inside them, so comparing pairs stays
+    quadratic only in small buckets. Exact duplicates are clustered too.
+    """
+    hashes = field_hashes(cases)
+    n = len(hashes)
+    if n < 2:
+        return []
+
+    # Fields equal across the suite can never tell two cases apart
+    varying = np.flatnonzero((hashes != hashes[0]).any(axis=0))
+    if len(varying) <= max_fields:
+        return [list(range(n))]
+    hashes = hashes[:, varying]
+
+    rng = np.random.default_rng(0)
+    parents = list(range(n))
+
+    def link(a: int, b: int):
+        a = _find(parents, a)
+        b = _find(parents, b)
+        if a != b:
+            parents[max(a, b)] = min(a, b)
+
+    rows = np.arange(n)
+    pending = [bucket
+               for group in _deal_fields(hashes, np.arange(hashes.shape[1]), max_fields + 1)
+               for bucket in _buckets(hashes, rows, group, rng)]
+    while pending:
+        bucket = pending.pop()
+        members = hashes[bucket]
+        if len(bucket) > MAX_BUCKET_SIZE:
+            inside = np.flatnonzero((members != members[0]).any(axis=0))
+            if len(inside) <= max_fields:
+                # The whole bucket differs in too few fields to need comparing
+                for position in bucket[1:].tolist():
+                    link(int(bucket[0]), position)
+                continue
+            # Two members within the limit still agree on one group of the fields varying here
+            split = [sub for group in _deal_fields(members, inside, max_fields + 1)
+                     for sub in _buckets(hashes, bucket, group, rng)]
+            if all(len(sub) < len(bucket) for sub in split):
+                pending.extend(split)
+                continue
+        for offset in range(len(bucket) - 1):
+            differences = (members[offset + 1:] != members[offset]).sum(axis=1)
+            for other in np.flatnonzero(differences <= max_fields).tolist():
+                link(int(bucket[offset]), int(bucket[offset + 1 + other]))
+
+    clusters: Dict[int, List[int]] = {}
+    for position in range(n):
+        clusters.setdefault(_find(parents, position), []).append(position)
+    return [cluster for cluster in clusters.values() if len(cluster) > 1]
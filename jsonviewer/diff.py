@@ -0,0 +1,314 @@
+"""Field-level diff and three-way merge of test suites, streamed case by case
+
+Cases are aligned by position, by an id field or by content hash. The suites
+that are looked up (the old one of a diff, base and theirs of a merge) are
+indexed in one pass; plain iterables are spilled to a compressed temporary
+file first, so only the index stays in memory while the other suite streams
+through and records are yielded as soon as each case is compared.
+"""
+from collections.abc import Sequence
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from jsonviewer import codec
+from jsonviewer.dedup import canonical_key
+from jsonviewer.flatten import MISSING, flatten_dict, unflatten_dict
+from jsonviewer.loader import SpilledCases
+
+ALIGN_POSITION = 'position'
+ALIGN_HASH = 'hash'
+
+ADDED = 'added'
+REMOVED = 'removed'
+CHANGED = 'changed'
+UNCHANGED = 'unchanged'
+STATUSES = (ADDED, REMOVED, CHANGED, UNCHANGED)
+
+
+class FieldChange(NamedTuple):
+    path: str
+    old: Any
+    new: Any
+
+
+class CaseDiff(NamedTuple):
+    status: str
+    key: Any
+    old_index: Optional[int]
+    new_index: Optional[int]
+    changes: List[FieldChange]
+
+    def to_json(self) -> Dict[str, Any]:
+        """Report record; absent sides and missing field values are left out"""
+        record: Dict[str, Any] = {'status': self.status}
+        if self.key is not None:
+            record['key'] = self.key
+        if self.old_index is not None:
+            record['old'] = self.old_index
+        if self.new_index is not None:
+            record['new'] = self.new_index
+        if self.changes:
+            record['fields'] = [_change_json(change._asdict()) for change in self.changes]
+        return record
+
+
+class Conflict(NamedTuple):
+    key: Any
+    path: str
+    base: Any
+    ours: Any
+    theirs: Any
+
+    def to_json(self) -> Dict[str, Any]:
+        return _change_json(self._asdict())
+
+
+class MergedCase(NamedTuple):
+    case: Any
+    conflicts: List[Conflict]
+
+
+def _change_json(fields: Dict[str, Any]) -> Dict[str, Any]:
+    return {name: value for name, value in fields.items() if value is not MISSING}
+
+
+def _same(a: Any, b: Any) -> bool:
+    """Equal as JSON values: True is not 1 and 1.0 is not 1"""
+    return a is b or (type(a) is type(b) and a == b)
+
+
+def _same_case(a: Any, b: Any) -> bool:
+    if a is b:
+        return True
+    if a is MISSING or b is MISSING:
+        return False
+    return codec.dumps_bytes(a, sort_keys=True) == codec.dumps_bytes(b, sort_keys=True)
+
+
+def _flat(case: Any) -> Dict[str, Any]:
+    return flatten_dict(case) if isinstance(case, dict) else {'': case}
+
+
+def field_changes(old: Any, new: Any) -> List[FieldChange]:
+    """Leaf-level changes between two cases, in old field order with new fields last"""
+    old_flat = _flat(old)
+    new_flat = _flat(new)
+    changes = [FieldChange(path, value, new_flat.get(path, MISSING))
+               for path, value in old_flat.items()
+               if not _same(value, new_flat.get(path, MISSING))]
+    changes.extend(FieldChange(path, MISSING, value)
+                   for path, value in new_flat.items() if path not in old_flat)
+    return changes
+
+
+class _Aligner:
+    """Turns each case of one suite into an index key and a label for reports
+
+    Repeated ids or hashes are numbered by occurrence, so the n-th copy in one
+    suite pairs with the n-th copy in the other.
+    """
+
+    def __init__(self, align: str):
+        self.align = align
+        self.parts = None if align in (ALIGN_POSITION, ALIGN_HASH) else align.split('.')
+        self.seen: Dict[Hashable, int] = {}
+
+    def __call__(self, case: Any, position: int) -> Tuple[Hashable, Any]:
+        if self.align == ALIGN_POSITION:
+            return position, None
+        if self.parts is None:
+            key = canonical_key(case)
+            label = None
+        else:
+            label = case
+            for part in self.parts:
+                if not isinstance(label, dict) or part not in label:
+                    label = None
+                    break
+                label = label[part]
+            key = codec.dumps(label, sort_keys=True)
+        occurrence = self.seen.get(key, 0)
+        self.seen[key] = occurrence + 1
+        return (key, occurrence), label
+
+
+def _index(cases: Iterable[Any], align: str) -> Tuple[Sequence, Dict[Hashable, Tuple[int, Any]]]:
+    """Random-access store of a suite and its key -> (position, label) index"""
+    store = cases if isinstance(cases, Sequence) else SpilledCases()
+    aligner = _Aligner(align)
+    index = {}
+    for position, case in enumerate(cases):
+        key, label = aligner(case, position)
+        index[key] = (position, label)
+        if store is not cases:
+            store.append(case)
+    return store, index
+
+
+def _compare(store: Sequence, old_index: int, new: Any, key: Any, new_index: int) -> CaseDiff:
+    # Identical text skips flattening; only key order or real edits get that far.
+    # Spilled cases are compared as stored bytes and only parsed when they differ.
+    new_bytes = codec.dumps_bytes(new)
+    if isinstance(store, SpilledCases):
+        if store.raw(old_index) == new_bytes:
+            return CaseDiff(UNCHANGED, key, old_index, new_index, [])
+        old = store[old_index]
+    else:
+        old = store[old_index]
+        if codec.dumps_bytes(old) == new_bytes:
+            return CaseDiff(UNCHANGED, key, old_index, new_index, [])
+    changes = field_changes(old, new)
+    return CaseDiff(CHANGED if changes else UNCHANGED, key, old_index, new_index, changes)
+
+
+def diff_suites(old: Iterable[Any], new: Iterable[Any], align: str = ALIGN_POSITION) -> Iterator[CaseDiff]:
+    """Yield one CaseDiff per case of either suite, as the new suite streams through
+
+    align is 'position', 'hash' or a dotted id field such as 'meta.id'. With
+    'hash', cases whose content moved are matched first; the old and new cases
+    left over, typically edited in place, are then paired in suite order.
+    """
+    store, index = _index(old, align)
+    aligner = _Aligner(align)
+    pending = SpilledCases() if align == ALIGN_HASH else None
+    pending_positions: List[int] = []
+
+    for position, case in enumerate(new):
+        key, label = aligner(case, position)
+        found = index.pop(key, None)
+        if found is not None and pending is not None:
+            # Equal hashes mean equal cleaned content, so there is nothing to compare
+            yield CaseDiff(UNCHANGED, label, found[0], position, [])
+        elif found is not None:
+            yield _compare(store, found[0], case, label, position)
+        elif pending is not None:
+            pending.append(case)
+            pending_positions.append(position)
+        else:
+            yield CaseDiff(ADDED, label, None, position, [])
+
+    removed = sorted(index.values(), key=lambda item: item[0])
+    if pending is not None:
+        paired = min(len(removed), len(pending_positions))
+        for (old_position, _), new_position, case in zip(removed, pending_positions, pending):
+            yield _compare(store, old_position, case, None, new_position)
+        for new_position in pending_positions[paired:]:
+            yield CaseDiff(ADDED, None, None, new_position, [])
+        removed = removed[paired:]
+        pending.close()
+    for old_position, label in removed:
+        yield CaseDiff(REMOVED, label, old_position, None, [])
+    if isinstance(store, SpilledCases) and store is not old:
+        store.close()
+
+
+class DiffSummary:
+    """Running counts of case statuses and of changes per field path"""
+
+    def __init__(self):
+        self.statuses = dict.fromkeys(STATUSES, 0)
+        self.fields: Dict[str, int] = {}
+
+    def track(self, diffs: Iterable[CaseDiff]) -> Iterator[CaseDiff]:
+        """Pass diffs through while counting them"""
+        for diff in diffs:
+            self.statuses[diff.status] += 1
+            for change in diff.changes:
+                self.fields[change.path] = self.fields.get(change.path, 0) + 1
+            yield diff
+
+    @property
+    def differences(self) -> int:
+        return self.statuses[ADDED] + self.statuses[REMOVED] + self.statuses[CHANGED]
+
+    def top_fields(self, limit: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Changed field paths, most often changed first"""
+        return sorted(self.fields.items(), key=lambda item: -item[1])[:limit]
+
+    def sections(self) -> Dict[str, int]:
+        """Field changes per top-level section (mhm, qlm, ...)"""
+        counts: Dict[str, int] = {}
+        for path, count in self.fields.items():
+            section = path.split('.', 1)[0]
+            counts[section] = counts.get(section, 0) + count
+        return dict(sorted(counts.items(), key=lambda item: -item[1]))
+
+
+def merge_cases(base: Any, ours: Any, theirs: Any, key: Any = None) -> Optional[MergedCase]:
+    """Three-way merge of one case; MISSING marks a side without it
+
+    Returns None when the case ends up deleted. Fields changed on one side
+    only are taken from that side; fields changed differently on both are
+    conflicts and keep our value. Deleting a case the other side edited is a
+    conflict that keeps the edited case.
+    """
+    if _same_case(ours, theirs):
+        return None if ours is MISSING else MergedCase(ours, [])
+    if _same_case(base, ours):
+        return None if theirs is MISSING else MergedCase(theirs, [])
+    if _same_case(base, theirs):
+        return None if ours is MISSING else MergedCase(ours, [])
+    if ours is MISSING or theirs is MISSING or not (isinstance(ours, dict) and isinstance(theirs, dict)):
+        kept = theirs if ours is MISSING else ours
+        return MergedCase(kept, [Conflict(key, '', base, ours, theirs)])
+
+    base_flat = flatten_dict(base) if isinstance(base, dict) else {}
+    ours_flat = flatten_dict(ours)
+    theirs_flat = flatten_dict(theirs)
+    merged = {}
+    conflicts = []
+    # Our field order, then fields only theirs has, then fields only base had
+    paths = list(ours_flat)
+    paths.extend(path for path in theirs_flat if path not in ours_flat)
+    paths.extend(path for path in base_flat if path not in ours_flat and path not in theirs_flat)
+    for path in paths:
+        b = base_flat.get(path, MISSING)
+        o = ours_flat.get(path, MISSING)
+        t = theirs_flat.get(path, MISSING)
+        if _same(o, t) or _same(b, t):
+            value = o
+        elif _same(b, o):
+            value = t
+        else:
+            conflicts.append(Conflict(key, path, b, o, t))
+            value = o
+        if value is not MISSING:
+            merged[path] = value
+    try:
+        return MergedCase(unflatten_dict(merged), conflicts)
+    except ValueError:
+        # One side turned a field into an object the other side kept as a value
+        return MergedCase(ours, [Conflict(key, '', base, ours, theirs)])
+
+
+def merge_suites(base: Iterable[Any], ours: Iterable[Any], theirs: Iterable[Any],
+                 align: str = ALIGN_POSITION) -> Iterator[MergedCase]:
+    """Yield the merged suite case by case: our order, then cases only theirs added
+
+    Cases are aligned by position or by an id field; content hashes change
+    with every edit, so they cannot pair the versions of a case.
+    """
+    if align == ALIGN_HASH:
+        raise ValueError("Three-way merge needs cases aligned by position or by an id field")
+    base_store, base_index = _index(base, align)
+    theirs_store, theirs_index = _index(theirs, align)
+    aligner = _Aligner(align)
+
+    for position, case in enumerate(ours):
+        key, label = aligner(case, position)
+        b = base_index.pop(key, None)
+        t = theirs_index.pop(key, None)
+        merged = merge_cases(base_store[b[0]] if b else MISSING, case,
+                             theirs_store[t[0]] if t else MISSING, label)
+        if merged is not None:
+            yield merged
+
+    # Cases we do not have: added by theirs, or deleted by us
+    for key, (position, label) in sorted(theirs_index.items(), key=lambda item: item[1][0]):
+        b = base_index.pop(key, None)
+        merged = merge_cases(base_store[b[0]] if b else MISSING, MISSING, theirs_store[position], label)
+        if merged is not None:
+            yield merged
+
+    for store, source in ((base_store, base), (theirs_store, theirs)):
+        if isinstance(store, SpilledCases) and store is not source:
+            store.close()
@@ -0,0 +1,284 @@
+"""Batch execution of test cases against the health-score API"""
+import asyncio
+import math
+import ssl
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from jsonviewer import codec
+
+DEFAULT_CONCURRENCY = 16
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_RETRIES = 2
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+# Least time between two progress reports, so a UI redraws a few times a second, not per request
+PROGRESS_INTERVAL = 0.1
+
+# (requests done, total or None while the cases are still streaming in)
+ProgressCallback = Callable[[int, Optional[int]], None]
+
+
+class HttpError(Exception):
+    """Transport-level failure talking to the endpoint"""
+
+
+class RateLimiter:
+    """Token bucket limiting requests per second across all workers"""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class ConnectionPool:
+    """Keep-alive HTTP/1.1 connections to one host, reused across requests"""
+
+    def __init__(self, url: str, size: int, timeout: float = DEFAULT_TIMEOUT):
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https'):
+            raise ValueError(f"Unsupported URL scheme: {parts.scheme or '(none)'}")
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == 'https' else 80)
+        self.ssl = ssl.create_default_context() if parts.scheme == 'https' else None
+        self.path = (parts.path or '/') + (f"?{parts.query}" if parts.query else '')
+        self.host_header = parts.netloc
+        self.timeout = timeout
+        self._idle: asyncio.LifoQueue = asyncio.LifoQueue()
+        self._slots = asyncio.Semaphore(size)
+
+    async def _connect(self):
+        return await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port, ssl=self.ssl), self.timeout
+        )
+
+    async def post(self, body: bytes, headers: Optional[Dict[str, str]] = None) -> Tuple[int, bytes]:
+        """POST body to the pool's URL and return (status, response body)"""
+        async with self._slots:
+            while True:
+                reused = not self._idle.empty()
+                try:
+                    reader, writer = self._idle.get_nowait() if reused else await self._connect()
+                except (OSError, asyncio.TimeoutError) as e:
+                    raise HttpError(f"connection failed: {e or type(e).__name__}") from e
+                try:
+                    status, payload, keep_alive = await asyncio.wait_for(
+                        self._exchange(reader, writer, body, headers or {}), self.timeout
+                    )
+                except asyncio.TimeoutError as e:
+                    writer.close()
+                    raise HttpError("request timed out") from e
+                except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+                    writer.close()
+                    if reused:
+                        # The server closed an idle keep-alive connection; try another one
+                        continue
+                    raise HttpError(str(e) or type(e).__name__) from e
+                if keep_alive:
+                    self._idle.put_nowait((reader, writer))
+                else:
+                    writer.close()
+                return status, payload
+
+    async def _exchange(self, reader, writer, body: bytes, headers: Dict[str, str]):
+        lines = [
+            f"POST {self.path} HTTP/1.1",
+            f"Host: {self.host_header}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+            "Connection: keep-alive",
+        ]
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode('latin-1') + body)
+        await writer.drain()
+
+        # Interim 1xx responses such as 100 Continue precede the real one
+        version, status, response_headers = await self._read_head(reader)
+        while 100 <= status < 200:
+            version, status, response_headers = await self._read_head(reader)
+
+        connection = response_headers.get('connection', '').lower()
+        keep_alive = connection != 'close' and (version != 'HTTP/1.0' or connection == 'keep-alive')
+
+        if status in (204, 304):
+            # These statuses never carry a body, whatever the headers say
+            payload = b''
+        elif response_headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b';')[0], 16)
+                if size == 0:
+                    # Skip any trailer fields up to the blank line ending the message
+                    await self._read_fields(reader)
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            payload = b''.join(chunks)
+        elif 'content-length' in response_headers:
+            payload = await reader.readexactly(int(response_headers['content-length']))
+        elif not keep_alive:
+            # The body runs to the end of the connection
+            payload = await reader.read()
+        else:
+            # No framing on a kept-alive connection: take no body and don't reuse it
+            payload = b''
+            keep_alive = False
+        return status, payload, keep_alive
+
+    @staticmethod
+    async def _read_fields(reader) -> Dict[str, str]:
+        """Header or trailer fields up to the blank line, with lower-cased names"""
+        fields = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                return fields
+            name, _, value = line.decode('latin-1').partition(':')
+            fields[name.strip().lower()] = value.strip()
+
+    async def _read_head(self, reader) -> Tuple[str, int, Dict[str, str]]:
+        """Status line and headers of one response: (HTTP version, status, headers)"""
+        status_line = await reader.readline()
+        if not status_line:
+            raise asyncio.IncompleteReadError(b'', None)
+        version, status, *_ = status_line.decode('latin-1').split(' ', 2)
+        return version, int(status), await self._read_fields(reader)
+
+    def close(self):
+        while not self._idle.empty():
+            _, writer = self._idle.get_nowait()
+            writer.close()
+
+
+async def run_suite(cases: Iterable[Any], url: str, concurrency: int = DEFAULT_CONCURRENCY,
+                    rate_limit: float = 0, retries: int = DEFAULT_RETRIES,
+                    timeout: float = DEFAULT_TIMEOUT, wrap_in_list: bool = True,
+                    headers: Optional[Dict[str, str]] = None,
+                    on_progress: Optional[ProgressCallback] = None,
+                    total: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Send every case to the endpoint and return one result row per case
+
+    Cases are read from the iterable as workers free up, through a queue
+    holding at most two per worker, so at most `concurrency` requests are in
+    flight and the workload is never materialized up front. `rate_limit`
+    caps requests per second (0 disables it). Transport errors and 429/5xx
+    gateway statuses are retried with exponential backoff. `on_progress` is
+    called at most every PROGRESS_INTERVAL seconds and once at the end;
+    pass `total` when `cases` has no len().
+
+    The response reader handles Content-Length, chunked (trailers skipped)
+    and close-delimited bodies and skips interim 1xx responses; it does not
+    handle upgrades or pipelining.
+    """
+    if total is None and hasattr(cases, '__len__'):
+        total = len(cases)
+    workers = max(1, min(concurrency, total) if total else concurrency)
+    pool = ConnectionPool(url, concurrency, timeout=timeout)
+    limiter = RateLimiter(rate_limit) if rate_limit > 0 else None
+    queue: asyncio.Queue = asyncio.Queue(maxsize=workers * 2)
+    results: List[Optional[Dict[str, Any]]] = []
+    done = 0
+    reported = 0
+    last_report = time.monotonic()
+
+    async def feed():
+        for index, case in enumerate(cases):
+            results.append(None)
+            await queue.put((index, case))
+        # One stop marker per worker
+        for _ in range(workers):
+            await queue.put(None)
+
+    async def send(index: int, case: Any):
+        body = codec.dumps_bytes([case] if wrap_in_list else case)
+        attempt = 0
+        while True:
+            attempt += 1
+            if limiter:
+                await limiter.acquire()
+            start = time.perf_counter()
+            status, payload, error = None, b'', None
+            try:
+                status, payload = await pool.post(body, headers)
+            except HttpError as e:
+                error = str(e)
+            latency_ms = (time.perf_counter() - start) * 1000
+            retryable = error is not None or status in RETRY_STATUSES or status >= 500
+            if not retryable or attempt > retries:
+                break
+            await asyncio.sleep(min(0.1 * 2 ** (attempt - 1), 5.0))
+        results[index] = {
+            'case': index + 1,
+            'status': status,
+            'latency_ms': round(latency_ms, 2),
+            'attempts': attempt,
+            'error': error,
+            'response': payload.decode('utf-8', errors='replace'),
+        }
+
+    async def worker():
+        nonlocal done, reported, last_report
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            await send(*item)
+            done += 1
+            if on_progress and time.monotonic() - last_report >= PROGRESS_INTERVAL:
+                on_progress(done, total)
+                reported = done
+                last_report = time.monotonic()
+
+    tasks = [asyncio.ensure_future(feed())] + [asyncio.ensure_future(worker()) for _ in range(workers)]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        # A failure in one task stops the others rather than leaving them blocked on the queue
+        for task in tasks:
+            task.cancel()
+        pool.close()
+    if on_progress and reported != done:
+        on_progress(done, len(results))
+    return results
+
+
+def execute_suite(cases: Iterable[Any], url: str, **options) -> List[Dict[str, Any]]:
+    """Synchronous wrapper around run_suite for scripts and Streamlit"""
+    return asyncio.run(run_suite(cases, url, **options))
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def latency_summary(results: List[Dict[str, Any]]) -> Dict[str, float]:
+    """Request count, failures and p50/p95/p99 latency for a run"""
+    latencies = sorted(r['latency_ms'] for r in results)
+    failed = sum(1 for r in results if r['error'] or not r['status'] or r['status'] >= 400)
+    return {
+        'requests': len(results),
+        'failed': failed,
+        'p50_ms': percentile(latencies, 0.50),
+        'p95_ms': percentile(latencies, 0.95),
+        'p99_ms': percentile(latencies, 0.99),
+        'mean_ms': round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+    }
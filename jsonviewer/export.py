@@ -0,0 +1,139 @@
+"""Streaming JSON / NDJSON export of test suites"""
+import base64
+import tempfile
+import zlib
+from typing import IO, Any, Callable, Iterable, Iterator
+
+from jsonviewer import codec
+
+EXPORT_FORMATS = {
+    'json': "JSON array",
+    'compact': "Compact JSON array",
+    'ndjson': "NDJSON (one case per line)",
+}
+
+MIME_TYPES = {
+    'json': "application/json",
+    'compact': "application/json",
+    'ndjson': "application/x-ndjson",
+}
+
+FILE_EXTENSIONS = {
+    'json': "json",
+    'compact': "json",
+    'ndjson': "ndjson",
+}
+
+CHUNK_SIZE = 64 * 1024
+SPOOL_SIZE = 8 * 1024 * 1024
+
+
+def dumps_suite(cases: Any, compact: bool = False) -> str:
+    """Serialize cases for copy/export, optionally without whitespace"""
+    if compact:
+        return codec.dumps(cases)
+    return codec.dumps(cases, pretty=True)
+
+
+def iter_encoded(cases: Iterable[Any], fmt: str = 'json') -> Iterator[str]:
+    """Yield a suite as text chunks, one case at a time
+
+    Output is identical to json.dumps(list(cases), indent=2) for 'json' and
+    to the compact separators for 'compact', without holding the whole text.
+    """
+    if fmt == 'ndjson':
+        for case in cases:
+            yield codec.dumps(case) + '\n'
+    elif fmt == 'compact':
+        first = True
+        for case in cases:
+            yield ('[' if first else ',') + codec.dumps(case)
+            first = False
+        yield '[]' if first else ']'
+    elif fmt == 'json':
+        first = True
+        for case in cases:
+            # Indent each case to match json.dumps(suite, indent=2)
+            body = codec.dumps(case, pretty=True).replace('\n', '\n  ')
+            yield ('[\n  ' if first else ',\n  ') + body
+            first = False
+        yield '[]' if first else '\n]'
+    else:
+        raise ValueError(f"Unknown export format: {fmt}")
+
+
+def iter_export_bytes(cases: Iterable[Any], fmt: str = 'json', compress: bool = False,
+                      chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield the encoded suite as byte chunks of about chunk_size, optionally gzipped"""
+    # wbits=31 makes zlib write a gzip header and trailer
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    buffer = []
+    size = 0
+    for text in iter_encoded(cases, fmt):
+        data = text.encode('utf-8')
+        if compressor:
+            data = compressor.compress(data)
+        if data:
+            buffer.append(data)
+            size += len(data)
+        if size >= chunk_size:
+            yield b''.join(buffer)
+            buffer = []
+            size = 0
+    if compressor:
+        buffer.append(compressor.flush())
+    tail = b''.join(buffer)
+    if tail:
+        yield tail
+
+
+def write_encoded(cases: Iterable[Any], fmt: str = 'json', compress: bool = False) -> IO[bytes]:
+    """Encode a suite into a spooled temporary file, rewound and ready to read
+
+    Only one case is encoded at a time; the file stays in memory up to
+    SPOOL_SIZE and moves to disk beyond that.
+    """
+    out = tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE)
+    for chunk in iter_export_bytes(cases, fmt, compress):
+        out.write(chunk)
+    out.seek(0)
+    return out
+
+
+def deferred_download(source: Callable[[], Iterable[Any]], fmt: str = 'json',
+                      compress: bool = False) -> Callable[[], bytes]:
+    """Download-button data that encodes the suite from source only when clicked
+
+    Nothing encoded is kept between reruns, so the file always reflects the
+    suite as it is at the click and session state never holds a copy.
+    """
+    def encode() -> bytes:
+        with write_encoded(source(), fmt, compress) as out:
+            return out.read()
+    return encode
+
+
+def export_filename(base: str, fmt: str, compress: bool = False) -> str:
+    return f"{base}.{FILE_EXTENSIONS[fmt]}" + (".gz" if compress else "")
+
+
+def export_mime(fmt: str, compress: bool = False) -> str:
+    return "application/gzip" if compress else MIME_TYPES[fmt]
+
+
+def create_download_link(data: Iterable[Any], filename: str, fmt: str = 'json') -> str:
+    """Create a data-URI download link, base64-encoding the suite chunk by chunk
+
+    Data URIs are about a third larger than the payload; prefer a download
+    button with write_encoded for anything but small suites.
+    """
+    parts = []
+    carry = b''
+    for chunk in iter_export_bytes(data, fmt):
+        chunk = carry + chunk
+        # base64 needs 3-byte groups to encode chunks independently
+        cut = len(chunk) - len(chunk) % 3
+        parts.append(base64.b64encode(chunk[:cut]).decode('ascii'))
+        carry = chunk[cut:]
+    parts.append(base64.b64encode(carry).decode('ascii'))
+    return f'<a href="data:{MIME_TYPES[fmt]};base64,{"".join(parts)}" download="{filename}">Download {filename}</a>'
@@ -0,0 +1,107 @@
+"""Iterative flatten/unflatten engine for nested test cases"""
+from typing import Any, Dict, Iterable, List, Tuple
+
+
+class _Missing:
+    """Marker for paths that a case in a batch does not have"""
+
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return 'MISSING'
+
+
+MISSING = _Missing()
+
+
+def flatten_dict(d: Dict, parent_key: str = '', sep: str = '.') -> Dict:
+    """Flatten nested dictionary for display
+
+    Works with an explicit stack, so depth is not limited by the recursion limit.
+    Lists are kept as list values and empty dicts as {} leaves, so the result
+    round-trips through unflatten_dict without losing types.
+    """
+    flat = {}
+    stack = [(parent_key, iter(d.items()))]
+    while stack:
+        prefix, items = stack[-1]
+        for k, v in items:
+            new_key = f"{prefix}{sep}{k}" if prefix else k
+            if isinstance(v, dict) and v:
+                # Descend; the parent's iterator resumes once this child is done
+                stack.append((new_key, iter(v.items())))
+                break
+            flat[new_key] = v
+        else:
+            stack.pop()
+    return flat
+
+
+def unflatten_dict(flat_dict: Dict, sep: str = '.') -> Dict:
+    """Convert flattened dictionary back to nested structure"""
+    result = {}
+    # Parent dicts by path prefix, so sibling keys skip re-walking from the root
+    parents: Dict[str, Dict] = {'': result}
+    for key, value in flat_dict.items():
+        prefix, _, leaf = key.rpartition(sep)
+        d = parents.get(prefix)
+        if d is None:
+            d = result
+            path = ''
+            for part in prefix.split(sep):
+                path = f"{path}{sep}{part}" if path else part
+                child = d.get(part)
+                if child is None:
+                    child = d[part] = {}
+                elif not isinstance(child, dict):
+                    raise ValueError(f"Field '{path}' is both a value and a parent of '{key}'")
+                parents[path] = child
+                d = child
+        existing = d.get(leaf)
+        if isinstance(existing, dict) and existing:
+            if value != {}:
+                raise ValueError(f"Field '{key}' is both a value and a parent of other fields")
+            # An empty-dict leaf adds nothing to a parent that already has fields
+            continue
+        d[leaf] = value
+    return result
+
+
+def flatten_batch(cases: Iterable[Dict], sep: str = '.') -> Tuple[List[str], Dict[str, List[Any]]]:
+    """Flatten many cases into one shared schema
+
+    Returns the ordered list of paths seen across all cases and a column per
+    path, with MISSING where a case does not have that path.
+    """
+    schema: List[str] = []
+    columns: Dict[str, List[Any]] = {}
+    n = 0
+    for case in cases:
+        for key, value in flatten_dict(case, sep=sep).items():
+            column = columns.get(key)
+            if column is None:
+                column = columns[key] = [MISSING] * (n + 1)
+                schema.append(key)
+            elif len(column) <= n:
+                column.extend([MISSING] * (n + 1 - len(column)))
+            column[n] = value
+        n += 1
+    # Pad columns for cases at the end that lack them
+    for column in columns.values():
+        if len(column) < n:
+            column.extend([MISSING] * (n - len(column)))
+    return schema, columns
+
+
+def unflatten_batch(schema: List[str], columns: Dict[str, List[Any]], sep: str = '.') -> List[Dict]:
+    """Rebuild cases from flatten_batch output, skipping MISSING cells"""
+    n = len(columns[schema[0]]) if schema else 0
+    cases = []
+    for row in range(n):
+        flat = {}
+        for key in schema:
+            value = columns[key][row]
+            if value is not MISSING:
+                flat[key] = value
+        cases.append(unflatten_dict(flat, sep=sep))
+    return cases
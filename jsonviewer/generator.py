@@ -0,0 +1,167 @@
+"""Batch generation of independent test cases from the templates"""
+import itertools
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Union
+
+import numpy as np
+
+# Sampling ranges per flattened field: (low, high) tuples sample uniformly
+# (integers when both bounds are ints), lists pick one of the choices
+Range = Union[tuple, list]
+
+BINARY_CONDITIONS = [
+    "CAN", "CHD", "CHF", "CKD", "CVD", "DM2", "HTN", "LDS", "LVH",
+    "PDM", "PMI", "STK", "TDM", "THT",
+]
+
+DEFAULT_FIELD_RANGES: Dict[str, Range] = {
+    "mhm.age": (18, 90),
+    "mhm.hgt": (140, 210),
+    "mhm.wgt": (40, 150),
+    "mhm.sex": [0, 1],
+    "mhm.dbp": (55, 110),
+    "mhm.sbp": (90, 190),
+    "mhm.map": (65, 130),
+    "mhm.fat": (5, 50),
+    "mhm.rhr": (40, 110),
+    "mhm.rhr_day": (40, 110),
+    "mhm.spo2": (88, 100),
+    "mhm.vo2max": (15.0, 70.0),
+    "mhm.whr": (0.6, 1.2),
+    "mhm.wst": (55, 150),
+    **{f"mhm.{flag}": [0, 1] for flag in BINARY_CONDITIONS},
+    **{f"nut.nqs{n:02d}": (0.0, 1.0) for n in range(1, 23)},
+    **{f"nut.{name}": (0.0, 1.0) for name in (
+        "protein", "sfat", "sugar", "fiber", "sodium", "vitamin_c", "iron",
+        "percentage_drink", "density_drink",
+    )},
+    **{f"qlm.q{n:02d}": (0.0, 1.0) for n in range(1, 28)},
+    **{f"qlm.gad{n:02d}": (0.0, 1.0) for n in range(1, 8)},
+    **{f"qlm.phq{n:02d}": (0.0, 1.0) for n in range(1, 10)},
+    **{f"qlm.pss{n:02d}": (0.0, 1.0) for n in range(1, 11)},
+    **{f"qlm.maas{n:02d}": (0.0, 1.0) for n in range(1, 16)},
+    "qlm.gsrh": (0.0, 1.0),
+    "qlm.mfm": (0.0, 1.0),
+}
+
+
+def clone_case(template: Any) -> Any:
+    """Deep-copy a JSON-shaped value; much cheaper than copy.deepcopy for plain data"""
+    if isinstance(template, dict):
+        return {k: clone_case(v) if isinstance(v, (dict, list)) else v for k, v in template.items()}
+    if isinstance(template, list):
+        return [clone_case(v) if isinstance(v, (dict, list)) else v for v in template]
+    return template
+
+
+def make_cloner(template: Any) -> Callable[[Any], Any]:
+    """Compile a deep-copy function specialised to the template's shape
+
+    Only the containers the template actually has are visited, and flat dicts
+    and lists are copied with a single C-level copy.
+    """
+    if isinstance(template, dict):
+        nested = {k: make_cloner(v) for k, v in template.items() if isinstance(v, (dict, list))}
+        if not nested:
+            return dict.copy
+
+        def clone_dict(d: Dict) -> Dict:
+            copied = d.copy()
+            for k, clone in nested.items():
+                copied[k] = clone(d[k])
+            return copied
+        return clone_dict
+    if isinstance(template, list):
+        if any(isinstance(v, (dict, list)) for v in template):
+            return clone_case
+        return list.copy
+    return lambda value: value
+
+
+def set_field(case: Dict, path: str, value: Any, sep: str = '.'):
+    """Set a flattened field in place, wrapping scalars for list-valued fields"""
+    _set_parts(case, path.split(sep), value)
+
+
+def _set_parts(case: Dict, parts: List[str], value: Any):
+    d = case
+    for part in parts[:-1]:
+        d = d.setdefault(part, {})
+        if not isinstance(d, dict):
+            raise ValueError(f"{'.'.join(parts)} passes through a non-object field")
+    if isinstance(d.get(parts[-1]), list) and not isinstance(value, list):
+        value = [value]
+    d[parts[-1]] = value
+
+
+def expand_values(spec: Any) -> List[Any]:
+    """Turn a sweep spec into values: a list, or {"start", "stop", "step"} (stop inclusive)"""
+    if isinstance(spec, list):
+        return spec
+    if isinstance(spec, dict) and {'start', 'stop'} <= spec.keys():
+        start, stop, step = spec['start'], spec['stop'], spec.get('step', 1)
+        if step <= 0:
+            raise ValueError("Sweep step must be positive")
+        values = []
+        n = 0
+        # Multiply rather than accumulate so float sweeps do not drift
+        while start + n * step <= stop + 1e-9:
+            value = start + n * step
+            values.append(round(value, 10) if isinstance(value, float) else value)
+            n += 1
+        return values
+    return [spec]
+
+
+def generate_copies(template: Dict, count: int) -> Iterator[Dict]:
+    """Yield count independent copies of a template"""
+    clone = make_cloner(template)
+    for _ in range(count):
+        yield clone(template)
+
+
+def generate_grid(template: Dict, parameters: Mapping[str, Any]) -> Iterator[Dict]:
+    """Yield one case per combination of parameter values (a sweep when there is one path)"""
+    clone = make_cloner(template)
+    paths = list(parameters)
+    value_lists = [expand_values(parameters[path]) for path in paths]
+    for combination in itertools.product(*value_lists):
+        case = clone(template)
+        for path, value in zip(paths, combination):
+            set_field(case, path, value)
+        yield case
+
+
+def _sample_column(rng: np.random.Generator, spec: Range, count: int) -> List[Any]:
+    """Draw count values for one field in a single vectorized call"""
+    if isinstance(spec, list):
+        return [spec[i] for i in rng.integers(0, len(spec), size=count).tolist()]
+    low, high = spec
+    if isinstance(low, int) and isinstance(high, int):
+        return rng.integers(low, high, size=count, endpoint=True).tolist()
+    return np.round(rng.uniform(low, high, size=count), 4).tolist()
+
+
+def generate_random(template: Dict, count: int, seed: Optional[int] = None,
+                    ranges: Optional[Mapping[str, Range]] = None,
+                    sections: Optional[Sequence[str]] = None,
+                    batch_size: int = 10000) -> Iterator[Dict]:
+    """Yield count cases with fields sampled from per-field ranges, reproducible by seed
+
+    Values are drawn column-wise per batch with NumPy, then written into
+    independent clones of the template.
+    """
+    rng = np.random.default_rng(seed)
+    ranges = DEFAULT_FIELD_RANGES if ranges is None else ranges
+    if sections is not None:
+        ranges = {path: spec for path, spec in ranges.items() if path.split('.', 1)[0] in sections}
+    clone = make_cloner(template)
+    paths = list(ranges)
+    split_paths = [path.split('.') for path in paths]
+    for start in range(0, count, batch_size):
+        size = min(batch_size, count - start)
+        columns = [_sample_column(rng, ranges[path], size) for path in paths]
+        for row in range(size):
+            case = clone(template)
+            for parts, column in zip(split_paths, columns):
+                _set_parts(case, parts, column[row])
+            yield case
@@ -0,0 +1,274 @@
+"""Golden-response regression checks for suites run against the health-score API
+
+Golden responses are keyed by the hash of each case's canonical cleaned form
+(see dedup.canonical_key), so they survive reordering, null fields and
+duplicate cases. A later run is compared field by field, numbers within a
+per-field tolerance, and large runs are compared on a process pool.
+"""
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from fnmatch import fnmatchcase
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from jsonviewer import codec
+from jsonviewer.dedup import canonical_key
+from jsonviewer.flatten import MISSING
+
+# Below this many results the process pool costs more than it saves
+PARALLEL_THRESHOLD = 5000
+CHUNK_SIZE = 2000
+
+MATCH = 'match'
+DRIFT = 'drift'
+NEW = 'new'
+ERROR = 'error'
+OUTCOMES = (MATCH, DRIFT, NEW, ERROR)
+
+_TOLERANCE = re.compile(r'^\s*(?P<pattern>[^=\s]+)\s*=\s*(?P<value>[0-9.eE+-]+)\s*(?P<percent>%?)\s*$')
+
+
+class Tolerance(NamedTuple):
+    pattern: str
+    absolute: float = 0.0
+    relative: float = 0.0
+
+
+class Drift(NamedTuple):
+    case: int
+    path: str
+    expected: Any
+    actual: Any
+
+    def to_json(self) -> Dict[str, Any]:
+        return {name: value for name, value in self._asdict().items() if value is not MISSING}
+
+
+def parse_tolerances(text: str) -> List[Tolerance]:
+    """Parse 'score=0.01, sections.*=1%' into tolerances; the first matching pattern wins"""
+    tolerances = []
+    for item in re.split(r'[,\n]', text):
+        if not item.strip():
+            continue
+        match = _TOLERANCE.match(item)
+        if not match:
+            raise ValueError(f"Cannot parse tolerance: {item.strip()!r}")
+        try:
+            value = float(match['value'])
+        except ValueError:
+            raise ValueError(f"Cannot parse tolerance: {item.strip()!r}")
+        if match['percent']:
+            tolerances.append(Tolerance(match['pattern'], relative=value / 100))
+        else:
+            tolerances.append(Tolerance(match['pattern'], absolute=value))
+    return tolerances
+
+
+def case_key(case: Any) -> str:
+    return canonical_key(case).hex()
+
+
+def _leaves(value: Any, prefix: str, out: Dict[str, Any]):
+    """Flatten objects and lists alike, lists by index: sections.mhm, results.0.score"""
+    if isinstance(value, dict) and value:
+        for key, child in value.items():
+            _leaves(child, f"{prefix}.{key}" if prefix else str(key), out)
+    elif isinstance(value, list) and value:
+        for index, child in enumerate(value):
+            _leaves(child, f"{prefix}.{index}" if prefix else str(index), out)
+    else:
+        out[prefix] = value
+
+
+def _unwrap(response: Any) -> Any:
+    # Cases sent as one-element arrays come back as one-element arrays
+    if isinstance(response, list) and len(response) == 1:
+        return response[0]
+    return response
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class Comparator:
+    """Field-by-field response comparison with numeric tolerances per path pattern"""
+
+    def __init__(self, tolerances: Sequence[Tolerance] = ()):
+        self.tolerances = list(tolerances)
+        self._by_path: Dict[str, Optional[Tolerance]] = {}
+
+    def _tolerance(self, path: str) -> Optional[Tolerance]:
+        if path not in self._by_path:
+            self._by_path[path] = next((t for t in self.tolerances if fnmatchcase(path, t.pattern)), None)
+        return self._by_path[path]
+
+    def compare(self, case: int, expected: Any, actual: Any) -> List[Drift]:
+        """Drifts between a golden and a new response; empty when they agree"""
+        expected_flat: Dict[str, Any] = {}
+        actual_flat: Dict[str, Any] = {}
+        _leaves(_unwrap(expected), '', expected_flat)
+        _leaves(_unwrap(actual), '', actual_flat)
+        drifts = []
+        for path, want in expected_flat.items():
+            got = actual_flat.get(path, MISSING)
+            if _is_number(want) and _is_number(got):
+                tolerance = self._tolerance(path)
+                allowed = max(tolerance.absolute, tolerance.relative * abs(want)) if tolerance else 0.0
+                if abs(got - want) > allowed:
+                    drifts.append(Drift(case, path, want, got))
+            elif not (type(want) is type(got) and want == got):
+                drifts.append(Drift(case, path, want, got))
+        drifts.extend(Drift(case, path, MISSING, got)
+                      for path, got in actual_flat.items() if path not in expected_flat)
+        return drifts
+
+
+def _parse_result(result: Dict[str, Any]) -> Any:
+    """The parsed response of a successful request, or MISSING"""
+    status = result.get('status')
+    if result.get('error') or not status or status >= 400:
+        return MISSING
+    try:
+        return codec.loads(result['response'])
+    except ValueError:
+        return MISSING
+
+
+def record_golden(cases: Sequence[Any], results: Iterable[Dict[str, Any]],
+                  golden: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Store the successful responses of a run as golden, by case hash
+
+    results[i] belongs to cases[i % len(cases)], so runs that repeat the
+    suite can be passed as they are; the first successful response wins.
+    """
+    golden = {} if golden is None else golden
+    keys: Dict[int, str] = {}
+    for i, result in enumerate(results):
+        position = i % len(cases)
+        key = keys.get(position)
+        if key is None:
+            key = keys[position] = case_key(cases[position])
+        if key in golden:
+            continue
+        response = _parse_result(result)
+        if response is not MISSING:
+            golden[key] = response
+    return golden
+
+
+def golden_records(golden: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """NDJSON-ready records for saving a golden set"""
+    for key, response in golden.items():
+        yield {'key': key, 'response': response}
+
+
+def load_golden(records: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Rebuild a golden set from records, e.g. loader.iter_cases over a saved file"""
+    golden = {}
+    for record in records:
+        if not isinstance(record, dict) or 'key' not in record or 'response' not in record:
+            raise ValueError("Golden records need 'key' and 'response' fields")
+        golden[record['key']] = record['response']
+    return golden
+
+
+class RegressionReport:
+    """Outcome counts, drifted fields and drifted cases of one comparison"""
+
+    def __init__(self):
+        self.counts = dict.fromkeys(OUTCOMES, 0)
+        self.drifts: List[Drift] = []
+        self.fields: Dict[str, int] = {}
+        self.drifted_cases: List[int] = []
+
+    def merge(self, counts: Dict[str, int], drifts: List[Drift]):
+        for outcome, count in counts.items():
+            self.counts[outcome] += count
+        seen = self.drifted_cases[-1] if self.drifted_cases else None
+        for drift in drifts:
+            self.fields[drift.path] = self.fields.get(drift.path, 0) + 1
+            if drift.case != seen:
+                self.drifted_cases.append(drift.case)
+                seen = drift.case
+        self.drifts.extend(drifts)
+
+    @property
+    def passed(self) -> bool:
+        return not self.counts[DRIFT] and not self.counts[ERROR]
+
+    def top_fields(self, limit: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Drifted field paths, most often drifted first"""
+        return sorted(self.fields.items(), key=lambda item: -item[1])[:limit]
+
+
+def _compare_chunk(rows: List[Tuple[int, Any, Dict[str, Any]]], golden: Dict[str, Any],
+                   comparator: Comparator) -> Tuple[Dict[str, int], List[Drift]]:
+    counts = dict.fromkeys(OUTCOMES, 0)
+    drifts: List[Drift] = []
+    for index, case, result in rows:
+        actual = _parse_result(result)
+        if actual is MISSING:
+            counts[ERROR] += 1
+            continue
+        expected = golden.get(case_key(case), MISSING)
+        if expected is MISSING:
+            counts[NEW] += 1
+            continue
+        case_drifts = comparator.compare(index, expected, actual)
+        counts[DRIFT if case_drifts else MATCH] += 1
+        drifts.extend(case_drifts)
+    return counts, drifts
+
+
+# Per-worker golden set and comparator, set up once by the pool initializer
+_worker_state: Optional[Tuple[Dict[str, Any], Comparator]] = None
+
+
+def _init_worker(golden: Dict[str, Any], tolerances: List[Tolerance]):
+    global _worker_state
+    _worker_state = (golden, Comparator(tolerances))
+
+
+def _compare_worker(rows: List[Tuple[int, Any, Dict[str, Any]]]) -> Tuple[Dict[str, int], List[Drift]]:
+    return _compare_chunk(rows, *_worker_state)
+
+
+def _rows(cases: Sequence[Any], results: Iterable[Dict[str, Any]]) -> Iterator[Tuple[int, Any, Dict[str, Any]]]:
+    for i, result in enumerate(results):
+        yield i, cases[i % len(cases)], result
+
+
+def compare_run(cases: Sequence[Any], results: Sequence[Dict[str, Any]], golden: Dict[str, Any],
+                tolerances: Sequence[Tolerance] = (), workers: Optional[int] = None,
+                chunk_size: int = CHUNK_SIZE) -> RegressionReport:
+    """Compare a run's responses with the golden set
+
+    results[i] belongs to cases[i % len(cases)]. Hashing the cases and parsing
+    and comparing responses is split into chunks over a process pool whose
+    workers each receive the golden set once; small runs are compared inline.
+    """
+    report = RegressionReport()
+    workers = workers or os.cpu_count() or 1
+    tolerances = list(tolerances)
+    if workers == 1 or len(results) < PARALLEL_THRESHOLD:
+        report.merge(*_compare_chunk(list(_rows(cases, results)), golden, Comparator(tolerances)))
+        return report
+
+    rows = _rows(cases, results)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(golden, tolerances)) as pool:
+        # Chunks come back in submission order, so drifts stay sorted by case
+        pending = []
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            pending.append(pool.submit(_compare_worker, chunk))
+            # Bound the number of chunks held in memory at once
+            if len(pending) >= workers * 2:
+                report.merge(*pending.pop(0).result())
+        for future in pending:
+            report.merge(*future.result())
+    return report
@@ -0,0 +1,184 @@
+"""Columnar (pandas) view of a whole suite with vectorized bulk editing"""
+import json
+from typing import Any, Dict, List, MutableSequence, Optional, Sequence
+
+import pandas as pd
+
+from jsonviewer.flatten import MISSING, flatten_batch
+
+BULK_OPERATIONS = {
+    'set': "Set value",
+    'scale': "Multiply by",
+    'fill': "Fill missing with",
+}
+
+
+def _column_dtype(values: List[Any]) -> Optional[str]:
+    """Pick a nullable pandas dtype for a flattened column, or None for object"""
+    kinds = set()
+    for v in values:
+        if v is MISSING or v is None:
+            continue
+        if isinstance(v, bool):
+            kinds.add('bool')
+        elif isinstance(v, int):
+            kinds.add('int')
+        elif isinstance(v, float):
+            kinds.add('float')
+        else:
+            return None
+    if kinds == {'bool'}:
+        return 'boolean'
+    if kinds == {'int'}:
+        return 'Int64'
+    if kinds and kinds <= {'int', 'float'}:
+        return 'Float64'
+    return None
+
+
+def _result_dtype(current: str, value: Optional[str]) -> Any:
+    """Dtype a column must take to hold its current values plus a new value"""
+    if current == value:
+        return current
+    if {current, value} == {'Int64', 'Float64'}:
+        return 'Float64'
+    return object
+
+
+def suite_to_frame(cases: Sequence[Dict], sep: str = '.') -> pd.DataFrame:
+    """Flatten a suite into one DataFrame with a typed column per field path
+
+    Numeric and boolean fields get nullable dtypes so bulk operations run
+    vectorized; lists and strings stay as object columns. Missing fields
+    and nulls are both NA.
+    """
+    schema, columns = flatten_batch(cases, sep=sep)
+    data = {}
+    for path in schema:
+        values = [None if v is MISSING else v for v in columns[path]]
+        dtype = _column_dtype(values)
+        try:
+            data[path] = pd.Series(values, dtype=dtype if dtype else object)
+        except (OverflowError, TypeError, ValueError):
+            data[path] = pd.Series(values, dtype=object)
+    return pd.DataFrame(data, index=pd.RangeIndex(len(cases)))
+
+
+def select_rows(frame: pd.DataFrame, predicate: str) -> pd.Series:
+    """Evaluate a pandas expression such as "`mhm.age` > 40" into a row mask"""
+    if not predicate.strip():
+        return pd.Series(True, index=frame.index)
+    mask = frame.eval(predicate)
+    if not isinstance(mask, pd.Series):
+        raise ValueError("Row filter must evaluate to one boolean per case")
+    return mask.fillna(False).astype(bool)
+
+
+def bulk_update(frame: pd.DataFrame, column: str, operation: str, value: Any = None,
+                mask: Optional[pd.Series] = None) -> pd.Series:
+    """Apply a bulk operation to one column and return only the cells that changed
+
+    The frame is updated in place; the returned Series is indexed by case
+    position and holds the new values.
+    """
+    if operation not in BULK_OPERATIONS:
+        raise ValueError(f"Unknown bulk operation: {operation}")
+    if mask is None:
+        mask = pd.Series(True, index=frame.index)
+
+    if column in frame.columns:
+        current = frame[column]
+    else:
+        current = pd.Series(None, index=frame.index, dtype=object)
+
+    if operation == 'scale':
+        if not pd.api.types.is_numeric_dtype(current) or pd.api.types.is_bool_dtype(current):
+            raise ValueError(f"Column '{column}' is not numeric")
+        target = mask
+        value_dtype = _column_dtype([value])
+        if value_dtype not in ('Int64', 'Float64'):
+            raise ValueError("Scale factor must be a number")
+        updated = current.astype(_result_dtype(str(current.dtype), value_dtype))
+        updated[target] = current[target] * value
+    else:
+        target = mask if operation == 'set' else mask & current.isna()
+        value_dtype = _column_dtype([value]) if value is not None else str(current.dtype)
+        updated = current.astype(_result_dtype(str(current.dtype), value_dtype))
+        if isinstance(value, (list, dict)):
+            # Assign containers cell by cell so pandas does not try to broadcast them
+            for row in target[target].index:
+                updated.at[row] = value
+        else:
+            updated[target] = value
+
+    same = (updated == current).fillna(False).astype(bool) | (updated.isna() & current.isna())
+    changed = mask & ~same
+    frame[column] = updated
+    return updated[changed]
+
+
+def _to_python(value: Any) -> Any:
+    """Convert a pandas/NumPy cell value back to a plain JSON value"""
+    if value is pd.NA or value is None:
+        return None
+    if isinstance(value, float) and value != value:
+        return None
+    if hasattr(value, 'item') and not isinstance(value, (list, dict)):
+        return value.item()
+    return value
+
+
+def _get_path(case: Dict, path: str, sep: str = '.') -> Any:
+    """Return the value at a flattened field path, or MISSING"""
+    node = case
+    for part in path.split(sep):
+        if not isinstance(node, dict) or part not in node:
+            return MISSING
+        node = node[part]
+    return node
+
+
+def _keep_number_type(original: Any, value: Any) -> Any:
+    """Give a written number its cell's original int/float type where no value is lost
+
+    Columns mixing ints and floats are Float64, so without this a bulk edit
+    would turn every int it touches into a float.
+    """
+    if isinstance(original, bool) or isinstance(value, bool):
+        return value
+    if isinstance(original, int) and isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(original, float) and isinstance(value, int):
+        return float(value)
+    return value
+
+
+def set_path(case: Dict, path: str, value: Any, sep: str = '.') -> Dict:
+    """Return a copy of case with one field set, copying only the dicts along the path"""
+    parts = path.split(sep)
+    root = dict(case)
+    d = root
+    for part in parts[:-1]:
+        child = d.get(part)
+        d[part] = dict(child) if isinstance(child, dict) else {}
+        d = d[part]
+    d[parts[-1]] = value
+    return root
+
+
+def write_back(cases: MutableSequence[Dict], column: str, changes: pd.Series, sep: str = '.') -> int:
+    """Write changed cells back into their cases and return how many were updated"""
+    for row, value in changes.items():
+        case = cases[row]
+        value = _keep_number_type(_get_path(case, column, sep=sep), _to_python(value))
+        cases[row] = set_path(case, column, value, sep=sep)
+    return len(changes)
+
+
+def display_frame(frame: pd.DataFrame) -> pd.DataFrame:
+    """Render object columns (lists, strings, mixed) as JSON text for st.dataframe"""
+    display = frame.copy()
+    for column in display.columns:
+        if display[column].dtype == object:
+            display[column] = display[column].map(lambda v: None if v is None else json.dumps(v))
+    return display
@@ -0,0 +1,244 @@
+"""Streaming ingest for large JSON and NDJSON test suites"""
+import codecs
+import json
+import sys
+import tempfile
+import zlib
+from collections.abc import MutableSequence
+from typing import Any, BinaryIO, Callable, Iterator, List, Optional, Tuple, Union
+
+from jsonviewer import codec
+
+CHUNK_SIZE = 1 << 16
+DEFAULT_MEMORY_BUDGET_MB = 256
+# Read-ahead for one case stops here; beyond it the input is treated as malformed
+MAX_CASE_SIZE = 64 << 20
+# Cases whose parsed size is measured exactly to calibrate the estimate for the rest
+CALIBRATION_CASES = 64
+WHITESPACE = ' \t\n\r'
+
+_decoder = json.JSONDecoder()
+
+ProgressCallback = Callable[[int, int], None]
+
+
+class SpilledCases(MutableSequence):
+    """List-like suite whose cases live zlib-compressed in a temporary file"""
+
+    def __init__(self, cases: Optional[List[Any]] = None):
+        self._file = tempfile.TemporaryFile()
+        self._index: List[tuple[int, int]] = []
+        for case in cases or []:
+            self.append(case)
+
+    def _write(self, case: Any) -> tuple[int, int]:
+        """Append one compact record to the backing file and return its location"""
+        record = zlib.compress(codec.dumps_bytes(case), 1)
+        self._file.seek(0, 2)
+        offset = self._file.tell()
+        self._file.write(record)
+        return offset, len(record)
+
+    def _read_bytes(self, location: tuple[int, int]) -> bytes:
+        offset, length = location
+        self._file.seek(offset)
+        return zlib.decompress(self._file.read(length))
+
+    def _read(self, location: tuple[int, int]) -> Any:
+        return codec.loads(self._read_bytes(location))
+
+    def raw(self, i: int) -> bytes:
+        """The compact JSON bytes of one case, without parsing them"""
+        return self._read_bytes(self._index[i])
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._read(loc) for loc in self._index[i]]
+        return self._read(self._index[i])
+
+    def __setitem__(self, i, case):
+        if isinstance(i, slice):
+            raise TypeError("SpilledCases does not support slice assignment")
+        self._index[i] = self._write(case)
+
+    def __delitem__(self, i):
+        del self._index[i]
+
+    def insert(self, i: int, case: Any):
+        self._index.insert(i, self._write(case))
+
+    def close(self):
+        self._file.close()
+
+
+def _decode_value(buffer: str, pos: int, eof: bool) -> Optional[tuple[Any, int]]:
+    """Decode one value at pos, or return None if more input is needed"""
+    try:
+        value, end = _decoder.raw_decode(buffer, pos)
+    except json.JSONDecodeError:
+        if eof:
+            raise
+        return None
+    # A number ending exactly at the buffer edge may still be truncated
+    if end == len(buffer) and not eof:
+        return None
+    return value, end
+
+
+def parsed_size(value: Any) -> int:
+    """Approximate bytes a parsed JSON value occupies in memory, containers and leaves included"""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        for key, item in value.items():
+            size += sys.getsizeof(key) + parsed_size(item)
+    elif isinstance(value, list):
+        for item in value:
+            size += parsed_size(item)
+    return size
+
+
+def iter_cases(stream: BinaryIO, chunk_size: int = CHUNK_SIZE,
+               on_progress: Optional[ProgressCallback] = None,
+               max_case_size: int = MAX_CASE_SIZE) -> Iterator[Any]:
+    """Yield test cases one at a time from a JSON array, a single object or NDJSON"""
+    for value, _ in _iter_spans(stream, chunk_size, on_progress, max_case_size):
+        yield value
+
+
+def _iter_spans(stream: BinaryIO, chunk_size: int, on_progress: Optional[ProgressCallback],
+                max_case_size: int) -> Iterator[Tuple[Any, int]]:
+    """iter_cases, also yielding the length in characters of each case's source text"""
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    buffer = ''
+    pos = 0
+    eof = False
+    bytes_read = 0
+    consumed = 0
+    count = 0
+    read_size = chunk_size
+    in_array = None
+
+    def fill() -> bool:
+        nonlocal buffer, pos, eof, bytes_read, consumed
+        chunk = stream.read(read_size)
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        bytes_read += len(chunk)
+        if not chunk:
+            eof = True
+            buffer = buffer[pos:] + decoder.decode(b'', final=True)
+        else:
+            buffer = buffer[pos:] + decoder.decode(chunk)
+        consumed += pos
+        pos = 0
+        if on_progress:
+            on_progress(bytes_read, count)
+        return not eof
+
+    def skip_whitespace() -> bool:
+        """Advance past whitespace, reading more input as needed; False at end of input"""
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in WHITESPACE:
+                pos += 1
+            if pos < len(buffer):
+                return True
+            if not fill():
+                return pos < len(buffer)
+
+    def end_array():
+        """Step past the closing bracket; only whitespace may follow it"""
+        nonlocal pos
+        pos += 1
+        if skip_whitespace():
+            raise json.JSONDecodeError(
+                f"Extra data after the JSON array at character {consumed + pos}", buffer, pos
+            )
+
+    while True:
+        if not skip_whitespace():
+            if in_array:
+                raise json.JSONDecodeError("Unterminated JSON array", buffer, pos)
+            return
+
+        if in_array is None:
+            in_array = buffer[pos] == '['
+            if in_array:
+                pos += 1
+                if not skip_whitespace():
+                    raise json.JSONDecodeError("Unterminated JSON array", buffer, pos)
+                if buffer[pos] == ']':
+                    end_array()
+                    return
+        elif in_array:
+            if buffer[pos] == ']':
+                end_array()
+                return
+            if buffer[pos] != ',':
+                raise json.JSONDecodeError("Expecting ',' delimiter", buffer, pos)
+            pos += 1
+            if not skip_whitespace():
+                raise json.JSONDecodeError("Unterminated JSON array", buffer, pos)
+
+        # Decode the next element, growing reads for values larger than a chunk
+        start = pos
+        while True:
+            decoded = _decode_value(buffer, pos, eof)
+            if decoded is not None:
+                break
+            if len(buffer) - pos > max_case_size:
+                # Malformed input looks like a value still being read; stop reading ahead
+                raise json.JSONDecodeError(
+                    f"Test case at character {consumed + pos} is malformed or larger than "
+                    f"{max_case_size} characters", buffer, pos
+                )
+            read_size = min(read_size * 2, max_case_size)
+            fill()
+            start = pos
+        value, pos = decoded
+        read_size = chunk_size
+        count += 1
+        yield value, pos - start
+
+
+def load_cases(stream: BinaryIO, memory_budget_mb: float = DEFAULT_MEMORY_BUDGET_MB,
+               chunk_size: int = CHUNK_SIZE,
+               on_progress: Optional[ProgressCallback] = None,
+               max_case_size: int = MAX_CASE_SIZE) -> Union[List[Any], SpilledCases]:
+    """Load a suite incrementally, spilling to disk once the memory budget is exceeded
+
+    The budget is compared with the estimated in-memory size of the parsed
+    cases held so far. The first CALIBRATION_CASES are measured exactly,
+    which fixes a parsed-bytes-per-source-character ratio for the rest.
+    """
+    budget = memory_budget_mb * 1024 * 1024
+    cases: Union[List[Any], SpilledCases] = []
+    last_offset = 0
+    parsed_bytes = 0
+    source_chars = 0
+    ratio = 0.0
+
+    def track(bytes_read: int, count: int):
+        nonlocal last_offset
+        last_offset = bytes_read
+        if on_progress:
+            on_progress(bytes_read, count)
+
+    for case, span in _iter_spans(stream, chunk_size, track, max_case_size):
+        if isinstance(cases, list):
+            if len(cases) < CALIBRATION_CASES:
+                parsed_bytes += parsed_size(case)
+                source_chars += span
+                ratio = parsed_bytes / max(source_chars, 1)
+            else:
+                parsed_bytes += span * ratio
+            if parsed_bytes > budget:
+                cases = SpilledCases(cases)
+        cases.append(case)
+
+    if on_progress:
+        on_progress(last_offset, len(cases))
+    return cases
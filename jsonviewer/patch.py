@@ -0,0 +1,199 @@
+"""JSON Patch (RFC 6902) diffs, copy-on-write application and undo/redo history"""
+from collections import deque
+from typing import Any, Deque, Dict, Hashable, List, Tuple
+
+Patch = List[Dict[str, Any]]
+
+DEFAULT_HISTORY_DEPTH = 100
+
+
+class PatchError(ValueError):
+    """A patch operation does not apply to the document"""
+
+
+def _escape(token: Any) -> str:
+    return str(token).replace('~', '~0').replace('/', '~1')
+
+
+def _unescape(token: str) -> str:
+    return token.replace('~1', '/').replace('~0', '~')
+
+
+def pointer(tokens: List[Any]) -> str:
+    """Build a JSON Pointer from path tokens"""
+    return ''.join('/' + _escape(token) for token in tokens)
+
+
+def parse_pointer(path: str) -> List[str]:
+    if path == '':
+        return []
+    if not path.startswith('/'):
+        raise PatchError(f"Invalid JSON pointer: {path}")
+    return [_unescape(token) for token in path[1:].split('/')]
+
+
+def pointer_to_field(path: str, sep: str = '.') -> str:
+    """Convert a JSON Pointer to a flattened field key such as "mhm.age" """
+    return sep.join(parse_pointer(path))
+
+
+def _same_leaf(a: Any, b: Any) -> bool:
+    # 1 == True in Python, but changing the type is still an edit
+    return type(a) is type(b) and a == b
+
+
+def make_patch(old: Any, new: Any) -> Patch:
+    """Compute a small patch turning old into new
+
+    Dicts are diffed key by key and lists element by element when their
+    lengths match or one extends the other; anything else is replaced.
+    """
+    patch: Patch = []
+    stack: List[Tuple[List[Any], Any, Any]] = [([], old, new)]
+    while stack:
+        tokens, a, b = stack.pop()
+        if a is b:
+            continue
+        if isinstance(a, dict) and isinstance(b, dict):
+            ops = []
+            for key, value in a.items():
+                if key not in b:
+                    ops.append({'op': 'remove', 'path': pointer(tokens + [key])})
+            for key, value in b.items():
+                if key not in a:
+                    ops.append({'op': 'add', 'path': pointer(tokens + [key]), 'value': value})
+            patch.extend(ops)
+            # Reversed so the stack yields children in document order
+            for key in reversed([k for k in b if k in a]):
+                stack.append((tokens + [key], a[key], b[key]))
+        elif isinstance(a, list) and isinstance(b, list):
+            common = min(len(a), len(b))
+            # Only diff element-wise when one list extends the other
+            if len(a) != len(b) and a[:common] != b[:common]:
+                patch.append({'op': 'replace', 'path': pointer(tokens), 'value': b})
+                continue
+            if len(b) > len(a):
+                patch.extend({'op': 'add', 'path': pointer(tokens + ['-']), 'value': value}
+                             for value in b[common:])
+            elif len(a) > len(b):
+                # Remove from the end so earlier indices stay valid
+                patch.extend({'op': 'remove', 'path': pointer(tokens + [index])}
+                             for index in range(len(a) - 1, common - 1, -1))
+            for index in reversed(range(common)):
+                stack.append((tokens + [index], a[index], b[index]))
+        elif not _same_leaf(a, b):
+            patch.append({'op': 'replace', 'path': pointer(tokens), 'value': b})
+    return patch
+
+
+def _copy(container: Any) -> Any:
+    return dict(container) if isinstance(container, dict) else list(container)
+
+
+def _list_index(container: List, token: str, allow_end: bool) -> int:
+    if allow_end and token == '-':
+        return len(container)
+    try:
+        index = int(token)
+    except ValueError:
+        raise PatchError(f"Invalid list index: {token}")
+    if index < 0 or index > len(container) or (index == len(container) and not allow_end):
+        raise PatchError(f"List index out of range: {token}")
+    return index
+
+
+def apply_patch(doc: Any, patch: Patch) -> Any:
+    """Apply a patch without mutating doc; only containers on changed paths are copied"""
+    root = doc
+    fresh = set()
+    for operation in patch:
+        op = operation.get('op')
+        tokens = parse_pointer(operation.get('path', ''))
+        if op not in ('add', 'remove', 'replace'):
+            raise PatchError(f"Unsupported patch operation: {op}")
+        if not tokens:
+            if op == 'remove':
+                raise PatchError("Cannot remove the document root")
+            root = operation['value']
+            fresh.clear()
+            continue
+
+        if id(root) not in fresh:
+            root = _copy(root)
+            fresh.add(id(root))
+        parent = root
+        for token in tokens[:-1]:
+            key = _list_index(parent, token, False) if isinstance(parent, list) else token
+            try:
+                child = parent[key]
+            except (KeyError, IndexError):
+                raise PatchError(f"Path not found: {operation['path']}")
+            if not isinstance(child, (dict, list)):
+                raise PatchError(f"Path not found: {operation['path']}")
+            if id(child) not in fresh:
+                child = _copy(child)
+                parent[key] = child
+                fresh.add(id(child))
+            parent = child
+
+        last = tokens[-1]
+        if isinstance(parent, list):
+            index = _list_index(parent, last, op == 'add')
+            if op == 'add':
+                parent.insert(index, operation['value'])
+            elif op == 'remove':
+                del parent[index]
+            else:
+                parent[index] = operation['value']
+        else:
+            if op != 'add' and last not in parent:
+                raise PatchError(f"Path not found: {operation['path']}")
+            if op == 'remove':
+                del parent[last]
+            else:
+                parent[last] = operation['value']
+    return root
+
+
+class EditHistory:
+    """Undo/redo stacks of (forward, backward) patches per case
+
+    Memory grows with the size of each edit, not with the size of the case.
+    Keys are case positions; callers clear the history when positions shift.
+    """
+
+    def __init__(self, max_depth: int = DEFAULT_HISTORY_DEPTH):
+        self.max_depth = max_depth
+        self._undo: Dict[Hashable, Deque[Tuple[Patch, Patch]]] = {}
+        self._redo: Dict[Hashable, List[Tuple[Patch, Patch]]] = {}
+
+    def record(self, key: Hashable, old: Any, new: Any) -> Patch:
+        """Diff an edit, remember it and return the forward patch (empty if unchanged)"""
+        forward = make_patch(old, new)
+        if forward:
+            stack = self._undo.setdefault(key, deque(maxlen=self.max_depth))
+            stack.append((forward, make_patch(new, old)))
+            self._redo.pop(key, None)
+        return forward
+
+    def can_undo(self, key: Hashable) -> bool:
+        return bool(self._undo.get(key))
+
+    def can_redo(self, key: Hashable) -> bool:
+        return bool(self._redo.get(key))
+
+    def undo(self, key: Hashable, doc: Any) -> Tuple[Any, Patch]:
+        """Revert the last edit of doc and return (reverted doc, patch applied)"""
+        forward, backward = self._undo[key].pop()
+        self._redo.setdefault(key, []).append((forward, backward))
+        return apply_patch(doc, backward), backward
+
+    def redo(self, key: Hashable, doc: Any) -> Tuple[Any, Patch]:
+        """Re-apply the last undone edit and return (doc, patch applied)"""
+        forward, backward = self._redo[key].pop()
+        self._undo.setdefault(key, deque(maxlen=self.max_depth)).append((forward, backward))
+        return apply_patch(doc, forward), forward
+
+    def clear(self):
+        self._undo.clear()
+        self._redo.clear()
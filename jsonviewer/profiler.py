@@ -0,0 +1,156 @@
+"""Per-rerun timing of the apps' hot paths, with Chrome trace export"""
+import time
+from collections import deque
+from contextlib import nullcontext
+from typing import Any, Deque, Dict, List, Optional
+
+DEFAULT_HISTORY = 50
+MAX_SPANS = 5000
+
+_DISABLED = nullcontext()
+
+
+class _Phase:
+    """Context manager that adds one timed call to a phase"""
+
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler: 'RerunProfiler', name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler._add_span(self.name, self.start, time.perf_counter())
+        return False
+
+
+class RerunProfiler:
+    """Collects phase timings and counters for each script rerun
+
+    Call start_run() at the top of the script and end_run() at the bottom; a run
+    cut short by st.rerun() is closed by the next start_run() and marked
+    incomplete. While disabled, phase() returns a shared no-op context manager.
+    """
+
+    def __init__(self, history: int = DEFAULT_HISTORY, max_spans: int = MAX_SPANS):
+        self.enabled = False
+        self.max_spans = max_spans
+        self.runs: Deque[Dict[str, Any]] = deque(maxlen=history)
+        self._run: Optional[Dict[str, Any]] = None
+        self._run_start = 0.0
+        self._count = 0
+
+    def start_run(self):
+        if self._run is not None:
+            self._close(complete=False)
+        if not self.enabled:
+            return
+        self._count += 1
+        self._run_start = time.perf_counter()
+        self._run = {
+            'run': self._count,
+            'started': time.time(),
+            'phases': {},
+            'counters': {},
+            'spans': [],
+            'dropped_spans': 0,
+        }
+
+    def end_run(self) -> Optional[Dict[str, Any]]:
+        """Close the current run and return its record"""
+        if self._run is None:
+            return None
+        return self._close(complete=True)
+
+    def _close(self, complete: bool) -> Dict[str, Any]:
+        run = self._run
+        run['total_ms'] = (time.perf_counter() - self._run_start) * 1000
+        run['complete'] = complete
+        self.runs.append(run)
+        self._run = None
+        return run
+
+    def phase(self, name: str):
+        """Time a block as one call of the named phase"""
+        if self._run is None:
+            return _DISABLED
+        return _Phase(self, name)
+
+    def _add_span(self, name: str, start: float, end: float):
+        run = self._run
+        if run is None:
+            return
+        stats = run['phases'].get(name)
+        if stats is None:
+            stats = run['phases'][name] = {'ms': 0.0, 'calls': 0}
+        stats['ms'] += (end - start) * 1000
+        stats['calls'] += 1
+        if len(run['spans']) < self.max_spans:
+            run['spans'].append((name, start - self._run_start, end - start))
+        else:
+            run['dropped_spans'] += 1
+
+    def count(self, name: str, n: int = 1):
+        """Add n to a per-run counter such as widgets or JSON bytes"""
+        if self._run is not None:
+            counters = self._run['counters']
+            counters[name] = counters.get(name, 0) + n
+
+    def last_run(self) -> Optional[Dict[str, Any]]:
+        return self.runs[-1] if self.runs else None
+
+    def clear(self):
+        self.runs.clear()
+
+    def trace(self) -> Dict[str, Any]:
+        """Return recorded runs in Chrome trace event format (chrome://tracing, Perfetto)"""
+        events = []
+        # A snapshot, as download buttons call this from another thread
+        for run in list(self.runs):
+            # Runs are laid out at their wall-clock start time, in microseconds
+            base = run['started'] * 1e6
+            label = f"rerun {run['run']}" + ("" if run['complete'] else " (interrupted)")
+            events.append({'name': label, 'ph': 'X', 'pid': 1, 'tid': 1,
+                           'ts': base, 'dur': run['total_ms'] * 1000,
+                           'args': {'dropped_spans': run['dropped_spans']}})
+            for name, offset, duration in run['spans']:
+                events.append({'name': name, 'ph': 'X', 'pid': 1, 'tid': 1,
+                               'ts': base + offset * 1e6, 'dur': duration * 1e6})
+            if run['counters']:
+                events.append({'name': 'counters', 'ph': 'C', 'pid': 1, 'tid': 1,
+                               'ts': base, 'args': dict(run['counters'])})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+def summary_rows(run: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Phase table for a run, slowest first"""
+    rows = [{'phase': name, 'ms': round(stats['ms'], 2), 'calls': stats['calls']}
+            for name, stats in run['phases'].items()]
+    rows.sort(key=lambda row: row['ms'], reverse=True)
+    return rows
+
+
+def widgets_this_run() -> Optional[int]:
+    """Number of widgets registered so far in the current Streamlit run, or None if unknown
+
+    This reads private Streamlit run state, so any change there hides the
+    counter instead of breaking the page.
+    """
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
+        if ctx is None:
+            return None
+        # Moved onto a shared run state object in newer Streamlit releases
+        ids = getattr(ctx, 'widget_ids_this_run', None)
+        if ids is None:
+            ids = getattr(getattr(ctx, 'shared', None), 'widget_ids_this_run', None)
+        if ids is None:
+            return None
+        return len(ids.snapshot()) if hasattr(ids, 'snapshot') else len(ids)
+    except Exception:
+        return None
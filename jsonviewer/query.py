@@ -0,0 +1,341 @@
+"""Suite-wide field queries, answered from per-path columns kept current as cases change"""
+import operator
+import re
+from typing import Any, Callable, Dict, Iterable, List, MutableSequence, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from jsonviewer import codec
+
+# Cell states
+ABSENT = 0
+NUMBER = 1
+NULL = 2
+OTHER = 3
+
+# Integers beyond this magnitude are compared as Python objects, not float64
+_MAX_EXACT_INT = 2 ** 53
+_MISSING = object()
+
+COMPARISONS: Dict[str, Callable[[Any, Any], bool]] = {
+    '=': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+}
+CHECKS = ('exists', 'missing')
+
+_CLAUSE = re.compile(
+    r'^\s*(?P<path>[^\s=!<>]+)\s*(?:(?P<op>==|!=|<=|>=|=|<|>)\s*(?P<value>.+?)|\s(?P<check>exists|missing))\s*$',
+    re.IGNORECASE,
+)
+
+# A quoted JSON string, skipped whole, or the separator between clauses
+_SEPARATOR = re.compile(r'"(?:\\.|[^"\\])*"|\s+and\s+', re.IGNORECASE)
+
+
+class Predicate(NamedTuple):
+    path: str
+    op: str
+    value: Any = None
+
+
+def parse_query(text: str) -> List[Predicate]:
+    """Parse clauses joined by 'and', e.g. 'mhm.sbp > 140 and smk.now = 1 and slp.bed exists'
+
+    Values are JSON; anything that does not parse is taken as a bare string.
+    """
+    predicates = []
+    for clause in _split_clauses(text.strip()):
+        match = _CLAUSE.match(clause)
+        if not match:
+            raise ValueError(f"Cannot parse query clause: {clause.strip()!r}")
+        if match['check']:
+            predicates.append(Predicate(match['path'], match['check'].lower()))
+            continue
+        try:
+            value = codec.loads(match['value'])
+        except (codec.JSONDecodeError, ValueError):
+            value = match['value']
+        op = '=' if match['op'] == '==' else match['op']
+        predicates.append(Predicate(match['path'], op, value))
+    return predicates
+
+
+def _split_clauses(text: str) -> List[str]:
+    """Split on 'and' outside of quoted strings"""
+    clauses = []
+    start = 0
+    for match in _SEPARATOR.finditer(text):
+        if not match.group().startswith('"'):
+            clauses.append(text[start:match.start()])
+            start = match.end()
+    clauses.append(text[start:])
+    return clauses
+
+
+def _is_number(value: Any) -> bool:
+    value_type = type(value)
+    if value_type is int:
+        return -_MAX_EXACT_INT <= value <= _MAX_EXACT_INT
+    return value_type is float or value_type is bool
+
+
+def _lookup(case: Any, parts: List[str]) -> Any:
+    node = case
+    for part in parts:
+        if not isinstance(node, dict) or part not in node:
+            return _MISSING
+        node = node[part]
+    return node
+
+
+def _value_matches(value: Any, op: str, target: Any) -> bool:
+    """One value against one predicate, as _Column.match decides it for a row"""
+    if op == 'exists':
+        return value is not _MISSING
+    if op == 'missing':
+        return value is _MISSING
+    if value is _MISSING:
+        return False
+    if target is None:
+        return (value is None) == (op == '=')
+    if value is None:
+        return False
+    compare = COMPARISONS[op]
+    if _is_number(value):
+        return compare(float(value), float(target)) if _is_number(target) else op == '!='
+    try:
+        return compare(value, target)
+    except TypeError:
+        return op == '!='
+
+
+def compile_query(predicates: Iterable[Predicate]) -> Callable[[Any], bool]:
+    """Test for single cases matching every predicate, for code that streams cases"""
+    compiled = []
+    for predicate in predicates:
+        if predicate.op not in COMPARISONS and predicate.op not in CHECKS:
+            raise ValueError(f"Unknown query operator: {predicate.op}")
+        if predicate.value is None and predicate.op not in ('=', '!=') and predicate.op not in CHECKS:
+            raise ValueError(f"'{predicate.op}' cannot compare with null")
+        compiled.append((predicate.path.split('.'), predicate.op, predicate.value))
+
+    def matches(case: Any) -> bool:
+        return all(_value_matches(_lookup(case, parts), op, value) for parts, op, value in compiled)
+    return matches
+
+
+class _Column:
+    """One field across the suite: float64 numbers, a state per case and non-numeric values"""
+
+    __slots__ = ('numbers', 'states', 'others')
+
+    def __init__(self, values: Sequence[Any]):
+        self.numbers, self.states, self.others = self._encode(values)
+
+    @staticmethod
+    def _encode(values: Sequence[Any]):
+        """Arrays for a run of values; others stays None without non-numeric values"""
+        states = bytearray(len(values))
+        numbers = [np.nan] * len(values)
+        others = None
+        for row, value in enumerate(values):
+            if value is _MISSING:
+                continue
+            if value is None:
+                states[row] = NULL
+            elif _is_number(value):
+                states[row] = NUMBER
+                numbers[row] = value
+            else:
+                # Only allocated once a string, list or object value shows up
+                if others is None:
+                    others = np.full(len(values), None, dtype=object)
+                states[row] = OTHER
+                others[row] = value
+        return np.array(numbers, dtype=np.float64), np.frombuffer(states, dtype=np.uint8).copy(), others
+
+    def set(self, row: int, value: Any):
+        if value is _MISSING:
+            self.states[row] = ABSENT
+        elif value is None:
+            self.states[row] = NULL
+        elif _is_number(value):
+            self.states[row] = NUMBER
+            self.numbers[row] = value
+            return
+        else:
+            if self.others is None:
+                self.others = np.full(len(self.states), None, dtype=object)
+            self.states[row] = OTHER
+            self.others[row] = value
+            return
+        self.numbers[row] = np.nan
+
+    def insert(self, row: int, value: Any):
+        self.numbers = np.insert(self.numbers, row, np.nan)
+        self.states = np.insert(self.states, row, ABSENT)
+        if self.others is not None:
+            self.others = np.insert(self.others, row, None)
+        self.set(row, value)
+
+    def extend(self, values: Sequence[Any]):
+        numbers, states, others = self._encode(values)
+        if others is not None or self.others is not None:
+            head = self.others if self.others is not None else np.full(len(self.states), None, dtype=object)
+            tail = others if others is not None else np.full(len(values), None, dtype=object)
+            self.others = np.concatenate([head, tail])
+        self.numbers = np.concatenate([self.numbers, numbers])
+        self.states = np.concatenate([self.states, states])
+
+    def delete(self, rows: np.ndarray):
+        self.numbers = np.delete(self.numbers, rows)
+        self.states = np.delete(self.states, rows)
+        if self.others is not None:
+            self.others = np.delete(self.others, rows)
+
+    def match(self, op: str, value: Any) -> np.ndarray:
+        """Boolean mask of the cases whose value satisfies the predicate"""
+        states = self.states
+        if op == 'exists':
+            return states != ABSENT
+        if op == 'missing':
+            return states == ABSENT
+        if value is None:
+            if op not in ('=', '!='):
+                raise ValueError(f"'{op}' cannot compare with null")
+            is_null = states == NULL
+            return is_null if op == '=' else (states != ABSENT) & ~is_null
+
+        compare = COMPARISONS[op]
+        if _is_number(value):
+            with np.errstate(invalid='ignore'):
+                mask = compare(self.numbers, float(value)) & (states == NUMBER)
+        else:
+            mask = np.zeros(len(states), dtype=bool)
+        # Strings, lists and objects are compared as Python values; != also
+        # matches values of another type, like SQL on present non-null fields
+        others = np.flatnonzero(states == OTHER)
+        if len(others):
+            for row in others.tolist():
+                try:
+                    mask[row] = compare(self.others[row], value)
+                except TypeError:
+                    mask[row] = op == '!='
+        if op == '!=' and not _is_number(value):
+            mask |= states == NUMBER
+        return mask
+
+
+class SuiteIndex:
+    """Per-path columns over a suite for equality, range and existence queries
+
+    A path's column is built on its first query and then kept current through
+    set(), insert() and delete(); cases appended to the suite are indexed on
+    the next query, and replacing the suite object drops every column.
+    """
+
+    def __init__(self):
+        self._columns: Dict[str, _Column] = {}
+        self._suite: Optional[Sequence[Any]] = None
+        self._length = 0
+
+    @property
+    def paths(self) -> List[str]:
+        return list(self._columns)
+
+    def reset(self):
+        self._columns.clear()
+        self._suite = None
+        self._length = 0
+
+    def _sync(self, cases: Sequence[Any]):
+        """Drop columns for a replaced suite and index any appended cases"""
+        if cases is not self._suite or len(cases) < self._length:
+            self.reset()
+            self._suite = cases
+            self._length = len(cases)
+            return
+        if len(cases) > self._length:
+            appended = cases[self._length:]
+            for path, column in self._columns.items():
+                parts = path.split('.')
+                column.extend([_lookup(case, parts) for case in appended])
+            self._length = len(cases)
+
+    def _column(self, cases: Sequence[Any], path: str) -> _Column:
+        column = self._columns.get(path)
+        if column is None:
+            # Columnar suites can read one field without decoding whole cases
+            field = getattr(cases, 'field', None)
+            values = field(path, _MISSING) if field else None
+            if values is None:
+                parts = path.split('.')
+                values = [_lookup(case, parts) for case in cases]
+            column = self._columns[path] = _Column(values)
+        return column
+
+    def query(self, cases: Sequence[Any], predicates: Iterable[Predicate]) -> List[int]:
+        """Positions of the cases matching every predicate, in suite order"""
+        self._sync(cases)
+        mask = np.ones(len(cases), dtype=bool)
+        for predicate in predicates:
+            if predicate.op not in COMPARISONS and predicate.op not in CHECKS:
+                raise ValueError(f"Unknown query operator: {predicate.op}")
+            mask &= self._column(cases, predicate.path).match(predicate.op, predicate.value)
+        return np.flatnonzero(mask).tolist()
+
+    # Incremental updates, called as the suite changes. Positions past the
+    # indexed length belong to appended cases that the next query picks up.
+
+    def set(self, i: int, case: Any):
+        if i < self._length:
+            for path, column in self._columns.items():
+                column.set(i, _lookup(case, path.split('.')))
+
+    def refresh(self, cases: Sequence[Any], rows: Iterable[int]):
+        """Re-read the given positions after they were changed in place"""
+        if self._columns:
+            for row in rows:
+                self.set(row, cases[row])
+
+    def insert(self, i: int, case: Any):
+        if i > self._length:
+            return
+        for path, column in self._columns.items():
+            column.insert(i, _lookup(case, path.split('.')))
+        self._length += 1
+
+    def delete(self, rows: Iterable[int]):
+        rows = np.unique(np.fromiter(rows, dtype=np.int64))
+        rows = rows[rows < self._length]
+        for column in self._columns.values():
+            column.delete(rows)
+        self._length -= len(rows)
+
+
+def delete_cases(cases: MutableSequence[Any], rows: Iterable[int]) -> int:
+    """Delete the cases at the given positions and return how many were removed"""
+    rows = sorted(set(rows))
+    if not rows:
+        return 0
+    if isinstance(cases, list):
+        drop = set(rows)
+        cases[:] = [case for position, case in enumerate(cases) if position not in drop]
+        return len(rows)
+    delete_many = getattr(cases, 'delete_many', None)
+    if delete_many:
+        delete_many(rows)
+        return len(rows)
+    # Delete contiguous runs from the back so earlier positions stay valid
+    end = len(rows)
+    while end:
+        start = end - 1
+        while start and rows[start - 1] == rows[start] - 1:
+            start -= 1
+        del cases[rows[start]:rows[end - 1] + 1]
+        end = start
+    return len(rows)
@@ -0,0 +1,207 @@
+"""Schema validation of test cases against the health-score template"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from jsonviewer.templates import DEFAULT_TEST_CASE
+
+# Below this many cases the process pool costs more than it saves
+PARALLEL_THRESHOLD = 5000
+CHUNK_SIZE = 2000
+
+FieldError = Tuple[str, str]
+CaseError = Tuple[int, str, str]
+
+_NUMBER_TYPES = frozenset({int, float})
+_MISSING = object()
+
+
+def _describe(value: Any) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, (int, float)):
+        return "number"
+    if isinstance(value, str):
+        return "string"
+    if isinstance(value, list):
+        return "list"
+    return "object"
+
+
+class FieldSpec:
+    """Expected type of one template field, derived from its template value"""
+
+    __slots__ = ('kind', 'types', 'item_types')
+
+    def __init__(self, value: Any):
+        self.item_types = None
+        if isinstance(value, bool):
+            self.kind, self.types = "boolean", frozenset({bool})
+        elif isinstance(value, (int, float)):
+            self.kind, self.types = "number", _NUMBER_TYPES
+        elif isinstance(value, str):
+            self.kind, self.types = "string", frozenset({str})
+        elif isinstance(value, list):
+            self.types = frozenset({list})
+            if value and all(type(v) in _NUMBER_TYPES for v in value):
+                self.kind, self.item_types = "list of numbers", _NUMBER_TYPES
+            else:
+                self.kind = "list"
+        else:
+            self.kind, self.types = "any", None
+
+    def check(self, value: Any) -> Optional[str]:
+        """Return an error message, or None if the value matches"""
+        if self.types is None:
+            return None
+        if type(value) not in self.types:
+            return f"expected {self.kind}, got {_describe(value)}"
+        if self.item_types is not None:
+            for item in value:
+                if type(item) not in self.item_types:
+                    return f"expected {self.kind}, found {_describe(item)} item"
+        return None
+
+
+class CompiledSchema:
+    """Validator compiled once from a template such as DEFAULT_TEST_CASE
+
+    Sections (mhm, smk, ...) map each expected key to a FieldSpec, so
+    validating a case is one dictionary pass per section.
+    """
+
+    def __init__(self, template: Dict[str, Any] = DEFAULT_TEST_CASE, allow_null: bool = True,
+                 allow_missing: bool = False, allow_extra: bool = False):
+        self.allow_null = allow_null
+        self.allow_missing = allow_missing
+        self.allow_extra = allow_extra
+        self.sections: Dict[str, Dict[str, FieldSpec]] = {}
+        self.fields: Dict[str, FieldSpec] = {}
+        for key, value in template.items():
+            if isinstance(value, dict):
+                self.sections[key] = {k: FieldSpec(v) for k, v in value.items()}
+            else:
+                self.fields[key] = FieldSpec(value)
+        self._root_keys = set(template)
+
+    def _check_fields(self, data: Dict, specs: Dict[str, FieldSpec], prefix: str,
+                      errors: List[FieldError], expected_keys):
+        for key, spec in specs.items():
+            value = data.get(key, _MISSING)
+            # Fast path: exact type match for scalar fields
+            if spec.item_types is None and (spec.types is None or type(value) in spec.types):
+                continue
+            if value is _MISSING:
+                if not self.allow_missing:
+                    errors.append((f"{prefix}{key}", "missing field"))
+                continue
+            if value is None:
+                if not self.allow_null:
+                    errors.append((f"{prefix}{key}", "null value"))
+                continue
+            message = spec.check(value)
+            if message:
+                errors.append((f"{prefix}{key}", message))
+        if not self.allow_extra and data.keys() != expected_keys:
+            for key in data.keys() - expected_keys:
+                errors.append((f"{prefix}{key}", "unexpected field"))
+
+    def validate(self, case: Any) -> List[FieldError]:
+        """Return (path, message) errors for one case; empty when valid"""
+        if not isinstance(case, dict):
+            return [("", f"expected object, got {_describe(case)}")]
+        errors: List[FieldError] = []
+        for section, specs in self.sections.items():
+            data = case.get(section)
+            if data is None:
+                if section in case and not self.allow_null:
+                    errors.append((section, "null value"))
+                elif section not in case and not self.allow_missing:
+                    errors.append((section, "missing section"))
+                continue
+            if not isinstance(data, dict):
+                errors.append((section, f"expected object, got {_describe(data)}"))
+                continue
+            self._check_fields(data, specs, f"{section}.", errors, specs.keys())
+        self._check_fields(case, self.fields, "", errors, self._root_keys)
+        return errors
+
+
+@lru_cache(maxsize=None)
+def default_schema(allow_null: bool = True, allow_missing: bool = False,
+                   allow_extra: bool = False) -> CompiledSchema:
+    """Schema for DEFAULT_TEST_CASE, compiled once per process and shared by every caller"""
+    return CompiledSchema(DEFAULT_TEST_CASE, allow_null, allow_missing, allow_extra)
+
+
+# Per-worker schema, compiled once by the pool initializer
+_worker_schema: Optional[CompiledSchema] = None
+
+
+def _init_worker(template: Dict[str, Any], options: Dict[str, bool]):
+    global _worker_schema
+    _worker_schema = CompiledSchema(template, **options)
+
+
+def _validate_chunk(start: int, cases: List[Any]) -> List[CaseError]:
+    return [(start + i, path, message)
+            for i, case in enumerate(cases)
+            for path, message in _worker_schema.validate(case)]
+
+
+def _chunks(cases: Iterable[Any], size: int) -> Iterator[Tuple[int, List[Any]]]:
+    iterator = iter(cases)
+    start = 0
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield start, chunk
+        start += len(chunk)
+
+
+def validate_suite(cases: Iterable[Any], template: Dict[str, Any] = DEFAULT_TEST_CASE,
+                   allow_null: bool = True, allow_missing: bool = False, allow_extra: bool = False,
+                   workers: Optional[int] = None, chunk_size: int = CHUNK_SIZE) -> List[CaseError]:
+    """Validate a whole suite and return (case index, path, message) errors
+
+    Large suites are split into chunks and validated on a process pool whose
+    workers each compile the schema once; small suites run inline.
+    """
+    options = {'allow_null': allow_null, 'allow_missing': allow_missing, 'allow_extra': allow_extra}
+    size = len(cases) if hasattr(cases, '__len__') else None
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or (size is not None and size < PARALLEL_THRESHOLD):
+        if template is DEFAULT_TEST_CASE:
+            schema = default_schema(**options)
+        else:
+            schema = CompiledSchema(template, **options)
+        return [(i, path, message)
+                for i, case in enumerate(cases)
+                for path, message in schema.validate(case)]
+
+    errors: List[CaseError] = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(template, options)) as pool:
+        pending = []
+        for start, chunk in _chunks(cases, chunk_size):
+            pending.append(pool.submit(_validate_chunk, start, chunk))
+            # Bound the number of chunks held in memory at once
+            if len(pending) >= workers * 2:
+                errors.extend(pending.pop(0).result())
+        for future in pending:
+            errors.extend(future.result())
+    return errors
+
+
+def summarize_errors(errors: List[CaseError]) -> Dict[str, int]:
+    """Count errors per field path, most frequent first"""
+    counts: Dict[str, int] = {}
+    for _, path, _ in errors:
+        counts[path] = counts.get(path, 0) + 1
+    return dict(sorted(counts.items(), key=lambda item: -item[1]))
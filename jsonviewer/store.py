@@ -0,0 +1,275 @@
+"""Persistent SQLite-backed suite store with indexed field lookups"""
+import re
+import sqlite3
+from collections import OrderedDict
+from collections.abc import MutableSequence
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from jsonviewer import codec
+
+DEFAULT_DB_PATH = "test_cases.db"
+READ_CACHE_SIZE = 512
+BATCH_SIZE = 1000
+# Below this gap, midpoints of REAL positions stop being distinct; renumber instead
+MIN_POSITION_GAP = 1e-6
+
+# Field paths become literal SQL in index expressions, so keep them to safe characters
+_PATH_PATTERN = re.compile(r'^[A-Za-z0-9_]+(\.[A-Za-z0-9_]+)*$')
+
+_COMPARISONS = {'=': '=', '!=': '!=', '<': '<', '<=': '<=', '>': '>', '>=': '>='}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cases (
+    id INTEGER PRIMARY KEY,
+    position REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_cases_position ON cases(position);
+CREATE TABLE IF NOT EXISTS field_indexes (
+    path TEXT PRIMARY KEY
+);
+"""
+
+
+def _field_expression(path: str) -> str:
+    """SQL expression for a flattened field; must match the index text exactly"""
+    if not _PATH_PATTERN.match(path):
+        raise ValueError(f"Unsupported field path for indexing: {path}")
+    return f"json_extract(data, '$.{path}')"
+
+
+def _encode(case: Any) -> str:
+    return codec.dumps(case)
+
+
+class StoredSuite(MutableSequence):
+    """List-like suite persisted in SQLite
+
+    Case ids are held in memory in suite order, so len() and indexing are
+    cheap and case bodies load lazily, a page at a time. Every mutation writes
+    only the affected rows.
+    """
+
+    def __init__(self, path: str = DEFAULT_DB_PATH):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._ids: List[int] = [row[0] for row in self._conn.execute(
+            "SELECT id FROM cases ORDER BY position"
+        )]
+        self._positions: Optional[Dict[int, int]] = None
+        self._cache: 'OrderedDict[int, Any]' = OrderedDict()
+
+    # Reading
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _remember(self, case_id: int, case: Any):
+        self._cache[case_id] = case
+        self._cache.move_to_end(case_id)
+        while len(self._cache) > READ_CACHE_SIZE:
+            self._cache.popitem(last=False)
+
+    def _load(self, ids: Sequence[int]) -> Dict[int, Any]:
+        loaded = {}
+        for start in range(0, len(ids), BATCH_SIZE):
+            batch = ids[start:start + BATCH_SIZE]
+            placeholders = ",".join("?" * len(batch))
+            for case_id, data in self._conn.execute(
+                f"SELECT id, data FROM cases WHERE id IN ({placeholders})", batch
+            ):
+                loaded[case_id] = codec.loads(data)
+        return loaded
+
+    def prefetch(self, indices: Iterable[int]):
+        """Load the cases at these positions in one query, e.g. the visible page"""
+        missing = [self._ids[i] for i in indices if self._ids[i] not in self._cache]
+        for case_id, case in self._load(missing).items():
+            self._remember(case_id, case)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            ids = self._ids[i]
+            loaded = self._load([case_id for case_id in ids if case_id not in self._cache])
+            return [self._cache[case_id] if case_id in self._cache else loaded[case_id] for case_id in ids]
+        case_id = self._ids[i]
+        if case_id in self._cache:
+            self._cache.move_to_end(case_id)
+            return self._cache[case_id]
+        case = self._load([case_id])[case_id]
+        self._remember(case_id, case)
+        return case
+
+    def __iter__(self) -> Iterator[Any]:
+        for start in range(0, len(self._ids), BATCH_SIZE):
+            ids = self._ids[start:start + BATCH_SIZE]
+            loaded = self._load(ids)
+            for case_id in ids:
+                yield loaded[case_id]
+
+    def case_id(self, i: int) -> int:
+        return self._ids[i]
+
+    def index_of(self, case_id: int) -> int:
+        """Position of a case id in the suite"""
+        if self._positions is None:
+            self._positions = {case_id: i for i, case_id in enumerate(self._ids)}
+        return self._positions[case_id]
+
+    # Writing
+
+    def _position_between(self, i: int) -> float:
+        """Ordering key for a new case inserted before position i"""
+        def position_of(index: int) -> float:
+            return self._conn.execute(
+                "SELECT position FROM cases WHERE id = ?", (self._ids[index],)
+            ).fetchone()[0]
+
+        if not self._ids:
+            return 0.0
+        if i >= len(self._ids):
+            return position_of(-1) + 1.0
+        after = position_of(i)
+        before = position_of(i - 1) if i > 0 else after - 2.0
+        if after - before < MIN_POSITION_GAP:
+            self._renumber()
+            return i - 0.5
+        return (before + after) / 2
+
+    def _renumber(self):
+        """Reset positions to whole numbers in suite order, reopening gaps between cases"""
+        with self._conn:
+            self._conn.executemany(
+                "UPDATE cases SET position = ? WHERE id = ?",
+                ((float(index), case_id) for index, case_id in enumerate(self._ids))
+            )
+
+    def __setitem__(self, i, case):
+        if isinstance(i, slice):
+            raise TypeError("StoredSuite does not support slice assignment")
+        case_id = self._ids[i]
+        with self._conn:
+            self._conn.execute("UPDATE cases SET data = ? WHERE id = ?", (_encode(case), case_id))
+        self._remember(case_id, case)
+
+    def update_many(self, changes: Iterable[Tuple[int, Any]]) -> int:
+        """Replace cases by position as they arrive, in batched transactions; returns the count"""
+        count = 0
+        batch = []
+        for i, case in changes:
+            case_id = self._ids[i]
+            batch.append((_encode(case), case_id))
+            self._cache.pop(case_id, None)
+            if len(batch) >= BATCH_SIZE:
+                with self._conn:
+                    self._conn.executemany("UPDATE cases SET data = ? WHERE id = ?", batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            with self._conn:
+                self._conn.executemany("UPDATE cases SET data = ? WHERE id = ?", batch)
+            count += len(batch)
+        return count
+
+    def __delitem__(self, i):
+        if isinstance(i, slice):
+            ids = self._ids[i]
+            with self._conn:
+                self._conn.executemany("DELETE FROM cases WHERE id = ?", [(case_id,) for case_id in ids])
+            del self._ids[i]
+        else:
+            case_id = self._ids.pop(i)
+            with self._conn:
+                self._conn.execute("DELETE FROM cases WHERE id = ?", (case_id,))
+            ids = [case_id]
+        for case_id in ids:
+            self._cache.pop(case_id, None)
+        self._positions = None
+
+    def insert(self, i: int, case: Any):
+        i = max(0, min(i if i >= 0 else len(self._ids) + i, len(self._ids)))
+        with self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO cases (position, data) VALUES (?, ?)", (self._position_between(i), _encode(case))
+            )
+        self._ids.insert(i, cursor.lastrowid)
+        self._remember(cursor.lastrowid, case)
+        self._positions = None
+
+    def extend(self, cases: Iterable[Any]):
+        """Append many cases in batched transactions"""
+        position = self._position_between(len(self._ids))
+        batch = []
+        for case in cases:
+            batch.append(case)
+            if len(batch) >= BATCH_SIZE:
+                position = self._append_batch(batch, position)
+                batch = []
+        if batch:
+            self._append_batch(batch, position)
+
+    def _append_batch(self, batch: List[Any], position: float) -> float:
+        with self._conn:
+            for case in batch:
+                cursor = self._conn.execute(
+                    "INSERT INTO cases (position, data) VALUES (?, ?)", (position, _encode(case))
+                )
+                self._ids.append(cursor.lastrowid)
+                position += 1.0
+        self._positions = None
+        return position
+
+    def clear(self):
+        with self._conn:
+            self._conn.execute("DELETE FROM cases")
+        self._ids = []
+        self._cache.clear()
+        self._positions = None
+
+    # Field indexes
+
+    def indexed_fields(self) -> List[str]:
+        return [row[0] for row in self._conn.execute("SELECT path FROM field_indexes ORDER BY path")]
+
+    def create_index(self, path: str):
+        """Index a flattened field such as "mhm.DM2" for fast lookups"""
+        expression = _field_expression(path)
+        name = "idx_field_" + path.replace('.', '__')
+        with self._conn:
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON cases({expression})")
+            self._conn.execute("INSERT OR IGNORE INTO field_indexes (path) VALUES (?)", (path,))
+
+    def drop_index(self, path: str):
+        _field_expression(path)
+        with self._conn:
+            self._conn.execute(f"DROP INDEX IF EXISTS idx_field_{path.replace('.', '__')}")
+            self._conn.execute("DELETE FROM field_indexes WHERE path = ?", (path,))
+
+    def find(self, path: str, value: Any, op: str = '=') -> List[int]:
+        """Return suite positions of cases whose field compares to value
+
+        Uses the field's expression index when one exists, otherwise SQLite
+        scans the table without loading cases into Python. A value of None
+        matches fields that are null or missing with '=', and the rest with '!='.
+        """
+        if op not in _COMPARISONS:
+            raise ValueError(f"Unsupported comparison: {op}")
+        if isinstance(value, (list, dict)):
+            raise ValueError(f"Cannot compare {path} to a list or object")
+        expression = _field_expression(path)
+        if value is None:
+            if op not in ('=', '!='):
+                raise ValueError(f"Only = and != can compare {path} to null")
+            check = "IS NULL" if op == '=' else "IS NOT NULL"
+            rows = self._conn.execute(f"SELECT id FROM cases WHERE {expression} {check}")
+            return sorted(self.index_of(case_id) for case_id, in rows)
+        if isinstance(value, bool):
+            value = int(value)
+        rows = self._conn.execute(f"SELECT id FROM cases WHERE {expression} {_COMPARISONS[op]} ?", (value,))
+        return sorted(self.index_of(case_id) for case_id, in rows)
+
+    def close(self):
+        self._conn.close()
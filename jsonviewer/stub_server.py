@@ -0,0 +1,104 @@
+"""Local stand-in for the health-score API, for trying the executor and tests
+
+Usage: python -m jsonviewer.stub_server [--port 8765] [--latency-ms 5] [--fail-rate 0.0] [--drift 0.0]
+
+--drift scales every score by 1 + drift, to stand in for a new build in
+regression runs.
+"""
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Tuple
+
+
+def score_case(case: Dict[str, Any], drift: float = 0.0) -> Dict[str, Any]:
+    """Deterministic fake score: averages of the numeric fields per section"""
+    scores = {}
+    for section, fields in case.items():
+        if isinstance(fields, dict):
+            numbers = [v for v in fields.values() if isinstance(v, (int, float)) and not isinstance(v, bool)]
+            if numbers:
+                scores[section] = round(sum(numbers) / len(numbers) * (1 + drift), 4)
+    total = round(sum(scores.values()) / len(scores), 4) if scores else None
+    return {"score": total, "sections": scores}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Small replies on keep-alive connections otherwise wait on delayed ACKs
+    disable_nagle_algorithm = True
+    latency_ms = 0.0
+    fail_rate = 0.0
+    drift = 0.0
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        if self.fail_rate and random.random() < self.fail_rate:
+            self._reply(503, {"error": "stub failure"})
+            return
+        try:
+            payload = json.loads(body)
+        except json.JSONDecodeError as e:
+            self._reply(400, {"error": f"Invalid JSON: {e}"})
+            return
+        cases = payload if isinstance(payload, list) else [payload]
+        results = [score_case(c, self.drift) if isinstance(c, dict) else {"score": None} for c in cases]
+        self._reply(200, results if isinstance(payload, list) else results[0])
+
+    def _reply(self, status: int, data: Any):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    # The default backlog of 5 refuses connections under executor concurrency
+    request_queue_size = 128
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients hanging up early, e.g. after a timeout, are routine here
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def start_stub_server(port: int = 0, latency_ms: float = 0.0, fail_rate: float = 0.0,
+                      drift: float = 0.0) -> Tuple[StubServer, str]:
+    """Start the stub on a background thread and return (server, url)"""
+    handler = type('ConfiguredStubHandler', (StubHandler,),
+                   {'latency_ms': latency_ms, 'fail_rate': fail_rate, 'drift': drift})
+    server = StubServer(('127.0.0.1', port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/score"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--drift", type=float, default=0.0)
+    args = parser.parse_args()
+    server, url = start_stub_server(args.port, args.latency_ms, args.fail_rate, args.drift)
+    print(f"Stub health-score API listening on {url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""Health-score test case templates shared by the dashboards"""
+from typing import Dict, Any
+
+# Default test case template
+DEFAULT_TEST_CASE = {
+    "mhm": {
+        "age": 25, "hgt": 185, "wgt": 77, "sex": 1, "dbp": 78, "map": 85, "sbp": 118,
+        "fat": 20, "ppr": 40, "rhr": 70, "rhr_day": [70], "spo2": 99, "vo2max": 59.5,
+        "whr": 0.8, "wst": 80, "alc": 80, "cst": 80, "exh": 80, "fCV": 80, "fDM": 80,
+        "fMI": 80, "pHT": 80, "a1c": 80, "acr": 80, "cre": 80, "crp": 80, "cys": 80,
+        "fbg": 80, "eag": 80, "gfr": 80, "hdl": 80, "ldl": 80, "tgl": 80, "tsc": 80,
+        "vdl": 80, "CAN": 0, "CHD": 0, "CHF": 0, "CKD": 0, "CVD": 0, "DM2": 1,
+        "HTN": 0, "LDS": 0, "LVH": 0, "PDM": 0, "PMI": 0, "STK": 0, "TDM": 0, "THT": 0
+    },
+    "smk": {"now": 0, "evr": 0, "yrs": 0, "num": 0, "qit": 0, "slt": 0},
+    "slp": {"bed": [8.5], "slp": [8.0], "awk": [1], "slp_avg": [8]},
+    "nut": {
+        "nqs01": 0.5, "nqs02": 0.5, "nqs03": 0.5, "nqs04": 0.5, "nqs05": 0.5,
+        "nqs06": 0.5, "nqs07": 0.5, "nqs08": 0.5, "nqs09": 0.5, "nqs10": 0.5,
+        "nqs11": 0.5, "nqs12": 0.5, "nqs13": 0.5, "nqs14": 0.5, "nqs15": 0.5,
+        "nqs16": 0.5, "nqs17": 0.5, "nqs18": 0.5, "nqs19": 0.5, "nqs20": 0.5,
+        "nqs21": 0.5, "nqs22": 0.5, "protein": 0.5, "sfat": 0.5, "sugar": 0.5,
+        "fiber": 0.5, "sodium": 0.5, "vitamin_c": 0.5, "iron": 0.5,
+        "percentage_drink": 0.5, "density_drink": 0.5
+    },
+    "qlm": {
+        "q01": 0.5, "q02": 0.5, "q03": 0.5, "q04": 0.5, "q05": 0.5, "q06": 0.5,
+        "q07": 0.5, "q08": 0.5, "q09": 0.5, "q10": 0.5, "q11": 0.5, "q12": 0.5,
+        "q13": 0.5, "q14": 0.5, "q15": 0.5, "q16": 0.5, "q17": 0.5, "q18": 0.5,
+        "q19": 0.5, "q20": 0.5, "q21": 0.5, "q22": 0.5, "q23": 0.5, "q24": 0.5,
+        "q25": 0.5, "q26": 0.5, "q27": 0.5, "gad01": 0.5, "gad02": 0.5, "gad03": 0.5,
+        "gad04": 0.5, "gad05": 0.5, "gad06": 0.5, "gad07": 0.5, "phq01": 0.5,
+        "phq02": 0.5, "phq03": 0.5, "phq04": 0.5, "phq05": 0.5, "phq06": 0.5,
+        "phq07": 0.5, "phq08": 0.5, "phq09": 0.5, "pss01": 0.5, "pss02": 0.5,
+        "pss03": 0.5, "pss04": 0.5, "pss05": 0.5, "pss06": 0.5, "pss07": 0.5,
+        "pss08": 0.5, "pss09": 0.5, "pss10": 0.5, "gsrh": 0.5, "maas01": 0.5,
+        "maas02": 0.5, "maas03": 0.5, "maas04": 0.5, "maas05": 0.5, "maas06": 0.5,
+        "maas07": 0.5, "maas08": 0.5, "maas09": 0.5, "maas10": 0.5, "maas11": 0.5,
+        "maas12": 0.5, "maas13": 0.5, "maas14": 0.5, "maas15": 0.5, "mfm": [0.5]
+    },
+    "clip": False
+}
+
+
+def get_default_json_structure() -> Dict[str, Any]:
+    """Returns the default JSON structure with all values set to null/empty"""
+    return {
+        "mhm": {
+            "age": None,
+            "hgt": None,
+            "wgt": None,
+            "sex": None,
+            "dbp": None,
+            "map": None,
+            "sbp": None,
+            "fat": None,
+            "ppr": None,
+            "rhr": None,
+            "rhr_day": [],
+            "spo2": None,
+            "vo2max": None,
+            "whr": None,
+            "wst": None,
+            "alc": None,
+            "cst": None,
+            "exh": None,
+            "fCV": None,
+            "fDM": None,
+            "fMI": None,
+            "pHT": None,
+            "a1c": None,
+            "acr": None,
+            "cre": None,
+            "crp": None,
+            "cys": None,
+            "fbg": None,
+            "eag": None,
+            "gfr": None,
+            "hdl": None,
+            "ldl": None,
+            "tgl": None,
+            "tsc": None,
+            "vdl": None,
+            "CAN": None,
+            "CHD": None,
+            "CHF": None,
+            "CKD": None,
+            "CVD": None,
+            "DM2": None,
+            "HTN": None,
+            "LDS": None,
+            "LVH": None,
+            "PDM": None,
+            "PMI": None,
+            "STK": None,
+            "TDM": None,
+            "THT": None
+        },
+        "smk": {
+            "now": None,
+            "evr": None,
+            "yrs": None,
+            "num": None,
+            "qit": None,
+            "slt": None,
+        },
+        "slp": {
+            "bed": [],
+            "slp": [],
+            "awk": [],
+            "slp_avg": []
+        },
+        "nut": {
+            "nqs01": None,
+            "nqs02": None,
+            "nqs03": None,
+            "nqs04": None,
+            "nqs05": None,
+            "nqs06": None,
+            "nqs07": None,
+            "nqs08": None,
+            "nqs09": None,
+            "nqs10": None,
+            "nqs11": None,
+            "nqs12": None,
+            "nqs13": None,
+            "nqs14": None,
+            "nqs15": None,
+            "nqs16": None,
+            "nqs17": None,
+            "nqs18": None,
+            "nqs19": None,
+            "nqs20": None,
+            "nqs21": None,
+            "nqs22": None,
+            "protein": None,
+            "sfat": None,
+            "sugar": None,
+            "fiber": None,
+            "sodium": None,
+            "vitamin_c": None,
+            "iron": None,
+            "percentage_drink": None,
+            "density_drink": None,
+        },
+        "qlm": {
+            "q01": None,
+            "q02": None,
+            "q03": None,
+            "q04": None,
+            "q05": None,
+            "q06": None,
+            "q07": None,
+            "q08": None,
+            "q09": None,
+            "q10": None,
+            "q11": None,
+            "q12": None,
+            "q13": None,
+            "q14": None,
+            "q15": None,
+            "q16": None,
+            "q17": None,
+            "q18": None,
+            "q19": None,
+            "q20": None,
+            "q21": None,
+            "q22": None,
+            "q23": None,
+            "q24": None,
+            "q25": None,
+            "q26": None,
+            "q27": None,
+            "gad01": None,
+            "gad02": None,
+            "gad03": None,
+            "gad04": None,
+            "gad05": None,
+            "gad06": None,
+            "gad07": None,
+            "phq01": None,
+            "phq02": None,
+            "phq03": None,
+            "phq04": None,
+            "phq05": None,
+            "phq06": None,
+            "phq07": None,
+            "phq08": None,
+            "phq09": None,
+            "pss01": None,
+            "pss02": None,
+            "pss03": None,
+            "pss04": None,
+            "pss05": None,
+            "pss06": None,
+            "pss07": None,
+            "pss08": None,
+            "pss09": None,
+            "pss10": None,
+            "gsrh": None,
+            "maas01": None,
+            "maas02": None,
+            "maas03": None,
+            "maas04": None,
+            "maas05": None,
+            "maas06": None,
+            "maas07": None,
+            "maas08": None,
+            "maas09": None,
+            "maas10": None,
+            "maas11": None,
+            "maas12": None,
+            "maas13": None,
+            "maas14": None,
+            "maas15": None,
+            "mfm": [],
+        },
+        "clip": None
+    }
@@ -0,0 +1,460 @@
+"""Declarative bulk rewrites of suites: rename, compute, fill, drop and conditional set
+
+A pipeline is written one step per line and compiled once:
+
+    rename nut.sfat -> nut.saturated_fat
+    compute slp.bed = slp.bed * 60
+    fill qlm.mfm = [0.5]
+    drop mhm.legacy
+    set smk.now = 0 where smk.evr = 0
+
+Any step can end in a 'where' clause in the sidebar query syntax. Steps
+never modify a case in place: a changed case is a copy sharing its untouched
+sections with the original, so a dry run leaves the suite as it was. Large
+suites stream through a process pool in chunks, with only the chunks in
+flight held in memory, and changed cases come back in suite order for
+writing.
+"""
+import ast
+import math
+import operator
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, MutableSequence, NamedTuple, Optional, Tuple
+
+from jsonviewer import codec
+from jsonviewer.flatten import MISSING
+from jsonviewer.generator import clone_case
+from jsonviewer.query import compile_query, parse_query
+
+# Below this many cases the process pool costs more than it saves
+PARALLEL_THRESHOLD = 5000
+CHUNK_SIZE = 2000
+
+STEP_KINDS = {
+    'rename': "rename PATH -> NEW_PATH",
+    'compute': "compute PATH = EXPRESSION",
+    'fill': "fill PATH = JSON (only where missing or null)",
+    'drop': "drop PATH",
+    'set': "set PATH = JSON",
+}
+
+_STEP = re.compile(r'^(?P<kind>\w+)\s+(?P<body>.+?)(?:\s+where\s+(?P<where>.+))?$', re.IGNORECASE)
+_PATH = r'[^\s=.]+(?:\.[^\s=.]+)*'
+_BODIES = {
+    'rename': re.compile(rf'^(?P<path>{_PATH})\s*->\s*(?P<argument>{_PATH})$'),
+    'compute': re.compile(rf'^(?P<path>{_PATH})\s*=\s*(?P<argument>.+)$'),
+    'fill': re.compile(rf'^(?P<path>{_PATH})\s*=\s*(?P<argument>.+)$'),
+    'drop': re.compile(rf'^(?P<path>{_PATH})$'),
+    'set': re.compile(rf'^(?P<path>{_PATH})\s*=\s*(?P<argument>.+)$'),
+}
+
+_OPERATORS: Dict[type, Callable[[Any, Any], Any]] = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+_FUNCTIONS: Dict[str, Callable[..., Any]] = {
+    'round': round,
+    'abs': abs,
+    'min': min,
+    'max': max,
+}
+
+
+class Step(NamedTuple):
+    kind: str
+    path: str
+    # New path of a rename, expression text of a compute, value of a fill or set
+    argument: Any = None
+    where: str = ''
+    text: str = ''
+
+
+class _Skip(Exception):
+    """A step's inputs are missing or not numbers, so the case is left as it was"""
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _same(a: Any, b: Any) -> bool:
+    return type(a) is type(b) and a == b
+
+
+def parse_steps(text: str) -> List[Step]:
+    """Parse one step per line; blank lines and lines starting with # are ignored"""
+    steps = []
+    for number, line in enumerate(text.splitlines(), 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        match = _STEP.match(line)
+        kind = match['kind'].lower() if match else None
+        body = _BODIES[kind].match(match['body'].strip()) if kind in _BODIES else None
+        if body is None:
+            raise ValueError(f"Line {number}: cannot parse step {line!r}; "
+                             f"expected one of: {'; '.join(STEP_KINDS.values())}")
+        argument = body.groupdict().get('argument')
+        if kind in ('fill', 'set'):
+            try:
+                argument = codec.loads(argument)
+            except (codec.JSONDecodeError, ValueError):
+                argument = argument.strip()
+        steps.append(Step(kind, body['path'], argument, (match['where'] or '').strip(), line))
+    return steps
+
+
+# Paths
+
+def _get(case: Any, parts: List[str]) -> Any:
+    node = case
+    for part in parts:
+        if not isinstance(node, dict) or part not in node:
+            return MISSING
+        node = node[part]
+    return node
+
+
+def _with_value(case: Dict, parts: List[str], value: Any) -> Dict:
+    """Copy of case with one field set, copying only the dicts along the path"""
+    root = dict(case)
+    node = root
+    for part in parts[:-1]:
+        child = node.get(part, MISSING)
+        if child is MISSING:
+            child = {}
+        elif not isinstance(child, dict):
+            raise _Skip
+        node[part] = node = dict(child)
+    node[parts[-1]] = value
+    return root
+
+
+def _without(case: Dict, parts: List[str]) -> Dict:
+    """Copy of case with one field removed; the field must exist"""
+    root = dict(case)
+    node = root
+    for part in parts[:-1]:
+        node[part] = node = dict(node[part])
+    del node[parts[-1]]
+    return root
+
+
+def _renamed(case: Dict, parts: List[str], target: List[str]) -> Dict:
+    if parts[:-1] == target[:-1]:
+        # Same section: swap the key where it stands, keeping field order
+        section = _get(case, parts[:-1]) if len(parts) > 1 else case
+        renamed = {}
+        for key, item in section.items():
+            if key == parts[-1]:
+                renamed[target[-1]] = item
+            elif key != target[-1]:
+                renamed[key] = item
+        return _with_value(case, parts[:-1], renamed) if len(parts) > 1 else renamed
+    return _with_value(_without(case, parts), target, _get(case, parts))
+
+
+# Expressions
+
+def _elementwise(func: Callable[..., Any], *args: Any) -> Any:
+    """Apply func to numbers, or element by element across lists of equal length"""
+    lists = [arg for arg in args if isinstance(arg, list)]
+    if lists:
+        length = len(lists[0])
+        if any(len(arg) != length for arg in lists):
+            raise _Skip
+        return [_elementwise(func, *(arg[k] if isinstance(arg, list) else arg for arg in args))
+                for k in range(length)]
+    if not all(_is_number(arg) for arg in args):
+        raise _Skip
+    try:
+        result = func(*args)
+    except (ArithmeticError, ValueError, TypeError):
+        raise _Skip
+    # Complex powers, inf and nan are not JSON numbers
+    if not _is_number(result) or (isinstance(result, float) and not math.isfinite(result)):
+        raise _Skip
+    return result
+
+
+def _dotted(node: ast.AST) -> Optional[List[str]]:
+    if isinstance(node, ast.Name):
+        return [node.id]
+    if isinstance(node, ast.Attribute):
+        parts = _dotted(node.value)
+        return parts + [node.attr] if parts else None
+    return None
+
+
+def _compile_expression(node: ast.AST) -> Callable[[Any], Any]:
+    """Arithmetic over field paths and numbers, as a function of the case"""
+    parts = _dotted(node)
+    if parts:
+        def field(case: Any) -> Any:
+            value = _get(case, parts)
+            if value is MISSING or value is None:
+                raise _Skip
+            return value
+        return field
+    if isinstance(node, ast.Constant) and _is_number(node.value):
+        constant = node.value
+        return lambda case: constant
+    if isinstance(node, ast.BinOp) and type(node.op) in _OPERATORS:
+        op = _OPERATORS[type(node.op)]
+        left = _compile_expression(node.left)
+        right = _compile_expression(node.right)
+        return lambda case: _elementwise(op, left(case), right(case))
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        sign = operator.neg if isinstance(node.op, ast.USub) else operator.pos
+        operand = _compile_expression(node.operand)
+        return lambda case: _elementwise(sign, operand(case))
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in _FUNCTIONS \
+            and node.args and not node.keywords:
+        func = _FUNCTIONS[node.func.id]
+        args = [_compile_expression(arg) for arg in node.args]
+        return lambda case: _elementwise(func, *(arg(case) for arg in args))
+    raise ValueError(f"Unsupported expression: {ast.unparse(node)}")
+
+
+def compile_expression(text: str) -> Callable[[Any], Any]:
+    """Compile e.g. 'round(slp.bed * 60)'; lists are computed element by element
+
+    The function raises _Skip when a field is missing, null or not a number.
+    """
+    try:
+        tree = ast.parse(text.strip(), mode='eval')
+    except SyntaxError:
+        raise ValueError(f"Cannot parse expression: {text.strip()!r}")
+    return _compile_expression(tree.body)
+
+
+# Steps
+
+def _fresh(value: Any) -> Callable[[], Any]:
+    # Every case gets its own copy of a list or object value
+    if isinstance(value, (list, dict)):
+        return lambda: clone_case(value)
+    return lambda: value
+
+
+def _compile_step(step: Step) -> Callable[[Any], Any]:
+    """Function returning a changed copy of a case, or the case itself when the step does not change it"""
+    parts = step.path.split('.')
+    matches = compile_query(parse_query(step.where)) if step.where else None
+
+    if step.kind == 'rename':
+        target = step.argument.split('.')
+
+        def apply(case: Dict) -> Dict:
+            if _get(case, parts) is MISSING or parts == target:
+                return case
+            return _renamed(case, parts, target)
+    elif step.kind == 'compute':
+        expression = compile_expression(step.argument)
+
+        def apply(case: Dict) -> Dict:
+            value = expression(case)
+            return case if _same(_get(case, parts), value) else _with_value(case, parts, value)
+    elif step.kind == 'fill':
+        fresh = _fresh(step.argument)
+
+        def apply(case: Dict) -> Dict:
+            current = _get(case, parts)
+            return _with_value(case, parts, fresh()) if current is MISSING or current is None else case
+    elif step.kind == 'drop':
+        def apply(case: Dict) -> Dict:
+            return case if _get(case, parts) is MISSING else _without(case, parts)
+    else:
+        value = step.argument
+        fresh = _fresh(value)
+
+        def apply(case: Dict) -> Dict:
+            return case if _same(_get(case, parts), value) else _with_value(case, parts, fresh())
+
+    if matches is None:
+        return apply
+    return lambda case: apply(case) if matches(case) else case
+
+
+class TransformReport:
+    """Cases seen and changed, with per-step counts of changed and skipped cases"""
+
+    def __init__(self, steps: List[Step]):
+        self.steps = list(steps)
+        self.cases = 0
+        self.cases_changed = 0
+        self.changed = [0] * len(self.steps)
+        self.skipped = [0] * len(self.steps)
+
+    def merge(self, other: 'TransformReport'):
+        self.cases += other.cases
+        self.cases_changed += other.cases_changed
+        self.changed = [a + b for a, b in zip(self.changed, other.changed)]
+        self.skipped = [a + b for a, b in zip(self.skipped, other.skipped)]
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """One record per step, for tables and reports"""
+        return [{'step': step.text, 'changed': changed, 'skipped': skipped}
+                for step, changed, skipped in zip(self.steps, self.changed, self.skipped)]
+
+
+class Pipeline:
+    """Transform steps parsed and compiled once, applied case by case"""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.steps = parse_steps(text)
+        if not self.steps:
+            raise ValueError("No transform steps given")
+        self._functions = []
+        for step in self.steps:
+            try:
+                self._functions.append(_compile_step(step))
+            except ValueError as e:
+                raise ValueError(f"{step.text!r}: {e}")
+
+    def apply(self, case: Any, report: Optional[TransformReport] = None) -> Any:
+        """The transformed case, or the same object when no step changed it"""
+        if not isinstance(case, dict):
+            return case
+        for number, function in enumerate(self._functions):
+            try:
+                result = function(case)
+            except _Skip:
+                if report is not None:
+                    report.skipped[number] += 1
+                continue
+            if result is not case:
+                if report is not None:
+                    report.changed[number] += 1
+                case = result
+        return case
+
+
+def _transform_chunk(pipeline: Pipeline, cases: List[Any],
+                     dry_run: bool) -> Tuple[TransformReport, Dict[int, Any]]:
+    report = TransformReport(pipeline.steps)
+    changes: Dict[int, Any] = {}
+    for offset, case in enumerate(cases):
+        result = pipeline.apply(case, report)
+        if result is not case:
+            changes[offset] = None if dry_run else result
+    report.cases = len(cases)
+    report.cases_changed = len(changes)
+    return report, changes
+
+
+# Per-worker pipeline, compiled once by the pool initializer
+_worker_state: Optional[Tuple[Pipeline, bool]] = None
+
+
+def _init_worker(text: str, dry_run: bool):
+    global _worker_state
+    _worker_state = (Pipeline(text), dry_run)
+
+
+def _transform_worker(cases: List[Any]) -> Tuple[TransformReport, Dict[int, Any]]:
+    pipeline, dry_run = _worker_state
+    return _transform_chunk(pipeline, cases, dry_run)
+
+
+def _chunks(cases: Iterator[Any], chunk_size: int) -> Iterator[List[Any]]:
+    while True:
+        chunk = list(islice(cases, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def transform_chunks(pipeline: Pipeline, cases: Iterable[Any], report: TransformReport,
+                     dry_run: bool = False, workers: Optional[int] = None,
+                     chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[int, List[Any], Dict[int, Any]]]:
+    """Yield (start, chunk, changes) in suite order, changes mapping offsets to new cases
+
+    Counts are merged into report as chunks complete. With dry_run the
+    changed cases are not sent back and the changes map to None. Suites
+    shorter than PARALLEL_THRESHOLD are transformed inline; otherwise
+    workers compile the pipeline once and at most workers * 2 chunks are in
+    flight.
+    """
+    workers = workers or os.cpu_count() or 1
+    cases = iter(cases)
+    head = list(islice(cases, PARALLEL_THRESHOLD))
+    start = 0
+    if workers == 1 or len(head) < PARALLEL_THRESHOLD:
+        for chunk in _chunks(chain(head, cases), chunk_size):
+            chunk_report, changes = _transform_chunk(pipeline, chunk, dry_run)
+            report.merge(chunk_report)
+            yield start, chunk, changes
+            start += len(chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(pipeline.text, dry_run)) as pool:
+        pending = []
+        for chunk in _chunks(chain(head, cases), chunk_size):
+            pending.append((start, chunk, pool.submit(_transform_worker, chunk)))
+            start += len(chunk)
+            # Bound the number of chunks held in memory at once
+            if len(pending) >= workers * 2:
+                chunk_start, done, future = pending.pop(0)
+                chunk_report, changes = future.result()
+                report.merge(chunk_report)
+                yield chunk_start, done, changes
+        for chunk_start, done, future in pending:
+            chunk_report, changes = future.result()
+            report.merge(chunk_report)
+            yield chunk_start, done, changes
+
+
+def changed_cases(pipeline: Pipeline, cases: Iterable[Any], report: TransformReport,
+                  **options) -> Iterator[Tuple[int, Any]]:
+    """Yield (position, new case) for each case the pipeline changes, in suite order"""
+    for start, _, changes in transform_chunks(pipeline, cases, report, **options):
+        for offset, case in changes.items():
+            yield start + offset, case
+
+
+def transformed_cases(pipeline: Pipeline, cases: Iterable[Any], report: TransformReport,
+                      **options) -> Iterator[Any]:
+    """Yield every case of the suite, transformed, in order"""
+    for _, chunk, changes in transform_chunks(pipeline, cases, report, **options):
+        for offset, case in enumerate(chunk):
+            yield changes.get(offset, case)
+
+
+def preview(pipeline: Pipeline, cases: Iterable[Any], **options) -> Tuple[TransformReport, List[int]]:
+    """Dry run: the counts a transform would produce and the positions it would change"""
+    report = TransformReport(pipeline.steps)
+    positions = [position for position, _ in changed_cases(pipeline, cases, report, dry_run=True, **options)]
+    return report, positions
+
+
+def write_changes(cases: MutableSequence[Any], changes: Iterable[Tuple[int, Any]]) -> List[int]:
+    """Write changed cases back as they arrive and return their positions
+
+    Stores with update_many write in batched transactions. Changes to the
+    suite being read are safe, as they only touch positions already read.
+    """
+    positions: List[int] = []
+
+    def tracked() -> Iterator[Tuple[int, Any]]:
+        for position, case in changes:
+            positions.append(position)
+            yield position, case
+
+    update_many = getattr(cases, 'update_many', None)
+    if update_many:
+        update_many(tracked())
+    else:
+        for position, case in tracked():
+            cases[position] = case
+    return positions
@@ -1,9 +1,27 @@
 import streamlit as st
 import json
-import pandas as pd
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Sequence
 import io
-import base64
+import math
+import os
+import time
+from jsonviewer import codec
+from jsonviewer.cache import CaseCache, parse_json as validate_json
+from jsonviewer.compact import CompactSuite
+from jsonviewer.dedup import DEFAULT_MAX_FIELDS, exact_duplicates, near_duplicates, redundant_positions
+from jsonviewer.diff import ALIGN_HASH, ALIGN_POSITION, UNCHANGED, DiffSummary, diff_suites, field_changes
+from jsonviewer.export import (EXPORT_FORMATS, deferred_download, export_filename, export_mime, iter_encoded,
+                               write_encoded)
+from jsonviewer.flatten import MISSING, flatten_dict, unflatten_dict
+from jsonviewer.generator import clone_case, generate_copies, generate_grid, generate_random
+from jsonviewer.loader import DEFAULT_MEMORY_BUDGET_MB, SpilledCases, iter_cases, load_cases
+from jsonviewer.patch import EditHistory, apply_patch
+from jsonviewer.profiler import RerunProfiler, summary_rows, widgets_this_run
+from jsonviewer.query import SuiteIndex, delete_cases, parse_query
+from jsonviewer.schema import summarize_errors, validate_suite
+from jsonviewer.store import DEFAULT_DB_PATH, StoredSuite
+from jsonviewer.templates import DEFAULT_TEST_CASE, get_default_json_structure
+from jsonviewer.transform import STEP_KINDS, Pipeline, TransformReport, changed_cases, preview, write_changes
 
 # Page configuration
 st.set_page_config(
@@ -13,99 +31,175 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Default test case template
-DEFAULT_TEST_CASE = {
-    "mhm": {
-        "age": 25, "hgt": 185, "wgt": 77, "sex": 1, "dbp": 78, "map": 85, "sbp": 118,
-        "fat": 20, "ppr": 40, "rhr": 70, "rhr_day": [70], "spo2": 99, "vo2max": 59.5,
-        "whr": 0.8, "wst": 80, "alc": 80, "cst": 80, "exh": 80, "fCV": 80, "fDM": 80,
-        "fMI": 80, "pHT": 80, "a1c": 80, "acr": 80, "cre": 80, "crp": 80, "cys": 80,
-        "fbg": 80, "eag": 80, "gfr": 80, "hdl": 80, "ldl": 80, "tgl": 80, "tsc": 80,
-        "vdl": 80, "CAN": 0, "CHD": 0, "CHF": 0, "CKD": 0, "CVD": 0, "DM2": 1,
-        "HTN": 0, "LDS": 0, "LVH": 0, "PDM": 0, "PMI": 0, "STK": 0, "TDM": 0, "THT": 0
-    },
-    "smk": {"now": 0, "evr": 0, "yrs": 0, "num": 0, "qit": 0, "slt": 0},
-    "slp": {"bed": [8.5], "slp": [8.0], "awk": [1], "slp_avg": [8]},
-    "nut": {
-        "nqs01": 0.5, "nqs02": 0.5, "nqs03": 0.5, "nqs04": 0.5, "nqs05": 0.5,
-        "nqs06": 0.5, "nqs07": 0.5, "nqs08": 0.5, "nqs09": 0.5, "nqs10": 0.5,
-        "nqs11": 0.5, "nqs12": 0.5, "nqs13": 0.5, "nqs14": 0.5, "nqs15": 0.5,
-        "nqs16": 0.5, "nqs17": 0.5, "nqs18": 0.5, "nqs19": 0.5, "nqs20": 0.5,
-        "nqs21": 0.5, "nqs22": 0.5, "protein": 0.5, "sfat": 0.5, "sugar": 0.5,
-        "fiber": 0.5, "sodium": 0.5, "vitamin_c": 0.5, "iron": 0.5,
-        "percentage_drink": 0.5, "density_drink": 0.5
-    },
-    "qlm": {
-        "q01": 0.5, "q02": 0.5, "q03": 0.5, "q04": 0.5, "q05": 0.5, "q06": 0.5,
-        "q07": 0.5, "q08": 0.5, "q09": 0.5, "q10": 0.5, "q11": 0.5, "q12": 0.5,
-        "q13": 0.5, "q14": 0.5, "q15": 0.5, "q16": 0.5, "q17": 0.5, "q18": 0.5,
-        "q19": 0.5, "q20": 0.5, "q21": 0.5, "q22": 0.5, "q23": 0.5, "q24": 0.5,
-        "q25": 0.5, "q26": 0.5, "q27": 0.5, "gad01": 0.5, "gad02": 0.5, "gad03": 0.5,
-        "gad04": 0.5, "gad05": 0.5, "gad06": 0.5, "gad07": 0.5, "phq01": 0.5,
-        "phq02": 0.5, "phq03": 0.5, "phq04": 0.5, "phq05": 0.5, "phq06": 0.5,
-        "phq07": 0.5, "phq08": 0.5, "phq09": 0.5, "pss01": 0.5, "pss02": 0.5,
-        "pss03": 0.5, "pss04": 0.5, "pss05": 0.5, "pss06": 0.5, "pss07": 0.5,
-        "pss08": 0.5, "pss09": 0.5, "pss10": 0.5, "gsrh": 0.5, "maas01": 0.5,
-        "maas02": 0.5, "maas03": 0.5, "maas04": 0.5, "maas05": 0.5, "maas06": 0.5,
-        "maas07": 0.5, "maas08": 0.5, "maas09": 0.5, "maas10": 0.5, "maas11": 0.5,
-        "maas12": 0.5, "maas13": 0.5, "maas14": 0.5, "maas15": 0.5, "mfm": [0.5]
-    },
-    "clip": False
-}
-
 # Initialize session state
 if 'test_cases' not in st.session_state:
     st.session_state.test_cases = []
 if 'selected_row' not in st.session_state:
     st.session_state.selected_row = None
+if 'page' not in st.session_state:
+    st.session_state.page = 1
 
-def validate_json(json_string: str) -> tuple[bool, str, Any]:
-    """Validate JSON string and return validation result"""
-    try:
-        parsed = json.loads(json_string)
-        return True, "Valid JSON", parsed
-    except json.JSONDecodeError as e:
-        return False, f"Invalid JSON: {str(e)}", None
+# Pagination options for the test case list
+PAGE_SIZE_OPTIONS = [10, 25, 50, 100]
 
-def flatten_dict(d: Dict, parent_key: str = '', sep: str = '.') -> Dict:
-    """Flatten nested dictionary for display"""
-    items = []
-    for k, v in d.items():
-        new_key = f"{parent_key}{sep}{k}" if parent_key else k
-        if isinstance(v, dict):
-            items.extend(flatten_dict(v, new_key, sep=sep).items())
-        elif isinstance(v, list):
-            items.append((new_key, str(v)))
-        else:
-            items.append((new_key, v))
-    return dict(items)
+# Templates and modes for batch generation
+GENERATOR_TEMPLATES = {
+    "Default test case": lambda: DEFAULT_TEST_CASE,
+    "Null structure": get_default_json_structure,
+}
+GENERATOR_MODES = ["Random sample", "Parameter grid"]
+SAMPLED_SECTIONS = ["mhm", "nut", "qlm"]
 
-def unflatten_dict(flat_dict: Dict, sep: str = '.') -> Dict:
-    """Convert flattened dictionary back to nested structure"""
-    result = {}
-    for key, value in flat_dict.items():
-        parts = key.split(sep)
-        d = result
-        for part in parts[:-1]:
-            if part not in d:
-                d[part] = {}
-            d = d[part]
-        
-        # Handle list values
-        if isinstance(value, str) and value.startswith('[') and value.endswith(']'):
-            try:
-                d[parts[-1]] = json.loads(value)
-            except:
-                d[parts[-1]] = value
-        else:
-            d[parts[-1]] = value
-    return result
+# View modes for the main content area
+EDITOR_VIEW = "📝 Case Editor"
+GRID_VIEW = "📊 Grid"
+GRID_PREVIEW_ROWS = 500
+
+# How suite comparison pairs the cases of the two versions
+ALIGN_FIELD = "field"
+DIFF_ALIGNMENTS = {
+    ALIGN_POSITION: "Position",
+    ALIGN_HASH: "Content hash",
+    ALIGN_FIELD: "Id field",
+}
+
+def case_matches(test_case: Any, query: str) -> bool:
+    """Check if any key or value in a test case contains the search query"""
+    stack = [test_case]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            for k, v in node.items():
+                if query in str(k).lower():
+                    return True
+                stack.append(v)
+        elif isinstance(node, list):
+            stack.extend(node)
+        elif query in str(node).lower():
+            return True
+    return False
+
+def get_page_indices(indices: Sequence[int], page: int, page_size: int) -> Sequence[int]:
+    """Return the case indices shown on the given 1-based page"""
+    start = (page - 1) * page_size
+    return indices[start:start + page_size]
+
+def jump_to_case(matching: Sequence[int], page_size: int):
+    """Move to the page containing the case entered in the jump box"""
+    target = st.session_state.jump_to - 1
+    if target in matching:
+        st.session_state.page = matching.index(target) // page_size + 1
+    else:
+        # Case is hidden by the search or lookup filter, so clear them first
+        st.session_state.search_query = ""
+        st.session_state.index_matches = None
+        st.session_state.page = target // page_size + 1
+
+def get_suite_frame() -> 'pandas.DataFrame':
+    """Return the grid DataFrame, rebuilding it only when cases were replaced"""
+    from jsonviewer.grid import suite_to_frame
+    cases = st.session_state.test_cases
+    cached = st.session_state.get('grid_cache')
+    if cached is not None:
+        refs, frame = cached
+        if len(refs) == len(cases) and all(a is b for a, b in zip(refs, cases)):
+            return frame
+    frame = suite_to_frame(cases)
+    # Spilled suites return fresh objects on every access, so only cache in-memory lists
+    if isinstance(cases, list):
+        st.session_state.grid_cache = (list(cases), frame)
+    return frame
+
+# Per-session cache of pretty-printed text, validation and flattened fields
+if 'case_cache' not in st.session_state:
+    st.session_state.case_cache = CaseCache(validate=validate_json)
+case_cache = st.session_state.case_cache
+
+# Undo/redo history of per-case edits, stored as JSON patches
+if 'edit_history' not in st.session_state:
+    st.session_state.edit_history = EditHistory()
+edit_history = st.session_state.edit_history
+
+# Field Editor values changed but not yet applied, per case position and field
+if 'field_edits' not in st.session_state:
+    st.session_state.field_edits = {}
+
+# Per-field columns answering sidebar queries, updated as cases change
+if 'query_index' not in st.session_state:
+    st.session_state.query_index = SuiteIndex()
+query_index = st.session_state.query_index
 
-def create_download_link(data: List[Dict], filename: str) -> str:
-    """Create a download link for JSON data"""
-    json_str = json.dumps(data, indent=2)
-    b64 = base64.b64encode(json_str.encode()).decode()
-    return f'<a href="data:application/json;base64,{b64}" download="{filename}">Download {filename}</a>'
+def reset_case_widgets(i: int):
+    """Drop editor widget state for a case so it re-renders from the stored case"""
+    for key in [k for k in st.session_state if isinstance(k, str) and
+                (k == f"json_editor_{i}" or k.startswith(f"{i}_"))]:
+        del st.session_state[key]
+    st.session_state.field_edits.pop(i, None)
+
+def reset_widgets_for(positions: Sequence[int]):
+    """Drop editor widget state for many cases at once, e.g. after a bulk rewrite"""
+    positions = set(positions)
+    for key in [k for k in st.session_state if isinstance(k, str)]:
+        index = key[len("json_editor_"):] if key.startswith("json_editor_") else key.split('_', 1)[0]
+        if index.isdigit() and int(index) in positions:
+            del st.session_state[key]
+
+def clear_case_state():
+    """Forget per-position history, pending field edits, duplicate groups, diffs and previews once cases shift"""
+    edit_history.clear()
+    st.session_state.field_edits.clear()
+    st.session_state.pop('duplicate_groups', None)
+    st.session_state.pop('diff_report', None)
+    st.session_state.pop('transform_preview', None)
+
+def replace_suite(cases: Any):
+    """Swap in a new suite, closing the store connection it replaces"""
+    current = st.session_state.test_cases
+    if isinstance(current, StoredSuite) and current is not cases:
+        current.close()
+    st.session_state.test_cases = cases
+
+def open_case(i: int):
+    st.session_state.selected_row = i
+
+def commit_edit(i: int, edited_case: Any) -> bool:
+    """Apply an edit as a patch against the stored case; returns False if nothing changed"""
+    old_case = st.session_state.test_cases[i]
+    patch = edit_history.record(i, old_case, edited_case)
+    if not patch:
+        return False
+    new_case = apply_patch(old_case, patch)
+    st.session_state.test_cases[i] = new_case
+    query_index.set(i, new_case)
+    st.session_state.pop('duplicate_groups', None)
+    case_cache.derive(old_case, new_case, patch)
+    reset_case_widgets(i)
+    return True
+
+def undo_edit(i: int):
+    old_case = st.session_state.test_cases[i]
+    new_case, patch = edit_history.undo(i, old_case)
+    st.session_state.test_cases[i] = new_case
+    query_index.set(i, new_case)
+    st.session_state.pop('duplicate_groups', None)
+    case_cache.derive(old_case, new_case, patch)
+    reset_case_widgets(i)
+
+def redo_edit(i: int):
+    old_case = st.session_state.test_cases[i]
+    new_case, patch = edit_history.redo(i, old_case)
+    st.session_state.test_cases[i] = new_case
+    query_index.set(i, new_case)
+    st.session_state.pop('duplicate_groups', None)
+    case_cache.derive(old_case, new_case, patch)
+    reset_case_widgets(i)
+
+# Per-rerun phase timings, enabled from the sidebar profiler panel
+if 'profiler' not in st.session_state:
+    st.session_state.profiler = RerunProfiler()
+profiler = st.session_state.profiler
+profiler.enabled = st.session_state.get('profile_reruns', False)
+profiler.start_run()
 
 # Main UI
 st.title("🧪 JSON Test Case Editor Dashboard")
@@ -116,161 +210,762 @@ with st.sidebar:
     st.header("📁 Data Input")
     
     # File upload
-    uploaded_file = st.file_uploader("Upload JSON file", type=['json'])
+    uploaded_file = st.file_uploader("Upload JSON file", type=['json', 'jsonl', 'ndjson'])
     
     # Text input
     st.subheader("Or paste JSON:")
     json_input = st.text_area("JSON Text", height=150, placeholder="Paste your JSON array here...")
     
+    # Streaming ingest for large suites and JSON Lines input
+    streaming_mode = st.checkbox("Streaming load (large files / NDJSON)", value=True)
+    memory_budget_mb = st.number_input(
+        "Memory budget (MB)", min_value=1, value=DEFAULT_MEMORY_BUDGET_MB,
+        disabled=not streaming_mode,
+        help="Estimated in-memory size of the parsed cases; beyond it cases are kept compressed on disk"
+    )
+    compact_storage = st.checkbox(
+        "Compact typed storage", value=False,
+        help="Keep cases as typed columns with null flags, about 10x smaller in memory"
+    )
+    
     if st.button("Load JSON", type="primary"):
         json_data = None
         
-        if uploaded_file:
+        if uploaded_file and streaming_mode:
+            total_bytes = uploaded_file.size or 1
+            progress = st.progress(0.0, text="Loading test cases...")
+            
+            def report(n_bytes: int, n_cases: int):
+                progress.progress(min(n_bytes / total_bytes, 1.0), text=f"Loaded {n_cases} test cases...")
+            
+            try:
+                with profiler.phase("load"):
+                    # Compact storage encodes cases as they stream in, so the dicts never pile up
+                    if compact_storage:
+                        json_data = CompactSuite(iter_cases(uploaded_file, on_progress=report))
+                    else:
+                        json_data = load_cases(uploaded_file, memory_budget_mb=memory_budget_mb,
+                                               on_progress=report)
+                profiler.count("json_bytes", uploaded_file.size or 0)
+                progress.empty()
+                st.success(f"✅ Streamed {len(json_data)} test case(s) from file!")
+            except Exception as e:
+                progress.empty()
+                st.error(f"❌ Error reading file: {e}")
+        
+        elif uploaded_file:
             try:
-                json_data = json.load(uploaded_file)
+                with profiler.phase("load"):
+                    json_data = codec.loads(uploaded_file.read())
+                profiler.count("json_bytes", uploaded_file.size or 0)
                 st.success("✅ File uploaded successfully!")
             except Exception as e:
                 st.error(f"❌ Error reading file: {e}")
         
+        elif json_input.strip() and streaming_mode:
+            try:
+                with profiler.phase("load"):
+                    json_data = load_cases(io.BytesIO(json_input.strip().encode('utf-8')),
+                                           memory_budget_mb=memory_budget_mb)
+                profiler.count("json_bytes", len(json_input))
+                st.success("✅ JSON loaded successfully!")
+            except json.JSONDecodeError as e:
+                st.error(f"❌ Invalid JSON: {str(e)}")
+        
         elif json_input.strip():
-            is_valid, message, json_data = validate_json(json_input.strip())
+            with profiler.phase("load"):
+                is_valid, message, json_data = validate_json(json_input.strip())
+            profiler.count("json_bytes", len(json_input))
             if is_valid:
                 st.success("✅ JSON loaded successfully!")
             else:
                 st.error(f"❌ {message}")
         
         if json_data:
-            if isinstance(json_data, list):
-                st.session_state.test_cases = json_data
-            else:
-                st.session_state.test_cases = [json_data]
+            if not isinstance(json_data, (list, SpilledCases, CompactSuite)):
+                json_data = [json_data]
+            if compact_storage and not isinstance(json_data, CompactSuite):
+                with profiler.phase("compact"):
+                    json_data = CompactSuite(json_data)
+            replace_suite(json_data)
+            st.session_state.index_matches = None
+            clear_case_state()
+    
+    if isinstance(st.session_state.test_cases, CompactSuite):
+        st.caption(f"🗜️ Compact storage: {st.session_state.test_cases.nbytes() / 1024 / 1024:.1f} MB "
+                   f"for {len(st.session_state.test_cases)} case(s)")
     
     st.markdown("---")
     
     # Add new test cases
     st.header("➕ Add Test Cases")
-    num_cases = st.number_input("Number of cases to add", min_value=1, max_value=10, value=1)
+    num_cases = st.number_input("Number of cases to add", min_value=1, max_value=10000, value=1)
     
     if st.button("Add Default Cases"):
-        for _ in range(num_cases):
-            st.session_state.test_cases.append(DEFAULT_TEST_CASE.copy())
+        st.session_state.test_cases.extend(generate_copies(DEFAULT_TEST_CASE, num_cases))
         st.success(f"✅ Added {num_cases} default test case(s)")
     
     if st.button("Add Empty Cases"):
         for _ in range(num_cases):
             st.session_state.test_cases.append({})
         st.success(f"✅ Added {num_cases} empty test case(s)")
+    
+    st.markdown("---")
+    
+    # Batch generation from the templates
+    st.header("🧬 Generate Suite")
+    gen_template = st.selectbox("Template", list(GENERATOR_TEMPLATES))
+    gen_mode = st.selectbox("Mode", GENERATOR_MODES)
+    
+    if gen_mode == "Random sample":
+        gen_count = st.number_input("Cases to generate", min_value=1, max_value=1000000, value=1000)
+        gen_seed = st.number_input("Seed", min_value=0, value=42)
+        gen_sections = st.multiselect("Sampled sections", SAMPLED_SECTIONS, default=SAMPLED_SECTIONS)
+    else:
+        gen_params = st.text_area(
+            "Parameters (JSON)",
+            value='{"mhm.age": {"start": 20, "stop": 80, "step": 10}, "smk.now": [0, 1]}',
+            help="Field path to a list of values or a {start, stop, step} range; "
+                 "all combinations are generated"
+        )
+    gen_format = st.selectbox("Download format", list(EXPORT_FORMATS), format_func=EXPORT_FORMATS.get)
+    
+    gcol1, gcol2 = st.columns(2)
+    with gcol1:
+        add_generated = st.button("➕ Add to Suite")
+    with gcol2:
+        prepare_generated = st.button("📦 Build File")
+    
+    if add_generated or prepare_generated:
+        template = GENERATOR_TEMPLATES[gen_template]()
+        generated = None
+        
+        if gen_mode == "Random sample":
+            generated = generate_random(template, gen_count, seed=gen_seed, sections=gen_sections)
+        else:
+            is_valid, message, parameters = validate_json(gen_params)
+            if not is_valid:
+                st.error(f"❌ {message}")
+            elif not isinstance(parameters, dict) or not parameters:
+                st.error("❌ Parameters must be a non-empty JSON object")
+            else:
+                generated = generate_grid(template, parameters)
+        
+        if generated is not None:
+            try:
+                if add_generated:
+                    before = len(st.session_state.test_cases)
+                    st.session_state.test_cases.extend(generated)
+                    st.success(f"✅ Generated {len(st.session_state.test_cases) - before} test case(s)")
+                else:
+                    # Only the recipe is kept: generation is deterministic, so the
+                    # cases are generated again, one at a time, when downloaded
+                    if gen_mode == "Random sample":
+                        sections = list(gen_sections)
+                        recipe = lambda: generate_random(template, gen_count, seed=gen_seed, sections=sections)
+                    else:
+                        recipe = lambda: generate_grid(template, parameters)
+                    # Generating the first case now reports invalid parameters here
+                    next(iter(generated), None)
+                    st.session_state.generated_file = (recipe, gen_format)
+            except (ValueError, TypeError) as e:
+                st.error(f"❌ {e}")
+    
+    if st.session_state.get('generated_file'):
+        recipe, file_format = st.session_state.generated_file
+        file_name = export_filename("generated_cases", file_format)
+        st.download_button(
+            label=f"💾 Download {file_name}",
+            data=deferred_download(recipe, file_format),
+            file_name=file_name,
+            mime=export_mime(file_format)
+        )
+    
+    st.markdown("---")
+    
+    # Persistent SQLite store
+    st.header("💾 Persistent Store")
+    db_path = st.text_input("Database file", value=DEFAULT_DB_PATH)
+    scol1, scol2 = st.columns(2)
+    with scol1:
+        if st.button("📂 Open Store"):
+            try:
+                replace_suite(StoredSuite(db_path))
+                st.session_state.index_matches = None
+                clear_case_state()
+                st.success(f"✅ Opened {len(st.session_state.test_cases)} test case(s)")
+            except Exception as e:
+                st.error(f"❌ Error opening store: {e}")
+    with scol2:
+        if st.button("💾 Save to Store", help="Replace the store's contents with the current suite"):
+            try:
+                current = st.session_state.test_cases
+                if isinstance(current, StoredSuite) and os.path.abspath(current.path) == os.path.abspath(db_path):
+                    store = current
+                else:
+                    store = StoredSuite(db_path)
+                    store.clear()
+                    store.extend(current)
+                replace_suite(store)
+                st.session_state.index_matches = None
+                st.success(f"✅ Saved {len(store)} test case(s) to {db_path}")
+            except Exception as e:
+                st.error(f"❌ Error saving store: {e}")
+    
+    if isinstance(st.session_state.test_cases, StoredSuite):
+        store = st.session_state.test_cases
+        st.caption(f"Editing {store.path} directly; changes are saved as you make them")
+        
+        index_path = st.text_input("Field to index", placeholder="mhm.DM2")
+        if st.button("⚡ Create Index") and index_path.strip():
+            try:
+                store.create_index(index_path.strip())
+                st.success(f"✅ Indexed {index_path.strip()}")
+            except Exception as e:
+                st.error(f"❌ {e}")
+        
+        indexed = store.indexed_fields()
+        if indexed:
+            st.caption("Indexed fields: " + ", ".join(indexed))
+        lcol1, lcol2, lcol3 = st.columns([2, 1, 2])
+        with lcol1:
+            lookup_path = st.text_input("Lookup field", value=indexed[0] if indexed else "")
+        with lcol2:
+            lookup_op = st.selectbox("Op", ["=", "!=", "<", "<=", ">", ">="])
+        with lcol3:
+            lookup_value = st.text_input("Value (JSON)", value="1")
+        
+        if st.button("🔎 Find Cases"):
+            is_valid, message, parsed_value = validate_json(lookup_value)
+            if not is_valid:
+                st.error(f"❌ {message}")
+            else:
+                try:
+                    st.session_state.index_matches = store.find(lookup_path.strip(), parsed_value, lookup_op)
+                    st.session_state.query_ms = None
+                    st.session_state.page = 1
+                except Exception as e:
+                    st.error(f"❌ {e}")
+    
+    st.markdown("---")
+    
+    # Field queries over the whole suite, answered from the per-field index
+    st.header("🔎 Query Cases")
+    query_text = st.text_input(
+        "Query", key="suite_query", placeholder="mhm.sbp > 140 and smk.now = 1",
+        help="Clauses joined by 'and': a field path, an operator (= != < <= > >=) and a JSON value, "
+             "or 'path exists' / 'path missing'"
+    )
+    if st.button("🔎 Run Query") and query_text.strip():
+        try:
+            predicates = parse_query(query_text)
+            started = time.perf_counter()
+            with profiler.phase("query"):
+                st.session_state.index_matches = query_index.query(st.session_state.test_cases, predicates)
+            st.session_state.query_ms = (time.perf_counter() - started) * 1000
+            st.session_state.page = 1
+        except ValueError as e:
+            st.error(f"❌ {e}")
+    
+    # Query and store lookup results filter the case list and can be exported or deleted
+    if st.session_state.get('index_matches') is not None:
+        matches = st.session_state.index_matches
+        st.info(f"🔎 {len(matches)} matching test case(s)"
+                + (f" in {st.session_state.query_ms:.1f} ms" if st.session_state.get('query_ms') else ""))
+        mcol1, mcol2 = st.columns(2)
+        with mcol1:
+            if st.button("✖️ Clear Matches"):
+                st.session_state.index_matches = None
+                st.session_state.query_ms = None
+                st.rerun()
+        with mcol2:
+            if st.button("🗑️ Delete Matches", disabled=not matches):
+                with profiler.phase("delete_matches"):
+                    deleted = delete_cases(st.session_state.test_cases, matches)
+                    query_index.delete(matches)
+                st.session_state.index_matches = None
+                st.session_state.query_ms = None
+                clear_case_state()
+                st.success(f"✅ Deleted {deleted} test case(s)")
+                st.rerun()
+    
+    st.markdown("---")
+    
+    # Exact duplicates compare cleaned cases; near-duplicates differ in a few fields
+    st.header("🧹 Deduplicate")
+    near_mode = st.checkbox("Include near-duplicates", help="Cluster cases that differ in only a few fields")
+    max_fields = st.number_input("Max differing fields", min_value=1, max_value=20, value=DEFAULT_MAX_FIELDS,
+                                 disabled=not near_mode)
+    if st.button("🔍 Find Duplicates"):
+        with st.spinner("Hashing test cases..."), profiler.phase("find_duplicates"):
+            if near_mode:
+                st.session_state.duplicate_groups = near_duplicates(st.session_state.test_cases, max_fields)
+            else:
+                st.session_state.duplicate_groups = exact_duplicates(st.session_state.test_cases)
+    
+    duplicate_groups = st.session_state.get('duplicate_groups')
+    if duplicate_groups is not None:
+        redundant = redundant_positions(duplicate_groups)
+        st.info(f"🧹 {len(duplicate_groups)} group(s) with {len(redundant)} redundant test case(s)")
+        dcol1, dcol2 = st.columns(2)
+        with dcol1:
+            if st.button("👁️ Show Groups", disabled=not duplicate_groups):
+                st.session_state.index_matches = sorted(position for group in duplicate_groups
+                                                        for position in group)
+                st.session_state.query_ms = None
+                st.session_state.page = 1
+                st.rerun()
+        with dcol2:
+            if st.button("🗑️ Keep One Each", disabled=not redundant,
+                         help="Delete all but the first case of every group"):
+                with profiler.phase("delete_duplicates"):
+                    deleted = delete_cases(st.session_state.test_cases, redundant)
+                    query_index.delete(redundant)
+                st.session_state.index_matches = None
+                st.session_state.query_ms = None
+                clear_case_state()
+                st.success(f"✅ Deleted {deleted} duplicate test case(s)")
+                st.rerun()
+    
+    st.markdown("---")
+    
+    # Field-level diff of the loaded suite against another version, e.g. the last release
+    st.header("🔀 Compare Suites")
+    previous_file = st.file_uploader("Previous suite", type=['json', 'ndjson'], key="diff_file")
+    diff_align = st.selectbox("Align cases by", list(DIFF_ALIGNMENTS), format_func=DIFF_ALIGNMENTS.get)
+    diff_field = st.text_input("Id field", placeholder="meta.id", disabled=diff_align != ALIGN_FIELD)
+    if st.button("🔀 Compare", disabled=previous_file is None):
+        align = diff_field.strip() if diff_align == ALIGN_FIELD else diff_align
+        if not align:
+            st.error("❌ Enter the id field to align cases by")
+        else:
+            summary = DiffSummary()
+            changed_positions = []
+            
+            def report_records():
+                for case_diff in summary.track(diff_suites(iter_cases(previous_file),
+                                                           st.session_state.test_cases, align)):
+                    if case_diff.status == UNCHANGED:
+                        continue
+                    if case_diff.new_index is not None:
+                        changed_positions.append(case_diff.new_index)
+                    yield case_diff.to_json()
+            
+            try:
+                # The report is encoded record by record as the suites are compared
+                with st.spinner("Comparing suites..."), profiler.phase("diff_suites"), \
+                        write_encoded(report_records(), 'ndjson') as report_file:
+                    st.session_state.diff_report = (summary, sorted(changed_positions), report_file.read())
+            except Exception as e:
+                st.error(f"❌ Error comparing suites: {e}")
+    
+    if st.session_state.get('diff_report'):
+        summary, changed_positions, report_data = st.session_state.diff_report
+        statuses = summary.statuses
+        st.info(f"🔀 {statuses['changed']} changed, {statuses['added']} added, "
+                f"{statuses['removed']} removed, {statuses['unchanged']} unchanged")
+        if summary.fields:
+            st.dataframe([{"Field": path, "Cases": count} for path, count in summary.top_fields(20)])
+        st.download_button("💾 Download Report", data=report_data, file_name="suite_diff.ndjson",
+                           mime=export_mime('ndjson'))
+        if st.button("👁️ Show Changed", disabled=not changed_positions,
+                     help="List the changed and added cases"):
+            st.session_state.index_matches = changed_positions
+            st.session_state.query_ms = None
+            st.session_state.page = 1
+            st.rerun()
+    
+    st.markdown("---")
+    
+    # Declarative bulk rewrites, previewed as a dry run before they touch the suite
+    st.header("🔧 Transform")
+    transform_text = st.text_area(
+        "Steps, one per line", height=120, key="transform_steps",
+        placeholder="rename nut.sfat -> nut.saturated_fat\ncompute slp.bed = slp.bed * 60\n"
+                    "fill qlm.mfm = [0.5]\nset smk.now = 0 where smk.evr = 0",
+        help="; ".join(STEP_KINDS.values()) + ". Any step can end in 'where' and a field query."
+    )
+    tcol1, tcol2 = st.columns(2)
+    with tcol1:
+        preview_clicked = st.button("👁️ Preview", disabled=not transform_text.strip())
+    with tcol2:
+        apply_clicked = st.button("⚡ Apply", disabled=not transform_text.strip())
+    if preview_clicked or apply_clicked:
+        try:
+            pipeline = Pipeline(transform_text)
+        except ValueError as e:
+            pipeline = None
+            st.error(f"❌ {e}")
+        if pipeline and preview_clicked:
+            with st.spinner("Previewing transform..."), profiler.phase("transform_preview"):
+                report, affected = preview(pipeline, st.session_state.test_cases)
+            st.session_state.transform_preview = (transform_text, report, affected)
+        elif pipeline:
+            report = TransformReport(pipeline.steps)
+            with st.spinner("Transforming test cases..."), profiler.phase("transform"):
+                # Changed cases are written back chunk by chunk as the suite streams through
+                positions = write_changes(st.session_state.test_cases,
+                                          changed_cases(pipeline, st.session_state.test_cases, report))
+                query_index.refresh(st.session_state.test_cases, positions)
+            clear_case_state()
+            reset_widgets_for(positions)
+            st.success(f"✅ Changed {report.cases_changed} of {report.cases} test case(s)")
+            st.rerun()
+    
+    if st.session_state.get('transform_preview'):
+        previewed_text, report, affected = st.session_state.transform_preview
+        if previewed_text != transform_text:
+            st.caption("Steps changed since this preview")
+        st.info(f"🔧 Would change {report.cases_changed} of {report.cases} test case(s)")
+        st.dataframe([{"Step": row['step'], "Changed": row['changed'], "Skipped": row['skipped']}
+                      for row in report.rows()])
+        # Before and after of the first few affected cases
+        sample_rows = []
+        sample_pipeline = Pipeline(previewed_text)
+        for i in affected[:3]:
+            before = st.session_state.test_cases[i]
+            for change in field_changes(before, sample_pipeline.apply(before)):
+                sample_rows.append({"Case": i + 1, "Field": change.path,
+                                    "Before": codec.dumps(change.old) if change.old is not MISSING else "",
+                                    "After": codec.dumps(change.new) if change.new is not MISSING else ""})
+        if sample_rows:
+            st.dataframe(sample_rows[:100])
+        if st.button("👁️ Show Affected", disabled=not affected, help="List the cases the transform would change"):
+            st.session_state.index_matches = affected
+            st.session_state.query_ms = None
+            st.session_state.page = 1
+            st.rerun()
+    
+    st.markdown("---")
+    cache_stats = case_cache.stats()
+    st.caption(f"⚡ Cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses, "
+               f"{cache_stats['entries']} entries")
 
 # Main content area
 if st.session_state.test_cases:
     st.header(f"📊 Test Cases ({len(st.session_state.test_cases)} total)")
     
+    # Exports cover the whole suite, or only the query matches when asked to
+    suite = st.session_state.test_cases
+    export_source = lambda: suite
+    export_matches = st.session_state.get('index_matches')
+    if export_matches is not None and st.checkbox(f"Export only the {len(export_matches)} matching case(s)"):
+        export_source = lambda: (suite[i] for i in export_matches)
+    
     # Export buttons
     col1, col2, col3 = st.columns([1, 1, 2])
     
     with col1:
         if st.button("📋 Copy to Clipboard", help="Copy JSON to clipboard"):
-            json_str = json.dumps(st.session_state.test_cases, indent=2)
+            with profiler.phase("export"):
+                json_str = "".join(iter_encoded(export_source()))
+            profiler.count("json_bytes", len(json_str))
             st.code(json_str, language='json')
             st.info("💡 Select and copy the JSON above")
     
     with col2:
-        json_str = json.dumps(st.session_state.test_cases, indent=2)
+        # The export is encoded one case at a time when Download is clicked,
+        # from the suite as it is then; no encoded copy stays in session state
+        export_format = st.selectbox("Export format", list(EXPORT_FORMATS), format_func=EXPORT_FORMATS.get)
+        export_gzip = st.checkbox("Gzip compress")
+        export_name = export_filename("test_cases", export_format, export_gzip)
         st.download_button(
-            label="💾 Download JSON",
-            data=json_str,
-            file_name="test_cases.json",
-            mime="application/json"
+            label=f"💾 Download {export_name}",
+            data=deferred_download(export_source, export_format, export_gzip),
+            file_name=export_name,
+            mime=export_mime(export_format, export_gzip)
         )
     
+    with col3:
+        allow_missing = st.checkbox("Allow missing fields", help="Accept cases with null fields removed")
+        if st.button("🩺 Validate Schema", help="Check every case against the health-score template"):
+            with st.spinner("Validating suite..."), profiler.phase("validate_schema"):
+                errors = validate_suite(st.session_state.test_cases, allow_missing=allow_missing)
+            st.session_state.schema_report = (len(st.session_state.test_cases), errors)
+    
+    # Schema report for the last suite-wide validation
+    if st.session_state.get('schema_report'):
+        checked_count, errors = st.session_state.schema_report
+        with st.expander("🩺 Schema Report", expanded=True):
+            if not errors:
+                st.success(f"✅ All {checked_count} test case(s) match the schema")
+            else:
+                failing_cases = len({case_index for case_index, _, _ in errors})
+                st.error(f"❌ {len(errors)} error(s) in {failing_cases} of {checked_count} test case(s)")
+                st.markdown("**Errors by field:**")
+                st.dataframe([{"Field": path, "Errors": count}
+                              for path, count in list(summarize_errors(errors).items())[:50]])
+                st.dataframe([{"Test Case": case_index + 1, "Field": path, "Error": message}
+                              for case_index, path, message in errors[:1000]])
+            if st.button("Dismiss report"):
+                del st.session_state.schema_report
+                st.rerun()
+    
     st.markdown("---")
     
-    # Display and edit test cases
-    for i, test_case in enumerate(st.session_state.test_cases):
-        with st.expander(f"🧪 Test Case {i+1}", expanded=(i == 0)):
-            col1, col2, col3 = st.columns([3, 1, 1])
+    view_mode = st.radio("View", [EDITOR_VIEW, GRID_VIEW], horizontal=True, key="view_mode")
+    
+    if view_mode == GRID_VIEW:
+        # Columnar view of the whole suite with vectorized bulk edits; pandas
+        # comes in with the grid module, so sessions that never open it skip it
+        from jsonviewer.grid import BULK_OPERATIONS, bulk_update, display_frame, select_rows, write_back
+        with profiler.phase("grid_frame"):
+            frame = get_suite_frame()
+        row_filter = st.text_input(
+            "Row filter", key="grid_filter",
+            placeholder="`mhm.age` > 40 and `smk.now` == 1",
+            help="pandas expression; wrap field paths in backticks"
+        )
+        
+        try:
+            mask = select_rows(frame, row_filter)
+        except Exception as e:
+            mask = None
+            st.error(f"❌ Invalid row filter: {e}")
+        
+        if mask is not None:
+            selected_count = int(mask.sum())
+            st.caption(f"{selected_count} of {len(frame)} cases selected "
+                       f"(showing up to {GRID_PREVIEW_ROWS})")
+            st.dataframe(display_frame(frame[mask].head(GRID_PREVIEW_ROWS)))
+            
+            with st.form("bulk_edit"):
+                gcol1, gcol2, gcol3 = st.columns(3)
+                with gcol1:
+                    bulk_column = st.selectbox("Field", list(frame.columns))
+                with gcol2:
+                    bulk_operation = st.selectbox("Operation", list(BULK_OPERATIONS),
+                                                  format_func=BULK_OPERATIONS.get)
+                with gcol3:
+                    bulk_value = st.text_input("Value (JSON)", value="0")
+                bulk_submitted = st.form_submit_button("⚡ Apply to selected cases", type="primary")
+            
+            if bulk_submitted:
+                is_valid, message, parsed_value = validate_json(bulk_value)
+                if not is_valid:
+                    st.error(f"❌ {message}")
+                else:
+                    try:
+                        changes = bulk_update(frame, bulk_column, bulk_operation, parsed_value, mask)
+                        updated_count = write_back(st.session_state.test_cases, bulk_column, changes)
+                        query_index.refresh(st.session_state.test_cases, changes.index)
+                        # Edited cases no longer match their undo history or editor widgets
+                        clear_case_state()
+                        reset_widgets_for(list(changes.index))
+                        if isinstance(st.session_state.test_cases, list):
+                            st.session_state.grid_cache = (list(st.session_state.test_cases), frame)
+                        st.success(f"✅ Updated {bulk_column} in {updated_count} case(s)")
+                        st.rerun()
+                    except (ValueError, TypeError) as e:
+                        st.error(f"❌ {e}")
+    
+    else:
+        # Pagination and search controls
+        total_cases = len(st.session_state.test_cases)
+        nav1, nav2, nav3, nav4 = st.columns([2, 1, 1, 1])
+    
+        with nav1:
+            search_query = st.text_input("🔍 Search cases", key="search_query",
+                                         placeholder="Match any field name or value...")
+    
+        with nav2:
+            page_size = st.selectbox("Cases per page", PAGE_SIZE_OPTIONS, key="page_size")
+    
+        # Indexed store lookups narrow the list without loading any cases
+        base_indices = st.session_state.get('index_matches')
+        if base_indices is None:
+            base_indices = range(total_cases)
+        
+        # Only scan the suite when a search is active
+        query = search_query.strip().lower()
+        if query:
+            matching = [idx for idx in base_indices if case_matches(st.session_state.test_cases[idx], query)]
+        else:
+            matching = base_indices
+    
+        num_pages = max(1, math.ceil(len(matching) / page_size))
+        if st.session_state.page > num_pages:
+            st.session_state.page = num_pages
+        if st.session_state.get('jump_to', 1) > total_cases:
+            st.session_state.jump_to = total_cases
+    
+        with nav3:
+            st.number_input("Jump to case #", min_value=1, max_value=total_cases, key="jump_to")
+            st.button("↪️ Go", key="jump_go", on_click=jump_to_case, args=(matching, page_size))
+    
+        with nav4:
+            st.number_input(f"Page (of {num_pages})", min_value=1, max_value=num_pages, key="page")
+    
+        page_indices = get_page_indices(matching, st.session_state.page, page_size)
+        if isinstance(st.session_state.test_cases, StoredSuite):
+            st.session_state.test_cases.prefetch(page_indices)
+    
+        if query:
+            st.caption(f"{len(matching)} of {total_cases} cases match \"{search_query.strip()}\"")
+        if page_indices:
+            st.caption(f"Showing cases {page_indices[0] + 1}–{page_indices[-1] + 1}")
+        else:
+            st.warning("No test cases match your search.")
+    
+        # Only the open case builds editor widgets; the rest of the page is one line each
+        open_index = st.session_state.selected_row
+        if open_index not in page_indices:
+            open_index = page_indices[0] if page_indices else None
+        
+        for i in page_indices:
+            test_case = st.session_state.test_cases[i]
+            if i != open_index:
+                scol1, scol2 = st.columns([5, 1])
+                with scol1:
+                    sections = ", ".join(map(str, test_case)) if isinstance(test_case, dict) else type(test_case).__name__
+                    st.markdown(f"🧪 **Test Case {i+1}** · {sections or 'empty'}")
+                with scol2:
+                    st.button("✏️ Open", key=f"open_{i}", on_click=open_case, args=(i,))
+                continue
             
-            with col2:
-                if st.button(f"📄 Duplicate", key=f"dup_{i}"):
-                    st.session_state.test_cases.insert(i+1, test_case.copy())
-                    st.rerun()
+            with st.expander(f"🧪 Test Case {i+1}", expanded=True), profiler.phase("render_case"):
+                col1, col2, col3 = st.columns([3, 1, 1])
             
-            with col3:
-                if st.button(f"🗑️ Delete", key=f"del_{i}", type="secondary"):
-                    st.session_state.test_cases.pop(i)
-                    st.rerun()
+                with col1:
+                    ucol, rcol = st.columns(2)
+                    with ucol:
+                        st.button("↩️ Undo", key=f"undo_{i}", on_click=undo_edit, args=(i,),
+                                  disabled=not edit_history.can_undo(i))
+                    with rcol:
+                        st.button("↪️ Redo", key=f"redo_{i}", on_click=redo_edit, args=(i,),
+                                  disabled=not edit_history.can_redo(i))
             
-            # JSON Editor
-            st.subheader("JSON Editor")
-            json_str = json.dumps(test_case, indent=2)
-            edited_json = st.text_area(
-                "Edit JSON",
-                value=json_str,
-                height=200,
-                key=f"json_editor_{i}"
-            )
+                with col2:
+                    if st.button(f"📄 Duplicate", key=f"dup_{i}"):
+                        duplicate = clone_case(test_case)
+                        st.session_state.test_cases.insert(i+1, duplicate)
+                        query_index.insert(i+1, duplicate)
+                        st.session_state.index_matches = None
+                        # Positions shift, so per-case history no longer lines up
+                        clear_case_state()
+                        st.rerun()
             
-            # Validate and update
-            is_valid, message, parsed_json = validate_json(edited_json)
+                with col3:
+                    if st.button(f"🗑️ Delete", key=f"del_{i}", type="secondary"):
+                        st.session_state.test_cases.pop(i)
+                        query_index.delete([i])
+                        st.session_state.index_matches = None
+                        clear_case_state()
+                        st.rerun()
             
-            if is_valid:
-                st.success("✅ Valid JSON")
-                if st.button(f"💾 Save Changes", key=f"save_{i}"):
-                    st.session_state.test_cases[i] = parsed_json
-                    st.success("✅ Changes saved!")
-                    st.rerun()
-            else:
-                st.error(f"❌ {message}")
+                # JSON Editor
+                st.subheader("JSON Editor")
+                with profiler.phase("dump_json"):
+                    json_str = case_cache.pretty(test_case)
+                edited_json = st.text_area(
+                    "Edit JSON",
+                    value=json_str,
+                    height=200,
+                    key=f"json_editor_{i}"
+                )
+            
+                # Validate and update
+                with profiler.phase("validate_json"):
+                    is_valid, message, parsed_json = case_cache.validate(test_case, edited_json)
+                profiler.count("json_bytes", len(edited_json))
+            
+                if is_valid:
+                    st.success("✅ Valid JSON")
+                    if st.button(f"💾 Save Changes", key=f"save_{i}"):
+                        if commit_edit(i, parsed_json):
+                            st.success("✅ Changes saved!")
+                            st.rerun()
+                        else:
+                            st.info("No changes to save")
+                else:
+                    st.error(f"❌ {message}")
             
-            # Tabular view for easier editing
-            st.subheader("Field Editor")
+                # Tabular view for easier editing
+                st.subheader("Field Editor")
             
-            if test_case:
-                # Flatten the JSON for easier editing
-                flat_data = flatten_dict(test_case)
+                if test_case:
+                    # Flatten the JSON for easier editing
+                    with profiler.phase("flatten_dict"):
+                        flat_data = case_cache.flatten(test_case)
                 
-                # Group by main categories
-                categories = {}
-                for key, value in flat_data.items():
-                    category = key.split('.')[0] if '.' in key else 'root'
-                    if category not in categories:
-                        categories[category] = {}
-                    categories[category][key] = value
+                    # Group by main categories
+                    categories = {}
+                    for key, value in flat_data.items():
+                        category = key.split('.')[0] if '.' in key else 'root'
+                        if category not in categories:
+                            categories[category] = {}
+                        categories[category][key] = value
                 
-                # Create tabs for each category
-                if categories:
-                    tabs = st.tabs(list(categories.keys()))
-                    updated_data = {}
-                    
-                    for tab, (cat_name, cat_data) in zip(tabs, categories.items()):
-                        with tab:
-                            cols = st.columns(2)
-                            for idx, (field_key, field_value) in enumerate(cat_data.items()):
-                                col = cols[idx % 2]
-                                with col:
-                                    # Determine input type based on value
-                                    if isinstance(field_value, bool):
-                                        updated_data[field_key] = st.checkbox(
-                                            field_key, value=field_value, key=f"{i}_{field_key}"
-                                        )
-                                    elif isinstance(field_value, (int, float)):
-                                        updated_data[field_key] = st.number_input(
-                                            field_key, value=field_value, key=f"{i}_{field_key}"
-                                        )
+                    if categories:
+                        # Only the selected category builds its inputs; values changed in
+                        # other categories wait in field_edits until they are applied
+                        selected_category = st.radio("Category", list(categories), horizontal=True,
+                                                     key=f"field_category_{i}")
+                        pending = st.session_state.field_edits.setdefault(i, {})
+                        cols = st.columns(2)
+                        for idx, (field_key, field_value) in enumerate(categories[selected_category].items()):
+                            col = cols[idx % 2]
+                            with col:
+                                # Determine input type based on value
+                                if isinstance(field_value, bool):
+                                    shown = field_value
+                                    value = st.checkbox(
+                                        field_key, value=pending.get(field_key, shown), key=f"{i}_{field_key}"
+                                    )
+                                elif isinstance(field_value, (int, float)):
+                                    shown = field_value
+                                    value = st.number_input(
+                                        field_key, value=pending.get(field_key, shown), key=f"{i}_{field_key}"
+                                    )
+                                elif isinstance(field_value, (list, dict)) or field_value is None:
+                                    # Edited as JSON text and parsed back on update
+                                    shown = json.dumps(field_value)
+                                    value = st.text_input(
+                                        field_key, value=pending.get(field_key, shown), key=f"{i}_{field_key}"
+                                    )
+                                else:
+                                    shown = str(field_value)
+                                    value = st.text_input(
+                                        field_key, value=pending.get(field_key, shown), key=f"{i}_{field_key}"
+                                    )
+                                if value == shown:
+                                    pending.pop(field_key, None)
+                                else:
+                                    pending[field_key] = value
+                        
+                        if pending:
+                            st.caption(f"✏️ {len(pending)} field change(s) not yet applied")
+                        
+                        # Update button for field editor
+                        if st.button(f"🔄 Update from Fields", key=f"update_fields_{i}"):
+                            updated_data = dict(flat_data)
+                            field_errors = []
+                            for field_key, value in pending.items():
+                                if field_key not in flat_data:
+                                    continue
+                                original = flat_data[field_key]
+                                if isinstance(original, (list, dict)) or original is None:
+                                    is_valid, message, parsed_value = validate_json(value)
+                                    if is_valid:
+                                        updated_data[field_key] = parsed_value
                                     else:
-                                        updated_data[field_key] = st.text_input(
-                                            field_key, value=str(field_value), key=f"{i}_{field_key}"
-                                        )
-                    
-                    # Update button for field editor
-                    if st.button(f"🔄 Update from Fields", key=f"update_fields_{i}"):
-                        # Convert flattened data back to nested structure
-                        updated_case = unflatten_dict(updated_data)
-                        st.session_state.test_cases[i] = updated_case
-                        st.success("✅ Updated from field editor!")
-                        st.rerun()
-            
-            st.markdown("---")
+                                        field_errors.append(f"{field_key}: {message}")
+                                else:
+                                    updated_data[field_key] = value
+                            
+                            if field_errors:
+                                st.error("❌ " + "; ".join(field_errors))
+                            else:
+                                # Convert flattened data back to nested structure
+                                with profiler.phase("unflatten_dict"):
+                                    updated_case = unflatten_dict(updated_data)
+                                if commit_edit(i, updated_case):
+                                    st.success("✅ Updated from field editor!")
+                                    st.rerun()
+                                else:
+                                    st.info("No fields changed")
+                
+                st.markdown("---")
 
 else:
     # Welcome screen
@@ -279,12 +974,26 @@ else:
     st.subheader("📋 Features:")
     st.markdown("""
     - **Upload JSON files** or **paste JSON text**
+    - **Streaming load** of large JSON arrays and NDJSON with on-disk spill
+    - **Compact typed storage** of health-score suites as columns with null flags
     - **Edit test cases** with both JSON editor and field-by-field editor
+    - **Lazy rendering**: only the open case and its selected field category build widgets
     - **Duplicate and delete** test cases
+    - **Deduplication** of exact and near-duplicate cases without pairwise comparison
+    - **Suite comparison** with field-level diffs against a previous version
+    - **Bulk transforms** (rename, compute, fill, drop, conditional set) with a dry-run preview
+    - **Undo/redo** per test case, stored as compact JSON patches
     - **Add new test cases** (default template or empty)
-    - **Export functionality** (copy to clipboard or download)
+    - **Generate suites** by random sampling or parameter grids, with JSON/NDJSON download
+    - **Export functionality** (copy to clipboard or download as JSON, compact JSON or NDJSON, optionally gzipped)
     - **JSON validation** with error messages
-    - **Organized editing** with categorized tabs
+    - **Schema validation** of the whole suite against the health-score template
+    - **Persistent SQLite store** with lazy paging and indexed field lookups
+    - **Organized editing** with a category picker; field changes carry across categories until applied
+    - **Grid view** with bulk set/scale/fill across filtered cases
+    - **Paginated view** with search and jump-to-case for large suites
+    - **Field queries** (`mhm.sbp > 140 and smk.now = 1`) from an incremental index, driving the list, export and bulk delete
+    - **Rerun profiler** with per-phase timings and trace export in the sidebar
     """)
     
     st.subheader("🚀 Quick Start:")
@@ -299,3 +1008,25 @@ else:
 # Footer
 st.markdown("---")
 st.markdown("Built with ❤️ using Streamlit | Ready for GitHub deployment")
+
+# Rerun profiler panel, rendered last so the run covers the whole page
+widget_count = widgets_this_run()
+if widget_count is not None:
+    profiler.count("widgets", widget_count)
+last_run = profiler.end_run()
+with st.sidebar:
+    st.markdown("---")
+    st.header("⏱️ Profiler")
+    st.checkbox("Profile reruns", key="profile_reruns", help="Time each phase of every rerun")
+    if last_run:
+        counters = ", ".join(f"{name}: {value:,}" for name, value in last_run['counters'].items())
+        st.caption(f"Run {last_run['run']}: {last_run['total_ms']:.1f} ms" + (f" | {counters}" if counters else ""))
+        st.dataframe(summary_rows(last_run), hide_index=True)
+        st.line_chart([run['total_ms'] for run in profiler.runs], height=120)
+        st.download_button(
+            label="💾 Download rerun_trace.json",
+            data=lambda: codec.dumps(profiler.trace()),
+            file_name="rerun_trace.json",
+            mime="application/json",
+            help="Chrome trace of recent reruns, for chrome://tracing or Perfetto"
+        )
@@ -0,0 +1,107 @@
+"""Tests for the editor app's case list and lazy Field Editor"""
+import re
+from pathlib import Path
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+APP = Path(__file__).resolve().parent.parent / "new_code.py"
+
+
+def _open_app(cases):
+    at = AppTest.from_file(str(APP), default_timeout=60)
+    at.run()
+    at.session_state.test_cases = cases
+    return at.run()
+
+
+def _shown_cases(at):
+    """1-based numbers of the cases listed on the current page, open or collapsed"""
+    labels = [m.value for m in at.markdown] + [e.label for e in at.expander]
+    return sorted(int(n) for label in labels for n in re.findall(r"Test Case (\d+)", label))
+
+
+def _reference_match(value, query):
+    """Recursive scan the search must agree with: any key or scalar's text contains the query"""
+    if isinstance(value, dict):
+        return any(query in str(k).lower() or _reference_match(v, query) for k, v in value.items())
+    if isinstance(value, list):
+        return any(_reference_match(v, query) for v in value)
+    return query in str(value).lower()
+
+
+def test_pages_show_their_slice_of_the_suite():
+    at = _open_app([{"mhm": {"age": i}} for i in range(60)])
+    assert _shown_cases(at) == list(range(1, 11))
+
+    at.selectbox(key="page_size").set_value(25).run()
+    at.number_input(key="page").set_value(3).run()
+    assert _shown_cases(at) == list(range(51, 61))
+
+
+SEARCH_CASES = [
+    {"mhm": {"age": 40, "DM2": True}, "tags": ["Smoker", {"note": None}]},
+    {"mhm": {"age": 14}, "slp": {"bed": "22:30"}},
+    {"Note": [[1, 2], [3, 41]]},
+    {"mhm": {"age": None}},
+    [],
+    "bare 40",
+]
+
+
+@pytest.mark.parametrize("query", ["40", "smoker", "note", "none", "true", "22:", "4", "mhm", "zzz"])
+def test_search_matches_reference_scan(query):
+    at = _open_app(SEARCH_CASES)
+    at.selectbox(key="page_size").set_value(100).run()
+    at.text_input(key="search_query").set_value(query.upper()).run()
+    expected = [i + 1 for i, case in enumerate(SEARCH_CASES) if _reference_match(case, query)]
+    assert _shown_cases(at) == expected
+
+
+def test_jump_to_case():
+    at = _open_app([{"mhm": {"age": i}} for i in range(60)])
+    at.number_input(key="jump_to").set_value(37).run()
+    at.button(key="jump_go").click().run()
+    assert at.session_state.page == 4
+    assert 37 in _shown_cases(at)
+
+    # Within a search the page counts matching cases only
+    at.text_input(key="search_query").set_value("5").run()
+    at.number_input(key="jump_to").set_value(56).run()
+    at.button(key="jump_go").click().run()
+    assert at.session_state.page == 2
+    assert 56 in _shown_cases(at)
+
+    # A case hidden by the search clears it
+    at.number_input(key="jump_to").set_value(12).run()
+    at.button(key="jump_go").click().run()
+    assert at.session_state.search_query == ""
+    assert at.session_state.page == 2
+    assert 12 in _shown_cases(at)
+
+
+def test_field_edits_survive_category_switch_and_apply_on_update():
+    at = _open_app([{"mhm": {"age": 40, "tag": "x"}, "smk": {"now": 0}}])
+
+    at.number_input(key="0_mhm.age").set_value(55).run()
+    at.radio(key="field_category_0").set_value("smk").run()
+    # The mhm inputs are gone but their change is still pending
+    assert not [n for n in at.number_input if n.key == "0_mhm.age"]
+    assert at.session_state.field_edits[0] == {"mhm.age": 55}
+
+    at.number_input(key="0_smk.now").set_value(1).run()
+    at.radio(key="field_category_0").set_value("mhm").run()
+    assert at.number_input(key="0_mhm.age").value == 55
+
+    at.button(key="update_fields_0").click().run()
+    assert not at.exception
+    assert at.session_state.test_cases == [{"mhm": {"age": 55, "tag": "x"}, "smk": {"now": 1}}]
+    assert not at.session_state.field_edits.get(0)
+
+
+def test_field_edits_reverted_to_stored_value_are_dropped():
+    at = _open_app([{"mhm": {"age": 40}, "smk": {"now": 0}}])
+
+    at.number_input(key="0_mhm.age").set_value(41).run()
+    at.number_input(key="0_mhm.age").set_value(40).run()
+    assert not at.session_state.field_edits[0]
@@ -0,0 +1,112 @@
+"""Tests for the per-case JSON cache"""
+import copy
+import json
+
+import pytest
+
+from jsonviewer.cache import CaseCache, content_hash, parse_json
+from jsonviewer.flatten import flatten_dict
+from jsonviewer.patch import apply_patch, make_patch
+from jsonviewer.templates import DEFAULT_TEST_CASE
+
+CASES = [
+    copy.deepcopy(DEFAULT_TEST_CASE),
+    {"mhm": {"age": 40, "tags": ["a", {"b": None}]}, "smk": {}, "note": "café ☕"},
+    {"z": 1, "a": [1.5, -2, True, None]},
+    [],
+    "bare",
+]
+
+
+@pytest.mark.parametrize("case", CASES)
+def test_results_match_uncached_functions(case):
+    cache = CaseCache()
+    for _ in range(2):
+        assert cache.pretty(case) == json.dumps(case, indent=2)
+        if isinstance(case, dict):
+            assert cache.flatten(case) == flatten_dict(case)
+    edited = json.dumps(case, indent=2) + " "
+    for _ in range(2):
+        assert cache.validate(case, edited) == parse_json(edited)
+    assert cache.validate(case, "{bad") == parse_json("{bad")
+
+
+def test_identity_and_content_hash_hits():
+    cache = CaseCache()
+    case = {"mhm": {"age": 40}, "smk": {"now": 1}}
+    cache.pretty(case)
+    assert cache.stats() == {'hits': 0, 'misses': 1, 'evictions': 0, 'entries': 1}
+    cache.pretty(case)
+    assert cache.stats()['hits'] == 1
+
+    # An equal case in a new object, even with another key order, shares the entry
+    reordered = {"smk": {"now": 1}, "mhm": {"age": 40}}
+    assert content_hash(reordered) == content_hash(case)
+    cache.flatten(reordered)
+    assert cache.stats() == {'hits': 2, 'misses': 1, 'evictions': 0, 'entries': 1}
+
+    cache.pretty({"mhm": {"age": 41}, "smk": {"now": 1}})
+    assert cache.stats()['misses'] == 2
+
+
+def test_validate_returns_the_callers_case():
+    cache = CaseCache()
+    first = {"a": [1]}
+    second = {"a": [1]}
+    text = cache.pretty(first)
+    assert cache.validate(first, text)[2] is first
+    assert cache.validate(second, text)[2] is second
+
+    edited = '{"a": [2]}'
+    parsed_first = cache.validate(first, edited)[2]
+    parsed_second = cache.validate(second, edited)[2]
+    assert parsed_first == parsed_second == {"a": [2]}
+    assert parsed_first is not parsed_second
+    assert parsed_first["a"] is not parsed_second["a"]
+
+
+def test_lru_eviction():
+    cache = CaseCache(max_entries=3)
+    cases = [{"n": n} for n in range(4)]
+    for case in cases[:3]:
+        cache.pretty(case)
+    cache.pretty(cases[0])
+    cache.pretty(cases[3])
+    stats = cache.stats()
+    assert stats['entries'] == 3
+    assert stats['evictions'] == 1
+
+    # cases[1] was least recently used, so it was the one dropped
+    misses = cache.misses
+    cache.pretty(cases[0])
+    cache.pretty(cases[2])
+    assert cache.misses == misses
+    cache.pretty(cases[1])
+    assert cache.misses == misses + 1
+    assert len(cache._by_id) <= 3
+
+
+EDITS = [
+    {"mhm": {"age": 41, "tags": ["a", {"b": None}]}, "smk": {}, "note": "café ☕"},
+    {"mhm": {"age": 40, "tags": ["a", {"b": None}]}, "smk": {"now": 1}, "note": "café ☕"},
+    {"mhm": {"age": 40, "tags": ["a", {"b": None}]}, "note": "café ☕"},
+    {"mhm": {"age": 40, "tags": ["a", {"b": None}]}, "smk": {}, "note": "tea", "new": {"x": {"y": 1}}},
+    {"mhm": {}, "smk": {}, "note": None},
+]
+
+
+@pytest.mark.parametrize("new", EDITS)
+def test_derive_matches_flattening_the_edited_case(new):
+    cache = CaseCache()
+    old = copy.deepcopy(CASES[1])
+    cache.flatten(old)
+    patch = make_patch(old, new)
+    edited = apply_patch(old, patch)
+    cache.derive(old, edited, patch)
+    assert cache._peek(edited).flat is not None
+
+    misses = cache.misses
+    flat = cache.flatten(edited)
+    assert cache.misses == misses
+    assert flat == flatten_dict(edited)
+    assert list(flat) == list(flatten_dict(edited))
@@ -0,0 +1,73 @@
+"""Tests for the single-pass null cleaner"""
+import copy
+import random
+
+import pytest
+
+from benchmarks.bench_cleaning import legacy_remove_null_values, make_deep_form, make_large_form
+from jsonviewer.cleaning import clean_form, is_form_empty, remove_null_values
+from jsonviewer.templates import DEFAULT_TEST_CASE, get_default_json_structure
+
+SCALARS = [None, "", "null", "NULL", "Null", "nul", "none", 0, 0.0, False, True, 1, -2.5, "text", " "]
+
+
+def _random_value(rng, depth):
+    roll = rng.random()
+    if depth > 0 and roll < 0.25:
+        return {f"k{i}": _random_value(rng, depth - 1) for i in range(rng.randrange(4))}
+    if depth > 0 and roll < 0.45:
+        return [_random_value(rng, depth - 1) for _ in range(rng.randrange(4))]
+    return rng.choice(SCALARS)
+
+
+FORMS = [
+    {},
+    [],
+    {"a": None},
+    {"a": {"b": {"c": ""}}, "d": []},
+    {"a": [None, "", "null", [], {}, [None], {"x": None}]},
+    {"a": [0, False, "0", "false"], "b": {"c": 0.0}},
+    {"a": [[None, 1], {"b": "NULL", "c": [2]}]},
+    copy.deepcopy(DEFAULT_TEST_CASE),
+    get_default_json_structure(),
+    make_large_form(50),
+    make_deep_form(50),
+] + SCALARS
+
+
+@pytest.mark.parametrize("form", FORMS)
+def test_matches_legacy_cleaner(form):
+    snapshot = copy.deepcopy(form)
+    cleaned = remove_null_values(form)
+    expected = legacy_remove_null_values(form)
+    assert cleaned == expected
+    # Key order is part of the copied output
+    assert repr(cleaned) == repr(expected)
+    assert form == snapshot
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_matches_legacy_cleaner_on_random_forms(seed):
+    rng = random.Random(seed)
+    form = {f"s{i}": _random_value(rng, 4) for i in range(rng.randrange(1, 5))}
+    assert repr(remove_null_values(form)) == repr(legacy_remove_null_values(form))
+
+
+@pytest.mark.parametrize("form", FORMS)
+def test_clean_form(form):
+    expected = legacy_remove_null_values(form)
+    expected_empty = expected is None or expected == {}
+    assert clean_form(form) == (expected, expected_empty)
+    assert is_form_empty(form) == expected_empty
+
+
+def test_deep_forms_do_not_recurse():
+    form = make_deep_form(5000)
+    cleaned = remove_null_values(form)
+    depth = 0
+    while "child" in cleaned:
+        cleaned = cleaned["child"]
+        depth += 1
+    # The innermost child is empty and dropped
+    assert depth == 4999
+    assert cleaned == {"value": 4999}
@@ -0,0 +1,130 @@
+"""Command line exit codes and outputs"""
+import gzip
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from jsonviewer.cli import EXIT_ERROR, EXIT_INVALID, main
+from jsonviewer.stub_server import start_stub_server
+from jsonviewer.templates import DEFAULT_TEST_CASE
+
+
+def _write(path, cases):
+    path.write_text(json.dumps(cases))
+    return str(path)
+
+
+def _read(path):
+    return json.loads(path.read_text())
+
+
+@pytest.fixture
+def suite(tmp_path):
+    cases = [{"mhm": {"age": 30, "sbp": None}}, {"mhm": {"age": 40}}, {"mhm": {"age": 30}}, {"mhm": {}}]
+    return _write(tmp_path / "suite.json", cases)
+
+
+def test_clean_and_dedup(tmp_path, suite):
+    out = tmp_path / "clean.json"
+    assert main(['clean', suite, '-o', str(out), '-q']) == 0
+    assert _read(out) == [{"mhm": {"age": 30}}, {"mhm": {"age": 40}}, {"mhm": {"age": 30}}]
+    assert main(['dedup', suite, '-o', str(out), '-q']) == 0
+    assert _read(out) == [{"mhm": {"age": 30, "sbp": None}}, {"mhm": {"age": 40}}, {"mhm": {}}]
+
+
+def test_convert_ndjson_gzip_round_trip(tmp_path, suite):
+    packed = tmp_path / "suite.ndjson.gz"
+    assert main(['convert', suite, '--format', 'ndjson', '-o', str(packed), '-q']) == 0
+    lines = gzip.decompress(packed.read_bytes()).decode().splitlines()
+    assert [json.loads(line) for line in lines] == json.loads(open(suite).read())
+    # Gzipped input is detected from its contents
+    out = tmp_path / "flat.json"
+    assert main(['convert', str(packed), '--flatten', '-o', str(out), '-q']) == 0
+    assert _read(out)[1] == {"mhm.age": 40}
+
+
+def test_validate_exit_codes(tmp_path, capsys):
+    valid = _write(tmp_path / "valid.json", [DEFAULT_TEST_CASE])
+    invalid = _write(tmp_path / "invalid.json", [DEFAULT_TEST_CASE, {"mhm": {"age": "old"}}])
+    assert main(['validate', valid, '-q']) == 0
+    assert main(['validate', invalid, '-q', '--allow-missing']) == EXIT_INVALID
+    assert "case 1: mhm.age" in capsys.readouterr().out
+
+
+def test_unreadable_input_exit_code(tmp_path, capsys):
+    broken = tmp_path / "broken.json"
+    broken.write_text('[{"a": 1}, {"a": ')
+    assert main(['clean', str(broken), '-o', str(tmp_path / "out.json"), '-q']) == EXIT_ERROR
+    assert main(['clean', str(tmp_path / "absent.json"), '-q']) == EXIT_ERROR
+    assert main(['transform', str(broken), '-s', 'frobnicate a', '-q']) == EXIT_ERROR
+    assert capsys.readouterr().err.count("error:") == 3
+
+
+def test_usage_errors_exit_2():
+    with pytest.raises(SystemExit) as exit_info:
+        main(['no-such-command'])
+    assert exit_info.value.code == 2
+
+
+def test_diff_exit_codes(tmp_path):
+    old = _write(tmp_path / "old.json", [{"a": 1}, {"a": 2}])
+    same = _write(tmp_path / "same.json", [{"a": 1}, {"a": 2}])
+    new = _write(tmp_path / "new.json", [{"a": 1}, {"a": 3}, {"a": 4}])
+    report = tmp_path / "report.ndjson"
+    assert main(['diff', old, same, '-o', str(report), '-q']) == 0
+    assert report.read_text() == ''
+    assert main(['diff', old, new, '-o', str(report), '-q']) == EXIT_INVALID
+    records = [json.loads(line) for line in report.read_text().splitlines()]
+    assert [record['status'] for record in records] == ['changed', 'added']
+
+
+def test_merge_exit_codes(tmp_path):
+    base = _write(tmp_path / "base.json", [{"a": 1, "b": 1}])
+    ours = _write(tmp_path / "ours.json", [{"a": 2, "b": 1}])
+    theirs = _write(tmp_path / "theirs.json", [{"a": 1, "b": 2}])
+    clash = _write(tmp_path / "clash.json", [{"a": 3, "b": 1}])
+    out = tmp_path / "merged.json"
+    conflicts = tmp_path / "conflicts.ndjson"
+    assert main(['merge', base, ours, theirs, '-o', str(out), '-q']) == 0
+    assert _read(out) == [{"a": 2, "b": 2}]
+    assert main(['merge', base, ours, clash, '-o', str(out), '--conflicts', str(conflicts), '-q']) == EXIT_INVALID
+    assert json.loads(conflicts.read_text()) == {"key": None, "path": "a", "base": 1, "ours": 2, "theirs": 3}
+
+
+def test_transform(tmp_path, suite):
+    out = tmp_path / "out.json"
+    assert main(['transform', suite, '-s', 'fill mhm.sbp = 120', '-s', 'drop mhm.age', '-o', str(out), '-q']) == 0
+    assert _read(out) == [{"mhm": {"sbp": 120}}] * 4
+    assert main(['transform', suite, '-s', 'drop mhm.age', '--dry-run', '-q']) == 0
+
+
+def test_regress_records_then_detects_drift(tmp_path):
+    server, url = start_stub_server()
+    drifted_server, drifted_url = start_stub_server(drift=0.05)
+    try:
+        suite = _write(tmp_path / "suite.json", [{"mhm": {"age": 30, "sbp": 120}}, {"mhm": {"age": 40}}])
+        golden = str(tmp_path / "golden.ndjson")
+        report = tmp_path / "drift.ndjson"
+        assert main(['regress', suite, '--url', url, '--golden', golden, '-q']) == 0
+        assert main(['regress', suite, '--url', url, '--golden', golden, '-o', str(report), '-q']) == 0
+        assert report.read_text() == ''
+        assert main(['regress', suite, '--url', drifted_url, '--golden', golden,
+                     '-o', str(report), '-q']) == EXIT_INVALID
+        assert report.read_text()
+        assert main(['regress', suite, '--url', drifted_url, '--golden', golden, '--tolerance', '*=10%',
+                     '-o', str(report), '-q']) == 0
+    finally:
+        server.shutdown()
+        drifted_server.shutdown()
+
+
+def test_module_entry_point(tmp_path):
+    suite = _write(tmp_path / "suite.json", [{"mhm": {"age": "old"}}])
+    result = subprocess.run([sys.executable, '-m', 'jsonviewer', 'validate', suite, '--allow-missing'],
+                            capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    assert result.returncode == EXIT_INVALID
+    assert "1 invalid" in result.stderr
@@ -0,0 +1,67 @@
+"""codec.dumps/loads must match the stdlib json calls they replace"""
+import json
+
+import pytest
+
+from jsonviewer import codec
+from jsonviewer.templates import DEFAULT_TEST_CASE
+
+DOCUMENTS = [
+    DEFAULT_TEST_CASE,
+    {"b": 1, "a": [1, 2.5, None, True, False], "c": {"d": "text"}},
+    {"accent": "café", "cjk": "数据", "emoji": "🙂", "del": "\x7f"},
+    [1e16, 1e-7, 0.00001, 1.5, -0.0, 123456789.125],
+    [2 ** 63, -(2 ** 63) - 1, 2 ** 64, 10 ** 30],
+    {"1": "string key"},
+    [],
+    {},
+    "plain",
+    0,
+]
+
+
+@pytest.mark.parametrize("doc", DOCUMENTS)
+@pytest.mark.parametrize("sort_keys", [False, True])
+def test_dumps_matches_stdlib(doc, sort_keys):
+    assert codec.dumps(doc, pretty=True, sort_keys=sort_keys) == json.dumps(doc, indent=2, sort_keys=sort_keys)
+    assert codec.dumps(doc, sort_keys=sort_keys) == json.dumps(doc, separators=(',', ':'), sort_keys=sort_keys)
+    assert codec.dumps_bytes(doc, pretty=True) == json.dumps(doc, indent=2).encode('utf-8')
+
+
+def test_dumps_non_string_keys_match_stdlib():
+    doc = {1: "a", 2.5: "b", True: "c", None: "d"}
+    assert codec.dumps(doc) == json.dumps(doc, separators=(',', ':'))
+
+
+@pytest.mark.parametrize("doc", DOCUMENTS)
+def test_loads_round_trips(doc):
+    text = json.dumps(doc)
+    assert repr(codec.loads(text)) == repr(json.loads(text))
+    assert repr(codec.loads(text.encode('utf-8'))) == repr(json.loads(text))
+
+
+@pytest.mark.parametrize("text", [
+    '123456789012345678901234567890',
+    '[18446744073709551616, -9223372036854775809]',
+    '{"a": [NaN, Infinity, -Infinity]}',
+    '"\\ud800"',
+    '1e400',
+])
+def test_loads_matches_stdlib_where_orjson_differs(text):
+    assert repr(codec.loads(text)) == repr(json.loads(text))
+
+
+def test_loads_finds_long_numbers_across_scan_windows():
+    # Place a 25-digit integer on every offset around the first window boundary
+    for shift in range(30):
+        text = ' ' * shift + '[' + '0,' * (1 << 15) + '1234567890123456789012345]'
+        assert codec.loads(text)[-1] == 1234567890123456789012345
+
+
+@pytest.mark.parametrize("text", ['{"a": }', '[1, 2', 'garbage', ''])
+def test_loads_raises_stdlib_errors(text):
+    with pytest.raises(json.JSONDecodeError) as expected:
+        json.loads(text)
+    with pytest.raises(codec.JSONDecodeError) as actual:
+        codec.loads(text)
+    assert str(actual.value) == str(expected.value)
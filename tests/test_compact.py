@@ -0,0 +1,92 @@
+"""CompactSuite must decode exactly the cases it was given"""
+import copy
+import json
+
+import pytest
+
+from jsonviewer.cleaning import remove_null_values
+from jsonviewer.compact import CompactSuite
+from jsonviewer.generator import generate_random
+from jsonviewer.templates import DEFAULT_TEST_CASE, get_default_json_structure
+
+
+def _variant(**sections):
+    case = copy.deepcopy(DEFAULT_TEST_CASE)
+    for section, fields in sections.items():
+        case[section].update(fields)
+    return case
+
+
+ODD_CASES = [
+    DEFAULT_TEST_CASE,
+    get_default_json_structure(),
+    _variant(mhm={"age": None, "hgt": 185.25, "wgt": 77.0}),
+    _variant(mhm={"age": "forty", "sex": True, "DM2": 2 ** 70}),
+    _variant(mhm={"whr": 0.1 + 0.2, "vo2max": 1e-9, "fat": -3}),
+    _variant(slp={"bed": [], "slp": [None, 8.0], "awk": [[1, 2]]}),
+    {"mhm": {"sbp": 120}},
+    {"smk": {"now": 1}, "mhm": {"age": 30}},
+    {"unknown": {"x": 1}},
+    {"mhm": {}},
+    {},
+    [1, 2, 3],
+    None,
+    "not a case",
+]
+
+
+def _same(a, b):
+    # == treats 1 and 1.0 alike; the text shows int/float, key order and bool vs int
+    return json.dumps(a) == json.dumps(b)
+
+
+def test_round_trip_odd_cases():
+    suite = CompactSuite(ODD_CASES)
+    assert len(suite) == len(ODD_CASES)
+    for expected, actual in zip(ODD_CASES, suite):
+        assert _same(actual, expected)
+
+
+def test_round_trip_generated_suite():
+    cases = list(generate_random(DEFAULT_TEST_CASE, 500, seed=7))
+    suite = CompactSuite(cases)
+    assert all(_same(a, b) for a, b in zip(suite, cases))
+    assert suite.nbytes() < len(json.dumps(cases))
+
+
+def test_mutations_match_a_list():
+    cases = list(generate_random(DEFAULT_TEST_CASE, 50, seed=1))
+    expected = list(cases)
+    suite = CompactSuite(cases)
+    operations = [
+        lambda s: s.__setitem__(3, ODD_CASES[3]),
+        lambda s: s.insert(0, ODD_CASES[5]),
+        lambda s: s.append(ODD_CASES[8]),
+        lambda s: s.__delitem__(10),
+        lambda s: s.__delitem__(slice(20, 30)),
+        lambda s: s.extend(ODD_CASES),
+    ]
+    for operation in operations:
+        operation(suite)
+        operation(expected)
+        assert len(suite) == len(expected)
+        assert all(_same(a, b) for a, b in zip(suite, expected))
+
+
+def test_field_reads_one_column():
+    suite = CompactSuite(ODD_CASES)
+    missing = object()
+    values = suite.field("mhm.age", missing)
+    for case, value in zip(ODD_CASES, values):
+        section = case.get("mhm") if isinstance(case, dict) else None
+        expected = section.get("age", missing) if isinstance(section, dict) else missing
+        assert value is expected or _same(value, expected)
+    assert suite.field("not.a.column") is None
+
+
+@pytest.mark.parametrize("cases", [ODD_CASES[:8], list(generate_random(DEFAULT_TEST_CASE, 20, seed=3))])
+def test_without_nulls_matches_remove_null_values(cases):
+    cleaned = CompactSuite(cases).without_nulls()
+    for case, actual in zip(cases, cleaned):
+        expected = remove_null_values(case)
+        assert _same(actual, {} if expected is None else expected)
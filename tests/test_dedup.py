@@ -0,0 +1,121 @@
+"""Exact and near-duplicate detection"""
+import copy
+import random
+import time
+
+import numpy as np
+import pytest
+
+from jsonviewer import dedup
+from jsonviewer.dedup import (_value_hash, canonical_key, exact_duplicates, near_duplicates,
+                              redundant_positions, unique_cases)
+from jsonviewer.generator import generate_random
+from jsonviewer.templates import DEFAULT_TEST_CASE
+
+
+def _with(**fields):
+    case = copy.deepcopy(DEFAULT_TEST_CASE)
+    for path, value in fields.items():
+        section, field = path.split('__')
+        case[section][field] = value
+    return case
+
+
+def test_canonical_key_ignores_key_order_and_nulls():
+    assert canonical_key({"a": 1, "b": 2}) == canonical_key({"b": 2, "a": 1})
+    assert canonical_key({"a": 1, "b": None, "c": []}) == canonical_key({"a": 1})
+    assert canonical_key({"a": 1}) != canonical_key({"a": 2})
+    assert canonical_key({"a": 1}) != canonical_key({"a": True})
+
+
+def test_exact_duplicates():
+    cases = [{"a": 1}, {"a": 2}, {"a": 1, "b": None}, {"a": 2}, {"a": 1}, {"a": 3}]
+    groups = exact_duplicates(cases)
+    assert groups == [[0, 2, 4], [1, 3]]
+    assert redundant_positions(groups) == [2, 3, 4]
+    assert unique_cases(cases) == [{"a": 1}, {"a": 2}, {"a": 3}]
+
+
+def test_value_hash_keeps_types_and_neighbours_apart():
+    values = [0, 1, -1, -2, 2, True, False, 1.0, 0.0, -1.0, 0.5, None, "", "0", "1", [], {}, [0], [1]]
+    hashes = [_value_hash(value) for value in values]
+    assert len(set(hashes)) == len(values)
+    # Zero marks an absent field, so no present value may hash to it
+    assert 0 not in hashes
+
+
+def test_near_duplicates_within_limit():
+    cases = list(generate_random(DEFAULT_TEST_CASE, 50, seed=11))
+    close = copy.deepcopy(cases[5])
+    close["mhm"]["age"] = close["mhm"]["age"] + 1
+    close["smk"]["now"] = 1 - close["smk"]["now"]
+    cases.append(close)
+    cases.append(copy.deepcopy(cases[20]))
+    clusters = near_duplicates(cases, max_fields=2)
+    assert [5, 50] in clusters
+    assert [20, 51] in clusters
+    assert all(len(cluster) == 2 for cluster in clusters)
+
+
+def test_near_duplicates_zero_one_fields_are_different():
+    # Three 0 -> 1 flips differ in three fields, beyond a limit of two
+    cases = [
+        DEFAULT_TEST_CASE,
+        _with(mhm__CAN=1, mhm__CHD=1, mhm__CHF=1),
+        _with(mhm__CKD=1, mhm__CVD=1, mhm__STK=1),
+        _with(smk__now=-1, smk__evr=-1, smk__yrs=-1),
+        _with(smk__now=-2, smk__evr=-2, smk__yrs=-2),
+        _with(mhm__age=1.0, mhm__hgt=1.0, mhm__wgt=1.0),
+        _with(mhm__age=True, mhm__hgt=True, mhm__wgt=True),
+    ]
+    assert near_duplicates(cases, max_fields=2) == []
+    # Each one is three fields from the template, so a limit of three links them all
+    assert near_duplicates(cases, max_fields=3) == [list(range(len(cases)))]
+
+
+def test_near_duplicates_small_inputs():
+    assert near_duplicates([]) == []
+    assert near_duplicates([DEFAULT_TEST_CASE]) == []
+    assert near_duplicates([DEFAULT_TEST_CASE, _with(mhm__age=26)]) == [[0, 1]]
+
+
+def _brute_force_clusters(cases, max_fields):
+    """Link every pair of cases within the limit, comparing all of them"""
+    hashes = dedup.field_hashes(cases)
+    parents = list(range(len(cases)))
+    for i in range(len(cases)):
+        for j in np.flatnonzero((hashes[i + 1:] != hashes[i]).sum(axis=1) <= max_fields).tolist():
+            a, b = dedup._find(parents, i), dedup._find(parents, i + 1 + j)
+            parents[max(a, b)] = min(a, b)
+    clusters = {}
+    for position in range(len(cases)):
+        clusters.setdefault(dedup._find(parents, position), []).append(position)
+    return [cluster for cluster in clusters.values() if len(cluster) > 1]
+
+
+@pytest.mark.parametrize("max_bucket_size", [2, 16, dedup.MAX_BUCKET_SIZE])
+@pytest.mark.parametrize("max_fields", [1, 2, 3])
+@pytest.mark.parametrize("seed", range(3))
+def test_near_duplicates_match_brute_force(seed, max_fields, max_bucket_size, monkeypatch):
+    # Many 0/1 flags and a few wider fields make buckets of every size
+    monkeypatch.setattr(dedup, "MAX_BUCKET_SIZE", max_bucket_size)
+    rng = random.Random(seed)
+    cases = [{**{f"flag{k}": int(rng.random() < 0.15) for k in range(12)},
+              "level": rng.randrange(4), "score": rng.randrange(50)}
+             for _ in range(300)]
+    assert near_duplicates(cases, max_fields) == _brute_force_clusters(cases, max_fields)
+
+
+def test_near_duplicates_large_degenerate_bucket():
+    # Seven fields are constant but for a few cases, so a group made of them
+    # puts almost the whole suite in one bucket
+    rng = random.Random(0)
+    cases = [{"a": rng.randrange(10 ** 6), "b": rng.randrange(10 ** 6), **{f"c{k}": 0 for k in range(7)}}
+             for _ in range(20000)]
+    for i in range(5):
+        cases[i][f"c{i}"] = 1
+    start = time.perf_counter()
+    clusters = near_duplicates(cases, max_fields=2)
+    # Comparing the bucket pair by pair takes minutes
+    assert time.perf_counter() - start < 20
+    assert clusters == [list(range(5, len(cases)))]
@@ -0,0 +1,113 @@
+"""Suite diffs and three-way merges"""
+import pytest
+
+from jsonviewer.diff import (ADDED, CHANGED, REMOVED, UNCHANGED, Conflict, DiffSummary, FieldChange,
+                             diff_suites, field_changes, merge_cases, merge_suites)
+from jsonviewer.flatten import MISSING
+
+
+def _case(id, **fields):
+    return {"meta": {"id": id}, "mhm": dict(fields)}
+
+
+def test_field_changes():
+    old = {"a": {"x": 1, "y": 2}, "b": 1}
+    new = {"a": {"x": 1, "y": 3, "z": 4}, "b": True}
+    assert field_changes(old, new) == [
+        FieldChange("a.y", 2, 3),
+        FieldChange("b", 1, True),
+        FieldChange("a.z", MISSING, 4),
+    ]
+
+
+def test_diff_by_position():
+    old = [_case(1, age=20), _case(2, age=30), _case(3, age=40)]
+    new = [_case(1, age=20), _case(2, age=31)]
+    diffs = list(diff_suites(old, new))
+    assert [diff.status for diff in diffs] == [UNCHANGED, CHANGED, REMOVED]
+    assert diffs[1].changes == [FieldChange("mhm.age", 30, 31)]
+
+
+def test_diff_by_id_follows_moved_cases():
+    old = [_case(1, age=20), _case(2, age=30), _case(3, age=40)]
+    new = [_case(3, age=41), _case(1, age=20), _case(4, age=50)]
+    diffs = {diff.key: diff for diff in diff_suites(old, new, align="meta.id")}
+    assert diffs[1].status == UNCHANGED and (diffs[1].old_index, diffs[1].new_index) == (0, 1)
+    assert diffs[3].status == CHANGED and diffs[3].changes == [FieldChange("mhm.age", 40, 41)]
+    assert diffs[2].status == REMOVED
+    assert diffs[4].status == ADDED
+
+
+def test_diff_by_hash_pairs_leftover_edits():
+    old = [_case(1, age=20), _case(2, age=30)]
+    new = [_case(2, age=30), _case(1, age=21), _case(5, age=1)]
+    summary = DiffSummary()
+    diffs = list(summary.track(diff_suites(old, new, align="hash")))
+    assert [diff.status for diff in diffs] == [UNCHANGED, CHANGED, ADDED]
+    assert (diffs[1].old_index, diffs[1].new_index) == (0, 1)
+    assert summary.differences == 2
+    assert summary.top_fields() == [("mhm.age", 1)]
+    assert summary.sections() == {"mhm": 1}
+
+
+def test_merge_takes_one_sided_changes():
+    base = {"a": 1, "b": 1, "c": 1}
+    ours = {"a": 2, "b": 1, "c": 1}
+    theirs = {"a": 1, "b": 1, "c": 3, "d": 4}
+    merged = merge_cases(base, ours, theirs)
+    assert merged.case == {"a": 2, "b": 1, "c": 3, "d": 4}
+    assert merged.conflicts == []
+
+
+def test_merge_conflicts_keep_ours():
+    base = {"mhm": {"age": 30, "sbp": 120}}
+    ours = {"mhm": {"age": 31, "sbp": 120}}
+    theirs = {"mhm": {"age": 32, "sbp": 125}}
+    merged = merge_cases(base, ours, theirs, key=7)
+    assert merged.case == {"mhm": {"age": 31, "sbp": 125}}
+    assert merged.conflicts == [Conflict(7, "mhm.age", 30, 31, 32)]
+
+
+def test_merge_type_change_is_a_conflict():
+    merged = merge_cases({"a": 1}, {"a": True}, {"a": 2})
+    assert [conflict.path for conflict in merged.conflicts] == ["a"]
+
+
+@pytest.mark.parametrize("base, ours, theirs, expected, conflicts", [
+    # Deleted on both sides, or on one side while the other left it alone
+    ({"a": 1}, MISSING, MISSING, None, 0),
+    ({"a": 1}, MISSING, {"a": 1}, None, 0),
+    # Deleted on one side, edited on the other: the edit is kept
+    ({"a": 1}, MISSING, {"a": 2}, {"a": 2}, 1),
+    ({"a": 1}, {"a": 2}, MISSING, {"a": 2}, 1),
+    # Added on one side only
+    (MISSING, MISSING, {"a": 1}, {"a": 1}, 0),
+])
+def test_merge_deletions(base, ours, theirs, expected, conflicts):
+    merged = merge_cases(base, ours, theirs)
+    if expected is None:
+        assert merged is None
+    else:
+        assert merged.case == expected
+        assert len(merged.conflicts) == conflicts
+
+
+def test_merge_object_against_value_conflicts():
+    # We turned a value into an object while they changed the value
+    merged = merge_cases({"a": 1}, {"a": {"b": 1}}, {"a": 2})
+    assert merged.case == {"a": {"b": 1}}
+    assert merged.conflicts == [Conflict(None, "a", 1, MISSING, 2)]
+
+
+def test_merge_suites_by_id():
+    base = [_case(1, age=20), _case(2, age=30), _case(3, age=40)]
+    ours = [_case(2, age=31), _case(1, age=20)]
+    theirs = [_case(1, age=22), _case(2, age=32), _case(3, age=40), _case(4, age=50)]
+    merged = list(merge_suites(base, ours, theirs, align="meta.id"))
+    assert [m.case for m in merged] == [_case(2, age=31), _case(1, age=22), _case(4, age=50)]
+    assert [c.path for m in merged for c in m.conflicts] == ["mhm.age"]
+
+
+def test_merge_suites_rejects_hash_alignment():
+    with pytest.raises(ValueError):
+        list(merge_suites([], [], [], align="hash"))
@@ -0,0 +1,183 @@
+"""Batch execution against the local stub server and scripted raw responses"""
+import socket
+import threading
+
+import pytest
+
+from jsonviewer import codec
+from jsonviewer.executor import execute_suite, latency_summary, percentile
+from jsonviewer.stub_server import StubHandler, StubServer, start_stub_server
+
+CASES = [{"mhm": {"age": age, "sbp": 120}} for age in range(30, 50)]
+
+
+@pytest.fixture
+def stub():
+    server, url = start_stub_server()
+    yield server, url
+    server.shutdown()
+    server.server_close()
+
+
+def _count_connections(server):
+    accepted = []
+    get_request = server.get_request
+
+    def counting():
+        connection = get_request()
+        accepted.append(connection)
+        return connection
+    server.get_request = counting
+    return accepted
+
+
+def test_responses_in_case_order(stub):
+    server, url = stub
+    results = execute_suite(CASES, url, concurrency=4)
+    assert [result['case'] for result in results] == list(range(1, len(CASES) + 1))
+    assert all(result['status'] == 200 and result['attempts'] == 1 for result in results)
+    scores = [codec.loads(result['response'])[0]['sections']['mhm'] for result in results]
+    assert scores == [(age + 120) / 2 for age in range(30, 50)]
+
+
+def test_unwrapped_cases(stub):
+    _, url = stub
+    result, = execute_suite(CASES[:1], url, wrap_in_list=False)
+    assert codec.loads(result['response'])['sections'] == {"mhm": 75.0}
+
+
+def test_keep_alive_connections_are_reused(stub):
+    server, url = stub
+    accepted = _count_connections(server)
+    results = execute_suite(CASES * 5, url, concurrency=3)
+    assert len(results) == len(CASES) * 5
+    assert 1 <= len(accepted) <= 3
+
+
+def test_gateway_errors_are_retried():
+    server, url = start_stub_server(fail_rate=1.0)
+    try:
+        results = execute_suite(CASES[:3], url, retries=2)
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert [(result['status'], result['attempts']) for result in results] == [(503, 3)] * 3
+    assert latency_summary(results)['failed'] == 3
+
+
+def test_connection_refused_is_reported():
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+    result, = execute_suite(CASES[:1], f"http://127.0.0.1:{port}/score", retries=1)
+    assert result['status'] is None
+    assert result['attempts'] == 2
+    assert result['error'].startswith("connection failed")
+
+
+def test_timeouts_are_reported():
+    server, url = start_stub_server(latency_ms=500)
+    try:
+        result, = execute_suite(CASES[:1], url, retries=0, timeout=0.05)
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert result['error'] == "request timed out"
+
+
+def test_unsupported_scheme():
+    with pytest.raises(ValueError):
+        execute_suite(CASES[:1], "ftp://example.com/score")
+
+
+def test_cases_stream_through_a_bounded_queue():
+    handled = []
+
+    class CountingHandler(StubHandler):
+        def do_POST(self):
+            super().do_POST()
+            handled.append(1)
+
+    server = StubServer(('127.0.0.1', 0), CountingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    lead = []
+
+    def cases():
+        for case in CASES * 5:
+            lead.append(len(lead) - len(handled))
+            yield case
+
+    progress = []
+    try:
+        results = execute_suite(cases(), f"http://127.0.0.1:{server.server_address[1]}/score",
+                                concurrency=2, on_progress=lambda done, total: progress.append((done, total)))
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert len(results) == len(CASES) * 5
+    # Two in flight, four queued and one waiting to be queued, with some slack
+    assert max(lead) <= 10
+    # Throttled reports, always ending with the final count
+    assert len(progress) < len(results)
+    assert progress[-1] == (len(results), len(results))
+
+
+def _scripted_server(response: bytes):
+    """Answer every request on every connection with the same raw bytes"""
+    listener = socket.socket()
+    listener.bind(('127.0.0.1', 0))
+    listener.listen(8)
+
+    def handle(connection):
+        with connection:
+            buffered = b''
+            while True:
+                while b'\r\n\r\n' not in buffered:
+                    data = connection.recv(65536)
+                    if not data:
+                        return
+                    buffered += data
+                head, _, buffered = buffered.partition(b'\r\n\r\n')
+                length = int(next(line.split(b':')[1] for line in head.split(b'\r\n')
+                                  if line.lower().startswith(b'content-length')))
+                while len(buffered) < length:
+                    buffered += connection.recv(65536)
+                buffered = buffered[length:]
+                connection.sendall(response)
+                if b'Connection: close' in response:
+                    return
+
+    def serve():
+        while True:
+            try:
+                connection, _ = listener.accept()
+            except OSError:
+                return
+            threading.Thread(target=handle, args=(connection,), daemon=True).start()
+
+    threading.Thread(target=serve, daemon=True).start()
+    return listener, f"http://127.0.0.1:{listener.getsockname()[1]}/score"
+
+
+@pytest.mark.parametrize("response, status, body", [
+    (b"HTTP/1.1 204 No Content\r\nConnection: keep-alive\r\n\r\n", 204, ''),
+    (b"HTTP/1.1 304 Not Modified\r\n\r\n", 304, ''),
+    (b"HTTP/1.1 100 Continue\r\n\r\nHTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\n{}", 200, '{}'),
+    (b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n"
+     b"3\r\n[1,\r\n2\r\n2]\r\n0\r\nX-Checksum: abc\r\nX-Other: 1\r\n\r\n", 200, '[1,2]'),
+    (b"HTTP/1.1 200 OK\r\nConnection: close\r\n\r\n{\"ok\": true}", 200, '{"ok": true}'),
+])
+def test_response_framing(response, status, body):
+    listener, url = _scripted_server(response)
+    try:
+        results = execute_suite(CASES[:3], url, concurrency=1, timeout=2)
+    finally:
+        listener.close()
+    assert [(result['status'], result['response'], result['error']) for result in results] == [(status, body, None)] * 3
+
+
+def test_percentiles():
+    values = sorted(float(v) for v in range(1, 101))
+    assert percentile(values, 0.5) == 50.0
+    assert percentile(values, 0.99) == 99.0
+    assert percentile([], 0.5) == 0.0
@@ -0,0 +1,111 @@
+"""Tests for streaming suite export"""
+import base64
+import copy
+import functools
+import gzip
+import json
+import re
+
+import pytest
+
+from jsonviewer import export
+from jsonviewer.export import (create_download_link, deferred_download, dumps_suite, iter_encoded,
+                               iter_export_bytes, write_encoded)
+from jsonviewer.templates import DEFAULT_TEST_CASE
+
+SUITES = [
+    [],
+    [{}],
+    [[]],
+    [{"a": {}, "b": [], "c": [{}], "d": [[1, 2], []]}],
+    [{"name": "café ☕ \U0001F600", "quote": "\"\\\n\t"}, "text", 1, -2.5, 1e300, True, None],
+    [copy.deepcopy(DEFAULT_TEST_CASE) for _ in range(3)],
+    [{"n": i, "nested": {"list": list(range(i))}} for i in range(50)],
+]
+
+
+def _expected(suite, fmt):
+    """Text the whole-suite json.dumps call produced before export was streamed"""
+    if fmt == 'json':
+        return json.dumps(suite, indent=2)
+    if fmt == 'compact':
+        return json.dumps(suite, separators=(',', ':'))
+    return "".join(json.dumps(case, separators=(',', ':')) + "\n" for case in suite)
+
+
+def _legacy_download_link(data, filename):
+    """The original create_download_link from new_code.py"""
+    json_str = json.dumps(data, indent=2)
+    b64 = base64.b64encode(json_str.encode()).decode()
+    return f'<a href="data:application/json;base64,{b64}" download="{filename}">Download {filename}</a>'
+
+
+@pytest.mark.parametrize("fmt", ['json', 'compact', 'ndjson'])
+@pytest.mark.parametrize("suite", SUITES)
+def test_iter_encoded_matches_json_dumps(suite, fmt):
+    assert "".join(iter_encoded(suite, fmt)) == _expected(suite, fmt)
+    # Generators are consumed once, a case at a time
+    assert "".join(iter_encoded(iter(suite), fmt)) == _expected(suite, fmt)
+
+
+@pytest.mark.parametrize("suite", SUITES)
+def test_dumps_suite(suite):
+    assert dumps_suite(suite) == _expected(suite, 'json')
+    assert dumps_suite(suite, compact=True) == _expected(suite, 'compact')
+
+
+@pytest.mark.parametrize("chunk_size", [1, 100, 1 << 20])
+@pytest.mark.parametrize("fmt", ['json', 'ndjson'])
+def test_export_bytes(fmt, chunk_size):
+    suite = SUITES[-1]
+    expected = _expected(suite, fmt).encode('utf-8')
+    assert b"".join(iter_export_bytes(suite, fmt, chunk_size=chunk_size)) == expected
+    compressed = b"".join(iter_export_bytes(suite, fmt, compress=True, chunk_size=chunk_size))
+    assert gzip.decompress(compressed) == expected
+
+
+def test_write_encoded_spills_to_disk(monkeypatch):
+    monkeypatch.setattr(export, "SPOOL_SIZE", 1024)
+    suite = SUITES[-1]
+    with write_encoded(suite, 'json') as out:
+        assert out._rolled
+        assert out.read() == _expected(suite, 'json').encode('utf-8')
+
+
+def test_deferred_download_encodes_the_suite_at_click_time():
+    suite = [{"a": 1}]
+    calls = []
+
+    def source():
+        calls.append(1)
+        return suite
+
+    download = deferred_download(source, 'ndjson')
+    assert calls == []
+    suite.append({"b": 2})
+    assert download() == b'{"a":1}\n{"b":2}\n'
+    assert gzip.decompress(deferred_download(source, 'json', compress=True)()) == \
+        _expected(suite, 'json').encode('utf-8')
+    assert len(calls) == 2
+
+
+@pytest.mark.parametrize("suite", SUITES)
+def test_create_download_link_matches_original(suite, monkeypatch):
+    assert create_download_link(suite, "cases.json") == _legacy_download_link(suite, "cases.json")
+    # Chunks whose length is not a multiple of 3 carry bytes over to the next one
+    monkeypatch.setattr(export, "iter_export_bytes", functools.partial(iter_export_bytes, chunk_size=5))
+    assert create_download_link(iter(suite), "cases.json") == _legacy_download_link(suite, "cases.json")
+
+
+@pytest.mark.parametrize("fmt", ['compact', 'ndjson'])
+def test_create_download_link_formats(fmt):
+    suite = SUITES[4]
+    link = create_download_link(suite, "cases.out", fmt)
+    mime, payload = re.match(r'<a href="data:([^;]+);base64,([^"]*)"', link).groups()
+    assert mime == export.MIME_TYPES[fmt]
+    assert base64.b64decode(payload).decode('utf-8') == _expected(suite, fmt)
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError):
+        list(iter_encoded([], 'xml'))
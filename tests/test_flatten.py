@@ -0,0 +1,91 @@
+"""Tests for the iterative flatten/unflatten engine"""
+import copy
+
+import pytest
+
+from benchmarks.bench_flatten import legacy_flatten_dict
+from jsonviewer.flatten import MISSING, flatten_batch, flatten_dict, unflatten_batch, unflatten_dict
+from jsonviewer.templates import DEFAULT_TEST_CASE, get_default_json_structure
+
+CASES = [
+    {},
+    copy.deepcopy(DEFAULT_TEST_CASE),
+    get_default_json_structure(),
+    {"a": {"b": {"c": 1, "d": None}}, "e": "x"},
+    {"lists": {"flat": [1, 2.5, None], "nested": [[1, [2, []]], []], "objects": [{"a": {"b": 1}}, {}]}},
+    {"empty": {}, "deep": {"empty": {}, "value": 0}},
+    {"types": {"bool": False, "int": 0, "float": 0.0, "str": "", "null": None}},
+    # Dotted keys inside lists are list contents and never split
+    {"rows": [{"a.b": 1, "c": {"d.e": [2]}}]},
+]
+
+
+@pytest.mark.parametrize("case", CASES)
+def test_round_trip(case):
+    snapshot = copy.deepcopy(case)
+    flat = flatten_dict(case)
+    assert all(not isinstance(v, dict) or v == {} for v in flat.values())
+    rebuilt = unflatten_dict(flat)
+    assert rebuilt == case
+    assert repr(rebuilt) == repr(case)
+    assert case == snapshot
+
+
+@pytest.mark.parametrize("case", CASES)
+def test_keys_match_legacy_flatten(case):
+    # The original stringified lists and dropped empty dicts; keys are otherwise the same
+    legacy = legacy_flatten_dict(case)
+    flat = flatten_dict(case)
+    assert [k for k, v in flat.items() if v != {}] == list(legacy)
+    for key, value in legacy.items():
+        assert flat[key] == value or str(flat[key]) == value
+
+
+def test_dotted_keys_round_trip_with_another_separator():
+    case = {"mhm": {"a.b": 1, "c": {"d.e.f": [1, {"g.h": 2}]}}, "x.y": {"z": None}}
+    flat = flatten_dict(case, sep='/')
+    assert list(flat) == ["mhm/a.b", "mhm/c/d.e.f", "x.y/z"]
+    assert unflatten_dict(flat, sep='/') == case
+
+
+def test_dotted_keys_are_split_by_the_default_separator():
+    # "." cannot tell a dotted key from a nested one, so the key becomes a path
+    case = {"mhm": {"a.b": 1, "c": 2}}
+    assert flatten_dict(case) == {"mhm.a.b": 1, "mhm.c": 2}
+    assert unflatten_dict(flatten_dict(case)) == {"mhm": {"a": {"b": 1}, "c": 2}}
+
+
+@pytest.mark.parametrize("flat", [
+    {"a": 1, "a.b": 2},
+    {"a.b": 2, "a": 1},
+    {"a.b.c": 1, "a.b": [1]},
+])
+def test_unflatten_rejects_a_value_that_is_also_a_parent(flat):
+    with pytest.raises(ValueError, match="both a value and a parent"):
+        unflatten_dict(flat)
+
+
+def test_empty_dict_leaf_next_to_fields():
+    assert unflatten_dict({"a.b": 1, "a": {}}) == {"a": {"b": 1}}
+
+
+def test_deep_nesting_does_not_recurse():
+    case = node = {}
+    for _ in range(5000):
+        node["child"] = {}
+        node = node["child"]
+    node["leaf"] = [1]
+    flat = flatten_dict(case)
+    assert list(flat) == [".".join(["child"] * 5000 + ["leaf"])]
+    # Comparing the dicts directly would recurse, so compare them flattened
+    assert flatten_dict(unflatten_dict(flat)) == flat
+
+
+def test_batch_round_trip():
+    cases = CASES[1:] + [{"only": {"here": 1}}]
+    schema, columns = flatten_batch(cases)
+    assert len(schema) == len(set(schema))
+    assert all(len(columns[key]) == len(cases) for key in schema)
+    assert columns["only.here"][:-1] == [MISSING] * (len(cases) - 1)
+    assert unflatten_batch(schema, columns) == cases
+    assert unflatten_batch(*flatten_batch([])) == []
@@ -0,0 +1,106 @@
+"""Batch generation of test cases from templates"""
+import copy
+
+import pytest
+
+from jsonviewer.generator import (clone_case, expand_values, generate_copies, generate_grid, generate_random,
+                                  make_cloner, set_field)
+from jsonviewer.templates import DEFAULT_TEST_CASE, get_default_json_structure
+
+TEMPLATES = [
+    DEFAULT_TEST_CASE,
+    get_default_json_structure(),
+    {},
+    [],
+    {"flat": 1, "s": "x", "n": None},
+    {"a": {"b": {"c": [1, 2]}, "d": []}, "e": [[1], {"f": [{}]}], "g": [1.5, None, "x"]},
+    [{"a": 1}, [2, [3]]],
+    "scalar",
+    3.5,
+]
+
+
+def _containers(value):
+    """Every dict and list inside a value, the value included"""
+    stack = [value]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            yield node
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            yield node
+            stack.extend(node)
+
+
+@pytest.mark.parametrize("clone", [clone_case, make_cloner], ids=["clone_case", "make_cloner"])
+@pytest.mark.parametrize("template", TEMPLATES)
+def test_clones_match_deepcopy(clone, template):
+    if clone is make_cloner:
+        clone = make_cloner(template)
+    copied = clone(template)
+    expected = copy.deepcopy(template)
+    assert copied == expected
+    assert repr(copied) == repr(expected)
+    # No container is shared with the template
+    originals = {id(node) for node in _containers(template)}
+    assert not originals & {id(node) for node in _containers(copied)}
+
+
+def test_cloner_copies_other_values_of_the_template_shape():
+    clone = make_cloner(DEFAULT_TEST_CASE)
+    case = next(generate_random(DEFAULT_TEST_CASE, 1, seed=3))
+    copied = clone(case)
+    assert copied == copy.deepcopy(case)
+    originals = {id(node) for node in _containers(case)}
+    assert not originals & {id(node) for node in _containers(copied)}
+
+
+def test_set_field_creates_sections_and_wraps_list_fields():
+    case = {"slp": {"bed": [8.5]}}
+    set_field(case, "slp.bed", 7.0)
+    set_field(case, "new.section.field", 1)
+    assert case == {"slp": {"bed": [7.0]}, "new": {"section": {"field": 1}}}
+
+
+@pytest.mark.parametrize("path", ["clip.x", "mhm.age.years", "slp.bed.0"])
+def test_set_field_through_a_non_object_raises(path):
+    with pytest.raises(ValueError, match="passes through a non-object field"):
+        set_field(copy.deepcopy(DEFAULT_TEST_CASE), path, 1)
+
+
+def test_generate_grid_through_a_non_object_raises():
+    with pytest.raises(ValueError, match="clip.x"):
+        list(generate_grid({"clip": False}, {"clip.x": [1, 2]}))
+
+
+def test_expand_values():
+    assert expand_values([1, 2]) == [1, 2]
+    assert expand_values({"start": 0.1, "stop": 0.3, "step": 0.1}) == [0.1, 0.2, 0.3]
+    assert expand_values({"start": 1, "stop": 5, "step": 2}) == [1, 3, 5]
+    assert expand_values(7) == [7]
+    with pytest.raises(ValueError):
+        expand_values({"start": 0, "stop": 1, "step": 0})
+
+
+def test_generate_grid_combinations():
+    cases = list(generate_grid(DEFAULT_TEST_CASE, {"mhm.age": [30, 40], "smk.now": [0, 1], "slp.bed": 6}))
+    assert [(c["mhm"]["age"], c["smk"]["now"]) for c in cases] == [(30, 0), (30, 1), (40, 0), (40, 1)]
+    assert all(c["slp"]["bed"] == [6] for c in cases)
+    assert DEFAULT_TEST_CASE["mhm"]["age"] == 25
+
+
+def test_generated_cases_are_independent():
+    copies = list(generate_copies(DEFAULT_TEST_CASE, 2))
+    copies[0]["slp"]["bed"].append(1)
+    copies[0]["mhm"]["age"] = 1
+    assert copies[1] == DEFAULT_TEST_CASE
+
+
+def test_generate_random_is_reproducible():
+    first = list(generate_random(DEFAULT_TEST_CASE, 20, seed=3))
+    assert first == list(generate_random(DEFAULT_TEST_CASE, 20, seed=3))
+    assert first != list(generate_random(DEFAULT_TEST_CASE, 20, seed=4))
+    assert all(18 <= case["mhm"]["age"] <= 90 for case in first)
+    only_smk = list(generate_random(DEFAULT_TEST_CASE, 3, seed=3, sections=["smk"]))
+    assert all(case == DEFAULT_TEST_CASE for case in only_smk)
@@ -0,0 +1,96 @@
+"""Golden-response recording and tolerance matching"""
+import json
+
+import pytest
+
+from jsonviewer import golden as golden_module
+from jsonviewer.flatten import MISSING
+from jsonviewer.golden import (DRIFT, ERROR, MATCH, NEW, Comparator, Drift, Tolerance, compare_run,
+                               golden_records, load_golden, parse_tolerances, record_golden)
+
+
+def _result(response, status=200, error=None):
+    return {'status': status, 'error': error, 'response': json.dumps(response)}
+
+
+def test_parse_tolerances():
+    assert parse_tolerances("score=0.01, sections.*=1%\n\n total = 2e-3") == [
+        Tolerance("score", absolute=0.01),
+        Tolerance("sections.*", relative=0.01),
+        Tolerance("total", absolute=0.002),
+    ]
+    for text in ("score", "score=abc", "score=1..2"):
+        with pytest.raises(ValueError):
+            parse_tolerances(text)
+
+
+@pytest.mark.parametrize("path, want, got, drifted", [
+    ("score", 1.0, 1.009, False),
+    ("score", 1.0, 0.991, False),
+    ("score", 1.0, 1.02, True),
+    # sections.* is 1%, so 1.0 either way of 100
+    ("sections.mhm", 100.0, 100.9, False),
+    ("sections.mhm", 100.0, 101.5, True),
+    # Untoleranced fields must match exactly
+    ("total", 5, 5.0001, True),
+])
+def test_comparator_tolerances(path, want, got, drifted):
+    comparator = Comparator(parse_tolerances("score=0.01, sections.*=1%"))
+    drifts = comparator.compare(0, _nested(path, want), _nested(path, got))
+    assert drifts == ([Drift(0, path, want, got)] if drifted else [])
+
+
+def _nested(path, value):
+    for part in reversed(path.split('.')):
+        value = {part: value}
+    return value
+
+
+def test_comparator_first_pattern_wins_and_exact_otherwise():
+    comparator = Comparator(parse_tolerances("sections.mhm=0, sections.*=10%"))
+    drifts = comparator.compare(3, {"sections": {"mhm": 10, "smk": 10}, "label": "ok"},
+                                {"sections": {"mhm": 10.5, "smk": 10.5}, "label": "ok"})
+    assert drifts == [Drift(3, "sections.mhm", 10, 10.5)]
+
+
+def test_comparator_types_missing_and_extra_fields():
+    comparator = Comparator()
+    drifts = comparator.compare(0, {"a": 1, "b": True, "c": 1}, {"a": True, "b": True, "d": 2})
+    assert drifts == [Drift(0, "a", 1, True), Drift(0, "c", 1, MISSING), Drift(0, "d", MISSING, 2)]
+    # One-element list responses compare as their single element
+    assert comparator.compare(0, [{"score": 1}], {"score": 1}) == []
+
+
+def test_record_and_compare_run():
+    cases = [{"mhm": {"age": 30}}, {"mhm": {"age": 40}}, {"mhm": {"age": 50}}]
+    golden = record_golden(cases, [_result({"score": 1.0}), _result({"score": 2.0}),
+                                   _result(None, status=500)])
+    assert len(golden) == 2
+    assert load_golden(golden_records(golden)) == golden
+
+    # Reordered, with a null field added: still keyed to the same golden responses
+    rerun = [{"mhm": {"age": 40, "sbp": None}}, {"mhm": {"age": 30}}, {"mhm": {"age": 50}}, {"mhm": {"age": 60}}]
+    results = [_result({"score": 2.005}), _result({"score": 1.5}), _result({"score": 3.0}),
+               _result(None, error="timeout")]
+    report = compare_run(rerun, results, golden, parse_tolerances("score=0.01"))
+    assert report.counts == {MATCH: 1, DRIFT: 1, NEW: 1, ERROR: 1}
+    assert report.drifted_cases == [1]
+    assert report.top_fields() == [("score", 1)]
+    assert not report.passed
+
+
+def test_compare_run_in_parallel_matches_inline(monkeypatch):
+    cases = [{"mhm": {"age": age}} for age in range(40)]
+    golden = record_golden(cases, [_result({"score": age}) for age in range(40)])
+    results = [_result({"score": age + (age % 3 == 0)}) for age in range(40)]
+    inline = compare_run(cases, results, golden, workers=1)
+    monkeypatch.setattr(golden_module, "PARALLEL_THRESHOLD", 0)
+    parallel = compare_run(cases, results, golden, workers=2, chunk_size=7)
+    assert parallel.counts == inline.counts
+    assert parallel.drifts == inline.drifts
+    assert parallel.drifted_cases == inline.drifted_cases
+
+
+def test_load_golden_rejects_bad_records():
+    with pytest.raises(ValueError):
+        load_golden([{"key": "abc"}])
@@ -0,0 +1,122 @@
+"""Tests for the columnar grid view and its bulk edits"""
+import copy
+
+import pandas as pd
+import pytest
+
+from jsonviewer.flatten import flatten_dict
+from jsonviewer.grid import _keep_number_type, bulk_update, select_rows, suite_to_frame, write_back
+
+CASES = [
+    {"mhm": {"age": 40, "sbp": 120.5, "DM2": True, "tags": ["a"]}, "smk": {"now": 1}},
+    {"mhm": {"age": 70, "sbp": 150, "DM2": False, "tags": []}, "smk": {"now": 0}},
+    {"mhm": {"age": None, "sbp": 99.0, "DM2": None}, "smk": {}},
+    {"mhm": {"age": 55, "tags": ["b", "c"]}},
+    {"other": "no mhm"},
+]
+
+
+def _reference(cases, column, operation, value, rows):
+    """Apply a bulk operation one case at a time, as a reference for the grid"""
+    section, field = column.split('.')
+    result = copy.deepcopy(cases)
+    for row in rows:
+        current = result[row].get(section, {}).get(field)
+        if value is None and current is None:
+            # The grid holds missing fields and nulls alike as NA
+            continue
+        if operation == 'set' or (operation == 'fill' and current is None):
+            result[row].setdefault(section, {})[field] = value
+        elif operation == 'scale' and current is not None:
+            result[row][section][field] = current * value
+    return result
+
+
+def _bulk_edit(cases, column, operation, value, predicate=""):
+    cases = list(cases)
+    frame = suite_to_frame(cases)
+    mask = select_rows(frame, predicate)
+    changes = bulk_update(frame, column, operation, value, mask)
+    write_back(cases, column, changes)
+    return cases, changes
+
+
+@pytest.mark.parametrize("column, operation, value, predicate", [
+    ("mhm.age", 'set', 30, ""),
+    ("mhm.age", 'set', 30, "`mhm.age` > 50"),
+    ("mhm.age", 'scale', 2, ""),
+    ("mhm.age", 'scale', 1.5, "`mhm.age` < 60"),
+    ("mhm.age", 'fill', 18, ""),
+    ("mhm.sbp", 'scale', 0.5, ""),
+    ("mhm.sbp", 'fill', 100, ""),
+    ("mhm.DM2", 'set', False, ""),
+    ("mhm.DM2", 'fill', True, ""),
+    ("mhm.tags", 'set', ["x", "y"], ""),
+    ("mhm.tags", 'fill', [], ""),
+    ("smk.now", 'set', 1, ""),
+    ("smk.new", 'set', "added", ""),
+    ("smk.now", 'set', None, ""),
+])
+def test_bulk_edit_matches_case_by_case_edit(column, operation, value, predicate):
+    original = copy.deepcopy(CASES)
+    rows = [row for row, keep in select_rows(suite_to_frame(CASES), predicate).items() if keep]
+    expected = _reference(CASES, column, operation, value, rows)
+
+    edited, changes = _bulk_edit(CASES, column, operation, value, predicate)
+    assert edited == expected
+    assert CASES == original
+    # Only changed cells are written back; the other cases keep their objects
+    changed_rows = {row for row in range(len(CASES)) if expected[row] != CASES[row]}
+    assert set(changes.index) == changed_rows
+    assert all(edited[row] is CASES[row] for row in range(len(CASES)) if row not in changed_rows)
+
+
+def test_bulk_edit_keeps_int_and_float_cells():
+    edited, _ = _bulk_edit(CASES, "mhm.sbp", 'scale', 2)
+    # The column mixes 120.5, 150 and 99.0, so it is Float64 in the frame
+    assert [type(case["mhm"].get("sbp")) for case in edited[:3]] == [float, int, float]
+    assert edited[1]["mhm"]["sbp"] == 300
+
+    edited, _ = _bulk_edit(CASES, "mhm.age", 'scale', 0.5)
+    assert [case["mhm"]["age"] for case in edited[:2]] == [20, 35]
+    assert all(type(case["mhm"]["age"]) is int for case in edited[:2])
+
+
+@pytest.mark.parametrize("original, value, expected", [
+    (3, 6.0, 6),
+    (3, 6.5, 6.5),
+    (3.0, 6, 6.0),
+    (True, 1, 1),
+    (1, True, True),
+    (None, 2.0, 2.0),
+    ("text", 2.0, 2.0),
+])
+def test_keep_number_type(original, value, expected):
+    result = _keep_number_type(original, value)
+    assert result == expected
+    assert type(result) is type(expected)
+
+
+def test_frame_matches_flattened_cases():
+    frame = suite_to_frame(CASES)
+    assert str(frame["mhm.age"].dtype) == "Int64"
+    assert str(frame["mhm.sbp"].dtype) == "Float64"
+    assert str(frame["mhm.DM2"].dtype) == "boolean"
+    for row, case in enumerate(CASES):
+        flat = flatten_dict(case)
+        for column in frame.columns:
+            cell = frame.at[row, column]
+            if column in flat and flat[column] is not None:
+                assert cell == flat[column]
+            else:
+                assert cell is None or pd.isna(cell)
+
+
+def test_bulk_update_rejects_bad_operations():
+    frame = suite_to_frame(CASES)
+    with pytest.raises(ValueError):
+        bulk_update(frame, "mhm.age", 'divide', 2)
+    with pytest.raises(ValueError):
+        bulk_update(frame, "mhm.tags", 'scale', 2)
+    with pytest.raises(ValueError):
+        bulk_update(frame, "mhm.age", 'scale', "2")
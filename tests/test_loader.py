@@ -0,0 +1,108 @@
+"""Streaming ingest of JSON arrays, single objects and NDJSON"""
+import io
+import json
+
+import pytest
+
+from jsonviewer.generator import generate_random
+from jsonviewer.loader import SpilledCases, iter_cases, load_cases
+from jsonviewer.templates import DEFAULT_TEST_CASE
+
+CASES = [
+    {"name": "café ☕ 数据 🙂", "values": [1, -2.5, 1e-7, 12345678901234567890123]},
+    {"nested": {"a": [True, False, None], "b": "x" * 300}},
+    [1, 2, 3],
+    "a string case",
+    12345.6789,
+]
+
+
+def _stream(text):
+    return io.BytesIO(text.encode('utf-8'))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 7, 64, 1 << 16])
+def test_array_across_chunk_boundaries(chunk_size):
+    # Tiny chunks split numbers and multi-byte characters at every offset
+    text = json.dumps(CASES, ensure_ascii=False, indent=2)
+    assert list(iter_cases(_stream(text), chunk_size=chunk_size)) == CASES
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 1 << 16])
+def test_ndjson_across_chunk_boundaries(chunk_size):
+    text = "\n".join(json.dumps(case, ensure_ascii=False) for case in CASES) + "\n"
+    assert list(iter_cases(_stream(text), chunk_size=chunk_size)) == CASES
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('', []),
+    ('  \n', []),
+    ('[]', []),
+    (' [ ] \n', []),
+    ('{"a": 1}', [{"a": 1}]),
+    ('42', [42]),
+    ('{"a": 1}\n\n{"a": 2}', [{"a": 1}, {"a": 2}]),
+    ('﻿[{"a": 1}]', [{"a": 1}]),
+])
+def test_input_shapes(text, expected):
+    for chunk_size in (1, 1 << 16):
+        assert list(iter_cases(_stream(text), chunk_size=chunk_size)) == expected
+
+
+def test_number_ending_a_chunk_is_not_truncated():
+    text = '[1234567, 89]'
+    for chunk_size in range(1, len(text) + 1):
+        assert list(iter_cases(_stream(text), chunk_size=chunk_size)) == [1234567, 89]
+    assert list(iter_cases(_stream('1234567'), chunk_size=3)) == [1234567]
+
+
+@pytest.mark.parametrize("text", [
+    '[1, 2] garbage',
+    '[1]\n[2]',
+    '[]x',
+    '[1, 2',
+    '[1 2]',
+    '[1, ]',
+    '{"a": 1} {"a": ',
+])
+def test_malformed_input_raises(text):
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_cases(_stream(text), chunk_size=4))
+
+
+def test_read_ahead_is_capped():
+    with pytest.raises(json.JSONDecodeError, match="larger than 1000"):
+        list(iter_cases(_stream('[{"a": "' + 'x' * 100000), chunk_size=64, max_case_size=1000))
+
+
+def test_load_cases_stays_in_memory_within_budget():
+    cases = load_cases(_stream(json.dumps(CASES)))
+    assert isinstance(cases, list)
+    assert cases == CASES
+
+
+def test_load_cases_spills_over_a_small_budget():
+    suite = list(generate_random(DEFAULT_TEST_CASE, 300, seed=5))
+    progress = []
+    cases = load_cases(_stream(json.dumps(suite)), memory_budget_mb=0.5, chunk_size=4096,
+                       on_progress=lambda read, count: progress.append((read, count)))
+    assert isinstance(cases, SpilledCases)
+    assert len(cases) == len(suite)
+    assert list(cases) == suite
+    assert cases[-1] == suite[-1]
+    assert progress[-1][1] == len(suite)
+    cases.close()
+
+
+def test_spilled_cases_behave_like_a_list():
+    cases = SpilledCases(CASES[:2])
+    expected = list(CASES[:2])
+    for target in (cases, expected):
+        target.append(CASES[2])
+        target.insert(0, CASES[3])
+        target[1] = CASES[4]
+        del target[2]
+    assert list(cases) == expected
+    assert cases[0:2] == expected[0:2]
+    assert json.loads(cases.raw(0)) == expected[0]
+    cases.close()
@@ -0,0 +1,105 @@
+"""JSON patch diffing, copy-on-write application and undo/redo"""
+import copy
+
+import pytest
+
+from jsonviewer.patch import EditHistory, PatchError, apply_patch, make_patch, parse_pointer, pointer
+from jsonviewer.templates import DEFAULT_TEST_CASE
+
+EDITS = [
+    # (old, new)
+    ({"a": 1}, {"a": 2}),
+    ({"a": 1, "b": 2}, {"b": 2, "c": 3}),
+    ({"a": {"b": {"c": 1}}}, {"a": {"b": {"c": 1, "d": [1, 2]}}}),
+    ({"l": [1, 2, 3]}, {"l": [1, 2, 3, 4, 5]}),
+    ({"l": [1, 2, 3, 4]}, {"l": [1, 2]}),
+    ({"l": [1, 2, 3]}, {"l": [3, 2]}),
+    ({"l": [{"x": 1}, {"x": 2}]}, {"l": [{"x": 1}, {"x": 3}]}),
+    ({"flag": 1}, {"flag": True}),
+    ({"v": 1}, {"v": 1.0}),
+    ({"a/b": 1, "~": 2}, {"a/b": 3, "~": 4}),
+    ({"a": None}, {"a": {"b": None}}),
+    ([1, 2], {"now": "a dict"}),
+]
+
+
+@pytest.mark.parametrize("old, new", EDITS)
+def test_patch_round_trip(old, new):
+    snapshot = copy.deepcopy(old)
+    forward = make_patch(old, new)
+    backward = make_patch(new, old)
+    applied = apply_patch(old, forward)
+    assert applied == new
+    assert [type(v) for v in _leaves(applied)] == [type(v) for v in _leaves(new)]
+    assert apply_patch(applied, backward) == old
+    # The original document is never mutated
+    assert old == snapshot
+
+
+def _leaves(value):
+    if isinstance(value, dict):
+        return [leaf for v in value.values() for leaf in _leaves(v)]
+    if isinstance(value, list):
+        return [leaf for v in value for leaf in _leaves(v)]
+    return [value]
+
+
+def test_unchanged_case_gives_empty_patch():
+    assert make_patch(DEFAULT_TEST_CASE, copy.deepcopy(DEFAULT_TEST_CASE)) == []
+
+
+def test_apply_copies_only_changed_paths():
+    old = copy.deepcopy(DEFAULT_TEST_CASE)
+    new = apply_patch(old, [{'op': 'replace', 'path': '/mhm/age', 'value': 40}])
+    assert new['mhm']['age'] == 40 and old['mhm']['age'] == 25
+    assert new['mhm'] is not old['mhm']
+    assert new['smk'] is old['smk']
+
+
+def test_pointer_escaping_round_trip():
+    tokens = ['a/b', '~c', 'plain', '0']
+    assert parse_pointer(pointer(tokens)) == tokens
+
+
+@pytest.mark.parametrize("patch", [
+    [{'op': 'replace', 'path': '/missing', 'value': 1}],
+    [{'op': 'remove', 'path': ''}],
+    [{'op': 'move', 'path': '/a'}],
+    [{'op': 'replace', 'path': '/l/9', 'value': 1}],
+    [{'op': 'add', 'path': 'no-slash', 'value': 1}],
+])
+def test_invalid_patches_raise(patch):
+    with pytest.raises(PatchError):
+        apply_patch({"a": 1, "l": [1]}, patch)
+
+
+def test_history_undo_redo():
+    history = EditHistory()
+    v1 = copy.deepcopy(DEFAULT_TEST_CASE)
+    v2 = apply_patch(v1, [{'op': 'replace', 'path': '/mhm/age', 'value': 40}])
+    v3 = apply_patch(v2, [{'op': 'add', 'path': '/slp/bed/-', 'value': 7.5}])
+    history.record(0, v1, v2)
+    history.record(0, v2, v3)
+
+    doc, _ = history.undo(0, v3)
+    assert doc == v2
+    doc, _ = history.undo(0, doc)
+    assert doc == v1
+    assert not history.can_undo(0)
+    doc, _ = history.redo(0, doc)
+    assert doc == v2
+
+    # A new edit drops the redo stack
+    history.record(0, doc, v1)
+    assert not history.can_redo(0)
+
+
+def test_history_depth_and_unchanged_edits():
+    history = EditHistory(max_depth=2)
+    assert history.record(0, {"a": 1}, {"a": 1}) == []
+    assert not history.can_undo(0)
+    for value in range(5):
+        history.record(0, {"a": value}, {"a": value + 1})
+    history.undo(0, {"a": 5})
+    history.undo(0, {"a": 4})
+    assert not history.can_undo(0)
@@ -0,0 +1,104 @@
+"""Query parsing, compile_query and the incremental SuiteIndex agree"""
+import pytest
+
+from jsonviewer.compact import CompactSuite
+from jsonviewer.query import Predicate, SuiteIndex, compile_query, delete_cases, parse_query
+
+CASES = [
+    {"mhm": {"age": 25, "sbp": 118, "tag": "a"}, "smk": {"now": 0}},
+    {"mhm": {"age": 61, "sbp": 150, "tag": "b"}, "smk": {"now": 1}},
+    {"mhm": {"age": 40, "sbp": None}, "smk": {"now": 1}},
+    {"mhm": {"age": 40.0, "sbp": 141}},
+    {"mhm": {"age": True, "sbp": "high"}},
+    {"mhm": {"age": 2 ** 60 + 1}},
+    {},
+]
+
+QUERIES = [
+    "mhm.age = 40",
+    "mhm.age == 40",
+    "mhm.age > 30 and smk.now = 1",
+    "mhm.sbp >= 141",
+    "mhm.sbp != 150",
+    "mhm.sbp = null",
+    "mhm.sbp != null",
+    "mhm.tag = a",
+    'mhm.tag = "b"',
+    "mhm.tag exists",
+    "smk.now missing",
+    "mhm.age < 1",
+    "mhm.age = 1152921504606846977",
+    "mhm.age > 1152921504606846976",
+]
+
+
+def test_parse_query():
+    assert parse_query("mhm.sbp > 140 and smk.now == 1 AND slp.bed exists") == [
+        Predicate("mhm.sbp", ">", 140),
+        Predicate("smk.now", "=", 1),
+        Predicate("slp.bed", "exists"),
+    ]
+    assert parse_query("mhm.tag = bare words") == [Predicate("mhm.tag", "=", "bare words")]
+    with pytest.raises(ValueError):
+        parse_query("mhm.age ~ 3")
+
+
+def test_parse_query_keeps_and_inside_quotes():
+    assert parse_query('mhm.tag == "a and b" and smk.now = 1') == [
+        Predicate("mhm.tag", "=", "a and b"),
+        Predicate("smk.now", "=", 1),
+    ]
+    assert parse_query('mhm.tag = "say \\" and \\" twice" AND mhm.list = ["x and y"]') == [
+        Predicate("mhm.tag", "=", 'say " and " twice'),
+        Predicate("mhm.list", "=", ["x and y"]),
+    ]
+
+
+def test_compile_query_rejects_bad_predicates():
+    with pytest.raises(ValueError):
+        compile_query([Predicate("mhm.age", "~", 1)])
+    with pytest.raises(ValueError):
+        compile_query([Predicate("mhm.age", ">", None)])
+
+
+def test_compile_query_matches():
+    matches = compile_query(parse_query("mhm.age > 30 and smk.now = 1"))
+    assert [i for i, case in enumerate(CASES) if matches(case)] == [1, 2]
+    # Numbers compare by value across int and float; bools never match numbers
+    matches = compile_query(parse_query("mhm.age = 40"))
+    assert [i for i, case in enumerate(CASES) if matches(case)] == [2, 3]
+
+
+@pytest.mark.parametrize("query", QUERIES)
+@pytest.mark.parametrize("storage", [list, CompactSuite])
+def test_index_agrees_with_compile_query(query, storage):
+    predicates = parse_query(query)
+    matches = compile_query(predicates)
+    cases = storage(CASES)
+    expected = [i for i, case in enumerate(CASES) if matches(case)]
+    assert SuiteIndex().query(cases, predicates) == expected
+
+
+def test_index_follows_edits():
+    cases = list(CASES)
+    index = SuiteIndex()
+    predicates = parse_query("mhm.age = 40")
+    matches = compile_query(predicates)
+    assert index.query(cases, predicates) == [2, 3]
+
+    cases[0] = {"mhm": {"age": 40}}
+    index.set(0, cases[0])
+    cases.insert(1, {"mhm": {"age": 40}})
+    index.insert(1, cases[1])
+    removed = delete_cases(cases, [4])
+    index.delete([4])
+    cases.append({"mhm": {"age": 40}})
+    assert removed == 1
+    assert index.query(cases, predicates) == [i for i, case in enumerate(cases) if matches(case)]
+
+
+def test_delete_cases():
+    cases = list(range(10))
+    assert delete_cases(cases, [9, 1, 1, 4]) == 3
+    assert cases == [0, 2, 3, 5, 6, 7, 8]
+    assert delete_cases(cases, []) == 0
@@ -0,0 +1,162 @@
+"""Tests for compiled schema validation"""
+import copy
+import random
+
+import pytest
+
+from jsonviewer import schema
+from jsonviewer.schema import CompiledSchema, default_schema, summarize_errors, validate_suite
+from jsonviewer.templates import DEFAULT_TEST_CASE
+
+OPTIONS = [
+    {},
+    {'allow_null': False},
+    {'allow_missing': True},
+    {'allow_extra': True},
+    {'allow_null': False, 'allow_missing': True, 'allow_extra': True},
+]
+
+
+def _kind(value):
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, (int, float)):
+        return "number"
+    if isinstance(value, str):
+        return "string"
+    if isinstance(value, list):
+        return "list"
+    return "object"
+
+
+def _reference_field(expected, value, path, options):
+    """Check one field the slow, obvious way"""
+    if value is None:
+        return [] if options.get('allow_null', True) else [(path, "null value")]
+    if isinstance(expected, dict) or _kind(expected) == _kind(value) == "list" and not expected:
+        return []
+    numbers = isinstance(expected, list) and all(_kind(v) == "number" for v in expected)
+    wanted = "list of numbers" if numbers else _kind(expected)
+    if _kind(value) != _kind(expected):
+        return [(path, f"expected {wanted}, got {_kind(value)}")]
+    if numbers:
+        for item in value:
+            if _kind(item) != "number":
+                return [(path, f"expected {wanted}, found {_kind(item)} item")]
+    return []
+
+
+def _reference_errors(template, case, options):
+    if not isinstance(case, dict):
+        return [("", f"expected object, got {_kind(case)}")]
+    errors = []
+
+    def check_keys(expected, data, prefix):
+        for key, value in expected.items():
+            if key not in data:
+                if not options.get('allow_missing', False):
+                    errors.append((f"{prefix}{key}", "missing section" if isinstance(value, dict) and not prefix
+                                   else "missing field"))
+            elif isinstance(value, dict) and not prefix:
+                section = data[key]
+                if section is None:
+                    errors.extend(_reference_field(value, None, key, options))
+                elif not isinstance(section, dict):
+                    errors.append((key, f"expected object, got {_kind(section)}"))
+                else:
+                    check_keys(value, section, f"{key}.")
+            else:
+                errors.extend(_reference_field(value, data[key], f"{prefix}{key}", options))
+        if not options.get('allow_extra', False):
+            errors.extend((f"{prefix}{key}", "unexpected field") for key in data if key not in expected)
+
+    check_keys(template, case, "")
+    return errors
+
+
+def _mutate(case, rng):
+    """Break a copy of the template in a few random places"""
+    case = copy.deepcopy(case)
+    replacements = [None, "text", 3, 2.5, True, [1, 2], [1, "x"], {"a": 1}]
+    for _ in range(rng.randrange(4)):
+        section = rng.choice(list(case))
+        roll = rng.random()
+        if roll < 0.1:
+            del case[section]
+        elif roll < 0.2:
+            case[section] = rng.choice(replacements)
+        elif isinstance(case[section], dict) and case[section]:
+            key = rng.choice(list(case[section]))
+            if roll < 0.4:
+                del case[section][key]
+            elif roll < 0.5:
+                case[section]["extra_" + key] = 1
+            else:
+                case[section][key] = rng.choice(replacements)
+        elif roll < 0.3:
+            case["extra"] = 1
+    return case
+
+
+def _suite(n, seed=0):
+    rng = random.Random(seed)
+    cases = [_mutate(DEFAULT_TEST_CASE, rng) for _ in range(n)]
+    return cases + ["not a case", None, []]
+
+
+@pytest.mark.parametrize("options", OPTIONS)
+def test_validate_matches_reference(options):
+    compiled = CompiledSchema(DEFAULT_TEST_CASE, **options)
+    for case in _suite(300):
+        assert sorted(compiled.validate(case)) == sorted(_reference_errors(DEFAULT_TEST_CASE, case, options))
+
+
+def test_template_itself_is_valid():
+    assert default_schema().validate(copy.deepcopy(DEFAULT_TEST_CASE)) == []
+    assert default_schema() is default_schema()
+
+
+def test_validate_reports():
+    template = {"sec": {"n": 1, "s": "x", "b": True, "l": [1.0, 2], "any": {}}, "top": 0}
+    compiled = CompiledSchema(template, allow_null=False)
+    case = {"sec": {"n": "1", "s": None, "b": 1, "l": [1, "2"], "any": [], "new": 0}}
+    assert sorted(compiled.validate(case)) == [
+        ("sec.b", "expected boolean, got number"),
+        ("sec.l", "expected list of numbers, found string item"),
+        ("sec.n", "expected number, got string"),
+        ("sec.new", "unexpected field"),
+        ("sec.s", "null value"),
+        ("top", "missing field"),
+    ]
+
+
+@pytest.mark.parametrize("options", OPTIONS[:3])
+def test_process_pool_matches_inline(options, monkeypatch):
+    cases = _suite(150, seed=1)
+    inline = validate_suite(cases, workers=1, **options)
+    expected = [(i, path, message)
+                for i, case in enumerate(cases)
+                for path, message in _reference_errors(DEFAULT_TEST_CASE, case, options)]
+    assert sorted(inline) == sorted(expected)
+
+    # A generator has no len(), so it always goes to the pool, in uneven chunks
+    pooled = validate_suite((case for case in cases), workers=2, chunk_size=7, **options)
+    assert pooled == inline
+
+    monkeypatch.setattr(schema, "PARALLEL_THRESHOLD", 0)
+    assert validate_suite(cases, workers=3, chunk_size=40, **options) == inline
+
+
+def test_process_pool_with_custom_template():
+    template = {"sec": {"n": 1}}
+    cases = [{"sec": {"n": i if i % 3 else "x"}} for i in range(30)]
+    expected = [(i, "sec.n", "expected number, got string") for i in range(0, 30, 3)]
+    assert validate_suite(cases, template, workers=1) == expected
+    assert validate_suite(iter(cases), template, workers=2, chunk_size=4) == expected
+
+
+def test_summarize_errors():
+    errors = [(0, "a", "m"), (1, "b", "m"), (2, "b", "m")]
+    assert list(summarize_errors(errors).items()) == [("b", 2), ("a", 1)]
@@ -0,0 +1,99 @@
+"""Tests for the SQLite suite store"""
+import pytest
+
+from jsonviewer import store
+from jsonviewer.store import StoredSuite
+
+
+def _cases(n):
+    return [{"mhm": {"age": 20 + i, "DM2": i % 2 == 0}, "id": i} for i in range(n)]
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "suite.db")
+
+
+def _reopen(suite):
+    suite.close()
+    return StoredSuite(suite.path)
+
+
+def test_saved_suite_reopens_in_order(db_path, monkeypatch):
+    monkeypatch.setattr(store, "BATCH_SIZE", 7)
+    suite = StoredSuite(db_path)
+    suite.extend(_cases(20))
+    suite[3] = {"id": "edited"}
+    suite.update_many([(5, {"id": "bulk"}), (6, {"id": "bulk"})])
+    del suite[0]
+    suite.insert(0, {"id": "first"})
+    suite.append({"id": "last"})
+    expected = list(suite)
+
+    suite = _reopen(suite)
+    assert list(suite) == expected
+    assert suite[0] == {"id": "first"}
+    assert suite[-1] == {"id": "last"}
+    assert suite[2:6] == expected[2:6]
+    suite.close()
+
+
+def test_crowded_inserts_renumber_and_keep_order(db_path):
+    suite = StoredSuite(db_path)
+    suite.extend([{"id": "a"}, {"id": "z"}])
+    # Each insert halves the gap before "z" until positions must be renumbered
+    for n in range(40):
+        suite.insert(len(suite) - 1, {"id": n})
+    expected = [{"id": "a"}] + [{"id": n} for n in range(40)] + [{"id": "z"}]
+    assert list(suite) == expected
+
+    suite = _reopen(suite)
+    assert list(suite) == expected
+    suite.close()
+
+
+@pytest.mark.parametrize("indexed", [False, True])
+def test_find(db_path, indexed):
+    suite = StoredSuite(db_path)
+    suite.extend(_cases(6))
+    suite.append({"mhm": {"age": None}, "id": 6})
+    suite.append({"mhm": {}, "id": 7})
+    if indexed:
+        suite.create_index("mhm.age")
+        suite.create_index("mhm.DM2")
+
+    assert suite.find("mhm.age", 22) == [2]
+    assert suite.find("mhm.age", 23, ">=") == [3, 4, 5]
+    assert suite.find("mhm.DM2", True) == [0, 2, 4]
+    assert suite.find("mhm.age", None) == [6, 7]
+    assert suite.find("mhm.age", None, "!=") == [0, 1, 2, 3, 4, 5]
+
+    del suite[0]
+    assert suite.find("mhm.age", 22) == [1]
+    suite.close()
+
+
+def test_find_rejects_unsupported_arguments(db_path):
+    suite = StoredSuite(db_path)
+    suite.extend(_cases(2))
+    with pytest.raises(ValueError):
+        suite.find("mhm.age", 1, "~")
+    with pytest.raises(ValueError):
+        suite.find("mhm.age", None, "<")
+    with pytest.raises(ValueError):
+        suite.find("mhm.age", [20, 21])
+    with pytest.raises(ValueError):
+        suite.find("mhm.age", {"a": 1})
+    with pytest.raises(ValueError):
+        suite.find("mhm.age'); DROP TABLE cases; --", 1)
+    suite.close()
+
+
+def test_indexes_persist(db_path):
+    suite = StoredSuite(db_path)
+    suite.create_index("mhm.age")
+    suite = _reopen(suite)
+    assert suite.indexed_fields() == ["mhm.age"]
+    suite.drop_index("mhm.age")
+    assert suite.indexed_fields() == []
+    suite.close()
@@ -0,0 +1,164 @@
+"""Transform steps, pipelines and writing changes back"""
+import copy
+import json
+
+import pytest
+
+from jsonviewer import transform as transform_module
+from jsonviewer.transform import (Pipeline, Step, TransformReport, compile_expression, parse_steps, preview,
+                                  transformed_cases, write_changes)
+
+
+def _case():
+    return {
+        "mhm": {"age": 40, "sfat": 3, "sbp": None},
+        "smk": {"now": 1, "evr": 0},
+        "slp": {"bed": [8.5, 7.0], "awk": [1, 2]},
+    }
+
+
+def _run(text, case):
+    original = copy.deepcopy(case)
+    report = TransformReport(parse_steps(text))
+    result = Pipeline(text).apply(case, report)
+    # Steps never modify the case they are given
+    assert case == original
+    return result, report
+
+
+def test_parse_steps():
+    steps = parse_steps("# comment\n\nrename a.b -> a.c\nfill a.d = [1]\nset a.e = word WHERE a.f = 1\n")
+    assert steps == [
+        Step('rename', 'a.b', 'a.c', '', 'rename a.b -> a.c'),
+        Step('fill', 'a.d', [1], '', 'fill a.d = [1]'),
+        Step('set', 'a.e', 'word', 'a.f = 1', 'set a.e = word WHERE a.f = 1'),
+    ]
+    with pytest.raises(ValueError, match="Line 1"):
+        parse_steps("rename a.b")
+    with pytest.raises(ValueError):
+        Pipeline("")
+    with pytest.raises(ValueError):
+        Pipeline("compute a.b = __import__('os')")
+
+
+def test_rename_within_section_keeps_field_order():
+    result, _ = _run("rename mhm.sfat -> mhm.saturated_fat", _case())
+    assert list(result["mhm"]) == ["age", "saturated_fat", "sbp"]
+    assert result["mhm"]["saturated_fat"] == 3
+
+
+def test_rename_within_section_replaces_existing_target():
+    result, _ = _run("rename mhm.sfat -> mhm.age", _case())
+    assert result["mhm"] == {"age": 3, "sbp": None}
+
+
+def test_rename_across_sections():
+    case = _case()
+    result, _ = _run("rename mhm.sfat -> nut.sfat", case)
+    assert "sfat" not in result["mhm"]
+    assert result["nut"] == {"sfat": 3}
+    # Untouched sections are shared with the original case
+    assert result["smk"] is case["smk"]
+
+
+def test_rename_missing_field_is_a_no_op():
+    case = _case()
+    result, report = _run("rename mhm.nothing -> mhm.other", case)
+    assert result is case
+    assert report.changed == [0]
+
+
+def test_compute_numbers_and_lists():
+    result, _ = _run("compute mhm.age = mhm.age + 1\n"
+                     "compute slp.bed = round(slp.bed * 60)\n"
+                     "compute slp.total = slp.bed + slp.awk", _case())
+    assert result["mhm"]["age"] == 41
+    assert result["slp"]["bed"] == [510, 420]
+    assert result["slp"]["total"] == [511, 422]
+
+
+def test_compute_skips_missing_null_and_mismatched_inputs():
+    case = _case()
+    case["slp"]["awk"] = [1, 2, 3]
+    text = ("compute mhm.x = mhm.sbp * 2\n"
+            "compute mhm.y = mhm.nothing + 1\n"
+            "compute slp.z = slp.bed + slp.awk\n"
+            "compute mhm.w = mhm.age / 0")
+    result, report = _run(text, case)
+    assert result is case
+    assert report.skipped == [1, 1, 1, 1]
+
+
+def test_compute_keeps_case_when_value_is_unchanged():
+    case = _case()
+    result, report = _run("compute mhm.age = mhm.age * 1", case)
+    assert result is case and report.changed == [0]
+    # An int turning into an equal float is still a change
+    result, _ = _run("compute mhm.age = mhm.age * 1.0", case)
+    assert isinstance(result["mhm"]["age"], float)
+
+
+def test_compile_expression_rejects_unsupported_syntax():
+    for text in ("mhm.age and 1", "open('x')", "mhm.age +", "'text'"):
+        with pytest.raises(ValueError):
+            compile_expression(text)
+
+
+def test_fill_only_missing_or_null():
+    result, _ = _run("fill mhm.sbp = 120\nfill mhm.age = 99\nfill qlm.mfm = [0.5]", _case())
+    assert result["mhm"]["sbp"] == 120
+    assert result["mhm"]["age"] == 40
+    assert result["qlm"] == {"mfm": [0.5]}
+
+
+def test_filled_containers_are_not_shared():
+    pipeline = Pipeline("fill qlm.mfm = [0.5]")
+    first = pipeline.apply(_case())
+    second = pipeline.apply(_case())
+    assert first["qlm"]["mfm"] is not second["qlm"]["mfm"]
+
+
+def test_drop():
+    result, _ = _run("drop mhm.sfat\ndrop mhm.nothing", _case())
+    assert result["mhm"] == {"age": 40, "sbp": None}
+
+
+def test_where_limits_steps():
+    text = "set smk.now = 0 where smk.evr = 0\nset mhm.flag = true where mhm.age > 50"
+    result, report = _run(text, _case())
+    assert result["smk"]["now"] == 0
+    assert "flag" not in result["mhm"]
+    assert report.changed == [1, 0]
+
+
+def test_set_into_a_non_object_is_skipped():
+    result, report = _run("set mhm.age.years = 40", _case())
+    assert report.skipped == [1]
+
+
+def test_preview_and_write_changes():
+    cases = [_case() for _ in range(5)]
+    cases[2]["mhm"]["age"] = 70
+    pipeline = Pipeline("set mhm.senior = true where mhm.age >= 65")
+    report, positions = preview(pipeline, cases)
+    assert positions == [2]
+    assert "senior" not in cases[2]["mhm"]
+    assert report.cases == 5 and report.cases_changed == 1
+    assert report.rows() == [{'step': pipeline.steps[0].text, 'changed': 1, 'skipped': 0}]
+
+    report = TransformReport(pipeline.steps)
+    written = write_changes(cases, transform_module.changed_cases(pipeline, cases, report))
+    assert written == [2]
+    assert cases[2]["mhm"]["senior"] is True
+
+
+def test_parallel_matches_inline(monkeypatch):
+    cases = [dict(_case(), mhm={"age": age, "sfat": age % 4}) for age in range(60)]
+    text = "rename mhm.sfat -> nut.sfat\ncompute mhm.age = mhm.age * 2 where mhm.age > 30"
+    inline_report = TransformReport(parse_steps(text))
+    inline = list(transformed_cases(Pipeline(text), cases, inline_report, workers=1))
+    monkeypatch.setattr(transform_module, "PARALLEL_THRESHOLD", 10)
+    parallel_report = TransformReport(parse_steps(text))
+    parallel = list(transformed_cases(Pipeline(text), cases, parallel_report, workers=2, chunk_size=7))
+    assert json.dumps(parallel) == json.dumps(inline)
+    assert parallel_report.rows() == inline_report.rows()
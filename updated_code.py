@@ -1,7 +1,19 @@
 import streamlit as st
-import json
-import copy
-from typing import Dict, Any, List
+from typing import Dict, Any, Callable, Tuple
+from jsonviewer.cache import CaseCache
+from jsonviewer.cleaning import clean_form
+from jsonviewer.dedup import unique_cases
+from jsonviewer.executor import DEFAULT_CONCURRENCY, DEFAULT_RETRIES, DEFAULT_TIMEOUT, execute_suite, latency_summary
+from jsonviewer import codec
+from jsonviewer.export import deferred_download, dumps_suite
+from jsonviewer.flatten import MISSING
+from jsonviewer.generator import make_cloner
+from jsonviewer.golden import compare_run, golden_records, load_golden, parse_tolerances, record_golden
+from jsonviewer.loader import iter_cases
+from jsonviewer.patch import EditHistory
+from jsonviewer.profiler import RerunProfiler, summary_rows, widgets_this_run
+from jsonviewer.stub_server import start_stub_server
+from jsonviewer.templates import get_default_json_structure
 
 # Page configuration
 st.set_page_config(
@@ -10,226 +22,98 @@ st.set_page_config(
     layout="wide"
 )
 
-def get_default_json_structure() -> Dict[str, Any]:
-    """Returns the default JSON structure with all values set to null/empty"""
-    return {
-        "mhm": {
-            "age": None,
-            "hgt": None,
-            "wgt": None,
-            "sex": None,
-            "dbp": None,
-            "map": None,
-            "sbp": None,
-            "fat": None,
-            "ppr": None,
-            "rhr": None,
-            "rhr_day": [],
-            "spo2": None,
-            "vo2max": None,
-            "whr": None,
-            "wst": None,
-            "alc": None,
-            "cst": None,
-            "exh": None,
-            "fCV": None,
-            "fDM": None,
-            "fMI": None,
-            "pHT": None,
-            "a1c": None,
-            "acr": None,
-            "cre": None,
-            "crp": None,
-            "cys": None,
-            "fbg": None,
-            "eag": None,
-            "gfr": None,
-            "hdl": None,
-            "ldl": None,
-            "tgl": None,
-            "tsc": None,
-            "vdl": None,
-            "CAN": None,
-            "CHD": None,
-            "CHF": None,
-            "CKD": None,
-            "CVD": None,
-            "DM2": None,
-            "HTN": None,
-            "LDS": None,
-            "LVH": None,
-            "PDM": None,
-            "PMI": None,
-            "STK": None,
-            "TDM": None,
-            "THT": None
-        },
-        "smk": {
-            "now": None,
-            "evr": None,
-            "yrs": None,
-            "num": None,
-            "qit": None,
-            "slt": None,
-        },
-        "slp": {
-            "bed": [],
-            "slp": [],
-            "awk": [],
-            "slp_avg": []
-        },
-        "nut": {
-            "nqs01": None,
-            "nqs02": None,
-            "nqs03": None,
-            "nqs04": None,
-            "nqs05": None,
-            "nqs06": None,
-            "nqs07": None,
-            "nqs08": None,
-            "nqs09": None,
-            "nqs10": None,
-            "nqs11": None,
-            "nqs12": None,
-            "nqs13": None,
-            "nqs14": None,
-            "nqs15": None,
-            "nqs16": None,
-            "nqs17": None,
-            "nqs18": None,
-            "nqs19": None,
-            "nqs20": None,
-            "nqs21": None,
-            "nqs22": None,
-            "protein": None,
-            "sfat": None,
-            "sugar": None,
-            "fiber": None,
-            "sodium": None,
-            "vitamin_c": None,
-            "iron": None,
-            "percentage_drink": None,
-            "density_drink": None,
-        },
-        "qlm": {
-            "q01": None,
-            "q02": None,
-            "q03": None,
-            "q04": None,
-            "q05": None,
-            "q06": None,
-            "q07": None,
-            "q08": None,
-            "q09": None,
-            "q10": None,
-            "q11": None,
-            "q12": None,
-            "q13": None,
-            "q14": None,
-            "q15": None,
-            "q16": None,
-            "q17": None,
-            "q18": None,
-            "q19": None,
-            "q20": None,
-            "q21": None,
-            "q22": None,
-            "q23": None,
-            "q24": None,
-            "q25": None,
-            "q26": None,
-            "q27": None,
-            "gad01": None,
-            "gad02": None,
-            "gad03": None,
-            "gad04": None,
-            "gad05": None,
-            "gad06": None,
-            "gad07": None,
-            "phq01": None,
-            "phq02": None,
-            "phq03": None,
-            "phq04": None,
-            "phq05": None,
-            "phq06": None,
-            "phq07": None,
-            "phq08": None,
-            "phq09": None,
-            "pss01": None,
-            "pss02": None,
-            "pss03": None,
-            "pss04": None,
-            "pss05": None,
-            "pss06": None,
-            "pss07": None,
-            "pss08": None,
-            "pss09": None,
-            "pss10": None,
-            "gsrh": None,
-            "maas01": None,
-            "maas02": None,
-            "maas03": None,
-            "maas04": None,
-            "maas05": None,
-            "maas06": None,
-            "maas07": None,
-            "maas08": None,
-            "maas09": None,
-            "maas10": None,
-            "maas11": None,
-            "maas12": None,
-            "maas13": None,
-            "maas14": None,
-            "maas15": None,
-            "mfm": [],
-        },
-        "clip": None
-    }
-
-def remove_null_values(data: Any) -> Any:
-    """Recursively remove null/None values from nested dictionaries and lists"""
-    if isinstance(data, dict):
-        cleaned = {}
-        for key, value in data.items():
-            cleaned_value = remove_null_values(value)
-            # Only include non-null, non-empty values
-            if (cleaned_value is not None and 
-                cleaned_value != [] and 
-                cleaned_value != {} and 
-                cleaned_value != "" and
-                str(cleaned_value).lower() != "null"):
-                cleaned[key] = cleaned_value
-        return cleaned if cleaned else None
-    elif isinstance(data, list):
-        cleaned = []
-        for item in data:
-            cleaned_item = remove_null_values(item)
-            # Only include non-null, non-empty items
-            if (cleaned_item is not None and 
-                cleaned_item != "" and 
-                str(cleaned_item).lower() != "null"):
-                cleaned.append(cleaned_item)
-        return cleaned if cleaned else None
-    else:
-        # Return None for null, None, empty string, or "null" string values
-        if (data is None or 
-            data == "" or 
-            str(data).lower() == "null"):
-            return None
-        return data
-
-def is_form_empty(form_data: Dict[str, Any]) -> bool:
-    """Check if a form is completely empty (all values are null/None/empty)"""
-    cleaned = remove_null_values(form_data)
-    return cleaned is None or cleaned == {}
+@st.cache_resource
+def get_stub_server_url() -> str:
+    """Start one local stub API per process and return its URL"""
+    _, url = start_stub_server(latency_ms=5)
+    return url
 
+@st.cache_resource
+def get_blank_template() -> Tuple[Dict[str, Any], Callable[[Any], Any]]:
+    """The all-null form and a cloner compiled for its shape, built once per process"""
+    template = get_default_json_structure()
+    return template, make_cloner(template)
 
+def get_blank_form() -> Dict[str, Any]:
+    """A fresh all-null form; every form slot owns its copy, so no session can change another's"""
+    template, clone = get_blank_template()
+    return clone(template)
 
 # Initialize session state
 if 'forms' not in st.session_state:
-    st.session_state.forms = [get_default_json_structure()]
+    st.session_state.forms = [get_blank_form()]
 if 'form_counter' not in st.session_state:
     st.session_state.form_counter = 1
+if 'case_cache' not in st.session_state:
+    st.session_state.case_cache = CaseCache()
+case_cache = st.session_state.case_cache
+if 'edit_history' not in st.session_state:
+    st.session_state.edit_history = EditHistory()
+edit_history = st.session_state.edit_history
+# Parse errors of editors whose text did not parse, by form position
+if 'editor_errors' not in st.session_state:
+    st.session_state.editor_errors = {}
+if 'active_form' not in st.session_state:
+    st.session_state.active_form = 0
+
+def record_edit(i: int):
+    """Parse an editor whose text changed and store the edit as a patch
+
+    Runs as the text area's on_change callback, i.e. when the editor loses
+    focus or on Ctrl+Enter, so unchanged editors are never re-parsed.
+    """
+    old_form = st.session_state.forms[i]
+    is_valid, message, parsed_json = case_cache.validate(old_form, st.session_state[f"json_editor_{i}"])
+    if not is_valid:
+        st.session_state.editor_errors[i] = message
+        return
+    st.session_state.editor_errors.pop(i, None)
+    if parsed_json is old_form:
+        return
+    # Only the difference is kept for undo, not a copy of the form
+    patch = edit_history.record(i, old_form, parsed_json)
+    if patch:
+        st.session_state.forms[i] = parsed_json
+        case_cache.derive(old_form, parsed_json, patch)
+
+def undo_edit(i: int):
+    """Revert the last edit of a form and reset its editor"""
+    old_form = st.session_state.forms[i]
+    new_form, patch = edit_history.undo(i, old_form)
+    st.session_state.forms[i] = new_form
+    case_cache.derive(old_form, new_form, patch)
+    st.session_state.pop(f"json_editor_{i}", None)
+    st.session_state.editor_errors.pop(i, None)
+
+def redo_edit(i: int):
+    """Re-apply the last undone edit of a form and reset its editor"""
+    old_form = st.session_state.forms[i]
+    new_form, patch = edit_history.redo(i, old_form)
+    st.session_state.forms[i] = new_form
+    case_cache.derive(old_form, new_form, patch)
+    st.session_state.pop(f"json_editor_{i}", None)
+    st.session_state.editor_errors.pop(i, None)
+
+def reset_editors():
+    """Drop all editor state once form positions shift, so no editor shows a neighbour's text"""
+    for key in [k for k in st.session_state if isinstance(k, str) and k.startswith("json_editor_")]:
+        del st.session_state[key]
+    st.session_state.editor_errors.clear()
+    edit_history.clear()
+
+def drop_hidden_errors():
+    """Forget errors of editors that are no longer shown; their unparsed text is discarded"""
+    active = st.session_state.active_form
+    st.session_state.editor_errors = {
+        i: message for i, message in st.session_state.editor_errors.items() if i == active
+    }
+
+# Per-rerun phase timings, enabled from the sidebar profiler panel
+if 'profiler' not in st.session_state:
+    st.session_state.profiler = RerunProfiler()
+profiler = st.session_state.profiler
+profiler.enabled = st.session_state.get('profile_reruns', False)
+profiler.start_run()
 
 # Main UI
 st.title("🏥 Health Score API JSON Testing Dashboard")
@@ -240,31 +124,41 @@ col1, col2, col3 = st.columns([2, 2, 2])
 
 with col1:
     if st.button("➕ Add New Test Case", type="primary"):
-        st.session_state.forms.append(get_default_json_structure())
+        st.session_state.forms.append(get_blank_form())
         st.session_state.form_counter += 1
+        st.session_state.active_form = len(st.session_state.forms) - 1
         st.rerun()
 
 with col2:
     if st.button("🗑️ Clear All Forms", type="secondary"):
-        st.session_state.forms = [get_default_json_structure()]
+        st.session_state.forms = [get_blank_form()]
         st.session_state.form_counter = 1
+        st.session_state.active_form = 0
+        reset_editors()
         st.rerun()
+    focused_editing = st.checkbox(
+        "Edit one form at a time", value=True, key="focused_editing",
+        help="Show a single editor picked from a selector, so reruns stay fast with hundreds of forms"
+    )
 
 with col3:
     # Copy to clipboard button
     copy_clicked = st.button("📋 Copy All to Clipboard", type="primary")
+    compact_output = st.checkbox("Compact output", help="No indentation or spaces, for smaller payloads")
     
 if copy_clicked:
-    # Collect all non-empty forms
+    # Collect all non-empty forms, cleaning each one once
     valid_forms = []
-    for i, form_data in enumerate(st.session_state.forms):
-        if not is_form_empty(form_data):
-            cleaned_form = remove_null_values(form_data)
-            if cleaned_form:
+    with profiler.phase("remove_null_values"):
+        for i, form_data in enumerate(st.session_state.forms):
+            cleaned_form, is_empty = clean_form(form_data)
+            if not is_empty:
                 valid_forms.append(cleaned_form)
     
     if valid_forms:
-        json_output = json.dumps(valid_forms, indent=2)
+        with profiler.phase("export"):
+            json_output = dumps_suite(valid_forms, compact=compact_output)
+        profiler.count("json_bytes", len(json_output))
         st.success("✅ JSON Ready - Copy from the text area below:")
         st.text_area(
             "📋 Copy this JSON manually:",
@@ -276,11 +170,152 @@ if copy_clicked:
     else:
         st.warning("❌ No valid forms to copy! Fill in some values first.")
 
+# Execute the cleaned forms against the API
+with st.expander("🚀 Run Against API"):
+    if 'api_url' not in st.session_state:
+        st.session_state.api_url = ""
+    if st.button("🧪 Use local stub API", help="Start a fake health-score API on this machine"):
+        st.session_state.api_url = get_stub_server_url()
+    
+    api_url = st.text_input("Endpoint URL", key="api_url", placeholder="https://staging.example.com/score")
+    rcol1, rcol2, rcol3, rcol4 = st.columns(4)
+    with rcol1:
+        concurrency = st.number_input("Concurrency", min_value=1, max_value=512, value=DEFAULT_CONCURRENCY)
+    with rcol2:
+        rate_limit = st.number_input("Rate limit (req/s, 0 = off)", min_value=0.0, value=0.0)
+    with rcol3:
+        retries = st.number_input("Retries", min_value=0, max_value=10, value=DEFAULT_RETRIES)
+    with rcol4:
+        repeat = st.number_input("Repeat suite", min_value=1, max_value=100000, value=1,
+                                 help="Send the suite this many times for load testing")
+    request_timeout = st.number_input("Timeout (s)", min_value=1.0, value=DEFAULT_TIMEOUT)
+    wrap_in_list = st.checkbox("Send each case as a one-element array", value=True,
+                               help="Matches the format produced by the copy buttons")
+    skip_duplicates = st.checkbox("Skip duplicate forms", value=True,
+                                  help="Send identical forms once, comparing them after null removal")
+    
+    if st.button("▶️ Run Suite", type="primary"):
+        with profiler.phase("remove_null_values"):
+            valid_forms = [cleaned for cleaned, is_empty in map(clean_form, st.session_state.forms) if not is_empty]
+        if skip_duplicates:
+            form_count = len(valid_forms)
+            valid_forms = unique_cases(valid_forms)
+            if len(valid_forms) < form_count:
+                st.caption(f"🧹 Skipped {form_count - len(valid_forms)} duplicate form(s)")
+        if not api_url.strip():
+            st.warning("❌ Enter an endpoint URL first!")
+        elif not valid_forms:
+            st.warning("❌ No valid forms to send! Fill in some values first.")
+        else:
+            progress = st.progress(0.0, text="Sending test cases...")
+            try:
+                with profiler.phase("execute_suite"):
+                    results = execute_suite(
+                        (form for _ in range(repeat) for form in valid_forms),
+                        api_url.strip(),
+                        concurrency=concurrency,
+                        rate_limit=rate_limit,
+                        retries=retries,
+                        timeout=request_timeout,
+                        wrap_in_list=wrap_in_list,
+                        on_progress=lambda done, total: progress.progress(
+                            done / total, text=f"Sent {done} of {total} test cases..."
+                        ),
+                        total=repeat * len(valid_forms)
+                    )
+                st.session_state.api_results = results
+                st.session_state.api_cases = valid_forms
+                st.session_state.pop('regression_report', None)
+            except ValueError as e:
+                st.error(f"❌ {e}")
+            progress.empty()
+    
+    if st.session_state.get('api_results'):
+        results = st.session_state.api_results
+        summary = latency_summary(results)
+        mcol1, mcol2, mcol3, mcol4, mcol5 = st.columns(5)
+        mcol1.metric("Requests", summary['requests'])
+        mcol2.metric("Failed", summary['failed'])
+        mcol3.metric("p50", f"{summary['p50_ms']:.1f} ms")
+        mcol4.metric("p95", f"{summary['p95_ms']:.1f} ms")
+        mcol5.metric("p99", f"{summary['p99_ms']:.1f} ms")
+        st.dataframe(results[:5000])
+    
+    # Golden responses: keep one run as the reference and check later builds against it
+    st.markdown("**🏅 Golden Responses**")
+    golden = st.session_state.get('golden')
+    gcol1, gcol2 = st.columns(2)
+    with gcol1:
+        if st.button("💾 Save Run as Golden", disabled=not st.session_state.get('api_results'),
+                     help="Keep this run's successful responses as the expected ones"):
+            with profiler.phase("record_golden"):
+                st.session_state.golden = record_golden(st.session_state.api_cases, st.session_state.api_results)
+            st.session_state.pop('regression_report', None)
+            st.rerun()
+        if golden:
+            st.download_button(f"⬇️ Download {len(golden)} golden response(s)",
+                               data=deferred_download(lambda: golden_records(golden), 'ndjson'),
+                               file_name="golden_responses.ndjson", mime="application/x-ndjson")
+    with gcol2:
+        uploaded_golden = st.file_uploader("Load golden responses", type=['ndjson', 'json'], key="golden_upload")
+        if uploaded_golden is not None and st.button("📂 Load Golden"):
+            try:
+                st.session_state.golden = load_golden(iter_cases(uploaded_golden))
+                st.session_state.pop('regression_report', None)
+                st.rerun()
+            except ValueError as e:
+                st.error(f"❌ Invalid golden file: {e}")
+    
+    tolerance_text = st.text_input("Numeric tolerances", placeholder="score=0.01, sections.*=1%",
+                                   help="Per-field allowed difference, absolute or in percent; "
+                                        "patterns match response paths and the first match wins")
+    if st.button("🔍 Compare With Golden", disabled=not (golden and st.session_state.get('api_results'))):
+        try:
+            tolerances = parse_tolerances(tolerance_text)
+        except ValueError as e:
+            st.error(f"❌ {e}")
+        else:
+            with st.spinner("Comparing responses..."), profiler.phase("compare_golden"):
+                st.session_state.regression_report = compare_run(
+                    st.session_state.api_cases, st.session_state.api_results, golden, tolerances
+                )
+    
+    if st.session_state.get('regression_report'):
+        report = st.session_state.regression_report
+        counts = report.counts
+        rcol1, rcol2, rcol3, rcol4 = st.columns(4)
+        rcol1.metric("Matched", counts['match'])
+        rcol2.metric("Drifted", counts['drift'])
+        rcol3.metric("New", counts['new'], help="Cases without a golden response")
+        rcol4.metric("Errors", counts['error'])
+        if report.passed:
+            st.success("✅ No response drifted beyond its tolerance")
+        else:
+            st.error(f"❌ {len(report.drifted_cases)} case(s) drifted in {len(report.fields)} field(s)")
+            st.dataframe([{"Field": path, "Cases": count} for path, count in report.top_fields(50)])
+            st.dataframe([{"Request": drift.case + 1, "Field": drift.path,
+                           "Golden": codec.dumps(drift.expected) if drift.expected is not MISSING else "",
+                           "Actual": codec.dumps(drift.actual) if drift.actual is not MISSING else ""}
+                          for drift in report.drifts[:1000]])
+
 st.markdown("---")
 
 # Display forms
-for i, form_data in enumerate(st.session_state.forms):
-    with st.expander(f"🧪 Test Case {i + 1}", expanded=True):
+if focused_editing:
+    # One selector instead of a row per form keeps the rerun cost flat in the form count
+    if st.session_state.active_form >= len(st.session_state.forms):
+        st.session_state.active_form = len(st.session_state.forms) - 1
+    st.selectbox(
+        "Editing", range(len(st.session_state.forms)), key="active_form",
+        format_func=lambda i: f"🧪 Test Case {i + 1}", on_change=drop_hidden_errors
+    )
+    shown_forms = [st.session_state.active_form]
+else:
+    shown_forms = range(len(st.session_state.forms))
+
+for i in shown_forms:
+    form_data = st.session_state.forms[i]
+    with st.expander(f"🧪 Test Case {i + 1}", expanded=True), profiler.phase("render_case"):
         col1, col2 = st.columns([1, 4])
         
         with col1:
@@ -288,45 +323,54 @@ for i, form_data in enumerate(st.session_state.forms):
             if st.button(f"🗑️ Delete", key=f"delete_{i}"):
                 if len(st.session_state.forms) > 1:
                     st.session_state.forms.pop(i)
+                    reset_editors()
                     st.rerun()
                 else:
                     st.warning("Cannot delete the last form!")
             
+            st.button("↩️ Undo", key=f"undo_{i}", on_click=undo_edit, args=(i,),
+                      disabled=not edit_history.can_undo(i))
+            st.button("↪️ Redo", key=f"redo_{i}", on_click=redo_edit, args=(i,),
+                      disabled=not edit_history.can_redo(i))
+            
             copy_individual = st.button(f"📋 Copy This Form", key=f"copy_{i}")
             
             if copy_individual:
-                if not is_form_empty(form_data):
-                    cleaned_form = remove_null_values(form_data)
-                    if cleaned_form:
-                        json_output = json.dumps([cleaned_form], indent=2)
-                        st.success("✅ JSON Ready - Copy from below:")
-                        st.text_area(
-                            "📋 Copy this JSON manually:",
-                            value=json_output,
-                            height=200,
-                            key=f"individual_copy_{i}",
-                            help="Select all text (Ctrl+A) and copy (Ctrl+C)"
-                        )
+                with profiler.phase("remove_null_values"):
+                    cleaned_form, is_empty = clean_form(form_data)
+                if not is_empty:
+                    with profiler.phase("export"):
+                        json_output = dumps_suite([cleaned_form], compact=compact_output)
+                    st.success("✅ JSON Ready - Copy from below:")
+                    st.text_area(
+                        "📋 Copy this JSON manually:",
+                        value=json_output,
+                        height=200,
+                        key=f"individual_copy_{i}",
+                        help="Select all text (Ctrl+A) and copy (Ctrl+C)"
+                    )
                 else:
                     st.warning("❌ Form is empty!")
         
         with col2:
             # JSON editor for this form
-            json_str = json.dumps(form_data, indent=2)
-            edited_json = st.text_area(
+            with profiler.phase("dump_json"):
+                json_str = case_cache.pretty(form_data)
+            st.text_area(
                 f"Edit JSON for Test Case {i + 1}:",
                 value=json_str,
                 height=400,
-                key=f"json_editor_{i}"
+                key=f"json_editor_{i}",
+                on_change=record_edit,
+                args=(i,)
             )
             
-            # Try to parse and update the form data
-            try:
-                parsed_json = json.loads(edited_json)
-                st.session_state.forms[i] = parsed_json
+            # Parsing happened in record_edit if the text changed; only show the result here
+            message = st.session_state.editor_errors.get(i)
+            if message is None:
                 st.success("✅ Valid JSON")
-            except json.JSONDecodeError as e:
-                st.error(f"❌ Invalid JSON: {str(e)}")
+            else:
+                st.error(f"❌ {message}")
 
 # Footer information
 st.markdown("---")
@@ -336,21 +380,29 @@ st.markdown("""
 2. **Add Test Cases**: Click "Add New Test Case" to create more forms
 3. **Copy to Clipboard**: Use the copy buttons to get cleaned JSON (null values removed)
 4. **Valid Forms Only**: Empty forms are automatically excluded from clipboard copy
-5. **Real-time Validation**: JSON syntax errors are highlighted immediately
+5. **Validation on Commit**: Editors are parsed when they lose focus (or on Ctrl+Enter) and syntax errors are highlighted
+6. **Focused Editing**: With "Edit one form at a time", pick the form to edit from the selector
 """)
 
 st.markdown("### 🔧 Features:")
 st.markdown("""
 - ✅ Multiple test cases with individual editing
 - ✅ Automatic null/empty value removal
-- ✅ Real-time JSON validation
+- ✅ JSON validation when an editor's text changes
 - ✅ Clipboard integration
+- ✅ Batch execution against the API with latency percentiles
+- ✅ Duplicate forms skipped when the suite is run
+- ✅ Golden-response regression checks with per-field tolerances
 - ✅ Form duplication and deletion
+- ✅ Per-form undo/redo history
+- ✅ Rerun profiler with per-phase timings and trace export
 - ✅ Clean, organized interface
 """)
 
 # Display current form count
 st.sidebar.markdown(f"**Current Test Cases:** {len(st.session_state.forms)}")
+cache_stats = case_cache.stats()
+st.sidebar.caption(f"⚡ Cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses")
 st.sidebar.markdown("**Default Structure Fields:**")
 st.sidebar.json({
     "mhm": "Medical/Health Measurements",
@@ -360,3 +412,24 @@ st.sidebar.json({
     "qlm": "Quality of Life Measurements",
     "clip": "Clipboard flag"
 })
+
+# Rerun profiler panel, rendered last so the run covers the whole page
+widget_count = widgets_this_run()
+if widget_count is not None:
+    profiler.count("widgets", widget_count)
+last_run = profiler.end_run()
+st.sidebar.markdown("---")
+st.sidebar.markdown("**⏱️ Profiler**")
+st.sidebar.checkbox("Profile reruns", key="profile_reruns", help="Time each phase of every rerun")
+if last_run:
+    counters = ", ".join(f"{name}: {value:,}" for name, value in last_run['counters'].items())
+    st.sidebar.caption(f"Run {last_run['run']}: {last_run['total_ms']:.1f} ms" + (f" | {counters}" if counters else ""))
+    st.sidebar.dataframe(summary_rows(last_run), hide_index=True)
+    st.sidebar.line_chart([run['total_ms'] for run in profiler.runs], height=120)
+    st.sidebar.download_button(
+        label="💾 Download rerun_trace.json",
+        data=lambda: codec.dumps(profiler.trace()),
+        file_name="rerun_trace.json",
+        mime="application/json",
+        help="Chrome trace of recent reruns, for chrome://tracing or Perfetto"
+    )